@@ -0,0 +1,76 @@
+"""
+Gunicorn 設定 (正式環境)
+
+    cd silkroad-backend
+    gunicorn                     # 自動讀取本檔
+    python src/run_prod.py       # 同上 (Render 等平台的啟動指令)
+
+所有數值都可以用環境變數覆寫，sizing 方式見 README.md 的「正式環境」一節。
+"""
+
+import multiprocessing
+import os
+
+_cores = multiprocessing.cpu_count()
+
+# ==================== 應用程式 ====================
+chdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+wsgi_app = "app:app"
+
+# preload: master 先 import 一次 app (建立路由、model metadata)，fork 出來的 worker 共用
+# 注意連線不能跨 process 共用，post_fork 會讓每個 worker 重新建立連線池
+preload_app = os.getenv("GUNICORN_PRELOAD", "True").lower() == "true"
+
+# 正式環境的啟動方式 (可用環境變數改回):
+# - 不在啟動時 db.create_all()，資料表由部署時的 flask --app app migrate 建立
+# - 關閉排程器的 HTTP API，排程器延到第一個 request 才載入
+os.environ.setdefault("DB_CREATE_ALL", "False")
+os.environ.setdefault("SCHEDULER_API_ENABLED", "False")
+
+# ==================== Worker 模型 ====================
+# gthread: 每個 worker 一個 process + N 條 thread，請求大多在等 MySQL，thread 足以重疊 I/O
+# gevent:  需另外安裝 gevent，適合大量長連線 (GUNICORN_WORKER_CLASS=gevent)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, _cores)))
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))  # 只有 gevent 使用
+
+# ==================== 網路 ====================
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', 5000)}")
+backlog = int(os.getenv("GUNICORN_BACKLOG", 2048))
+# 前面有反向代理 / load balancer 時，keepalive 要比代理端的 idle timeout 長，避免代理重用已關閉的連線
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 75))
+
+# ==================== Timeout / 重啟 ====================
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))                  # worker 無回應多久後被重啟
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30)) # 收到 HUP / TERM 後等待進行中請求的時間
+# 每個 worker 處理一定數量的請求後重啟 (加上 jitter 避免同時重啟)，防止記憶體慢慢長大
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# heartbeat 檔放在記憶體檔案系統，避免磁碟 I/O 卡住時 worker 被誤判為無回應
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# ==================== Log ====================
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """
+    master 在 preload 時建立的連線池不能被 worker 共用 (MySQL 連線會互相干擾)，
+    丟掉後在接流量前重新建立 DB_POOL_WARMUP 條連線
+    """
+    from app import app
+    from config.database import db, warm_up_db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    warm_up_db(app)
+
+
+def on_reload(server):
+    server.log.info("[gunicorn] 收到 HUP，逐一以新的 worker 取代舊 worker")
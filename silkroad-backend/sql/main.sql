@@ -38,7 +38,8 @@ CREATE TABLE `auth`.`users` (
     `created_at` timestamp NOT NULL DEFAULT(now()),
     `is_verified` boolean NOT NULL DEFAULT false COMMENT 'Email驗證狀態',
     `verification_code` varchar(10) DEFAULT NULL COMMENT '驗證碼',
-    `verification_code_expires_at` datetime DEFAULT NULL COMMENT '驗證碼過期時間'
+    `verification_code_expires_at` datetime DEFAULT NULL COMMENT '驗證碼過期時間',
+    KEY `idx_users_verified_expires` (`is_verified`, `verification_code_expires_at`)
 );
 
 CREATE TABLE `auth`.`admins` (
@@ -69,6 +70,7 @@ CREATE TABLE `auth`.`vendors` (
 CREATE TABLE `auth`.`customers` (
     `user_id` int PRIMARY KEY,
     `membership_level` int NOT NULL DEFAULT 0,
+    `completed_order_count` int NOT NULL DEFAULT 0 COMMENT '已完成且未退款的訂單數 (utils.membership 維護)',
     `is_active` boolean NOT NULL DEFAULT true,
     `stored_balance` int NOT NULL DEFAULT 0,
     `address` varchar(255) NOT NULL,
@@ -93,6 +95,33 @@ CREATE TABLE `auth`.`system_announcements` (
     FOREIGN KEY (`admin_id`) REFERENCES `auth`.`admins` (`user_id`) ON DELETE CASCADE
 );
 
+CREATE TABLE `auth`.`email_outbox` (
+    `id` int PRIMARY KEY AUTO_INCREMENT,
+    `recipient` varchar(255) NOT NULL,
+    `subject` varchar(255) NOT NULL,
+    `body` text NOT NULL,
+    `status` enum('pending', 'sending', 'sent', 'failed') NOT NULL DEFAULT 'pending',
+    `attempts` int NOT NULL DEFAULT 0,
+    `next_attempt_at` datetime NOT NULL,
+    `last_error` text,
+    `created_at` timestamp NOT NULL DEFAULT(now()),
+    `sent_at` datetime,
+    KEY `idx_email_outbox_status_next` (`status`, `next_attempt_at`)
+);
+
+CREATE TABLE `auth`.`job_runs` (
+    `id` int PRIMARY KEY AUTO_INCREMENT,
+    `job_name` varchar(64) NOT NULL,
+    `status` enum('running', 'success', 'failed') NOT NULL DEFAULT 'running',
+    `worker` varchar(128) NOT NULL COMMENT 'hostname:pid',
+    `rows_processed` int NOT NULL DEFAULT 0,
+    `duration_ms` int,
+    `error` text,
+    `started_at` datetime NOT NULL,
+    `finished_at` datetime,
+    KEY `idx_job_runs_name_started` (`job_name`, `started_at`)
+);
+
 -- store tables
 DROP TABLE IF EXISTS `store`.`products`;
 CREATE TABLE `store`.`products` (
@@ -134,7 +163,8 @@ CREATE TABLE `store`.`reviews` (
     `created_at` timestamp NOT NULL DEFAULT(now()),
     FOREIGN KEY (`customer_id`) REFERENCES `auth`.`customers` (`user_id`) ON DELETE CASCADE,
     FOREIGN KEY (`vendor_id`) REFERENCES `auth`.`vendors` (`user_id`) ON DELETE CASCADE,
-    UNIQUE KEY `customer_vendor_unique_idx` (`customer_id`, `vendor_id`)
+    UNIQUE KEY `customer_vendor_unique_idx` (`customer_id`, `vendor_id`),
+    KEY `idx_reviews_vendor_created` (`vendor_id`, `created_at`)
 );
 
 DROP TABLE IF EXISTS `order`.`cart_items`;
@@ -181,6 +211,8 @@ CREATE TABLE `order`.`orders` (
     `created_at` timestamp NOT NULL DEFAULT(now()),
     `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '資料最後更新時間',
     `address_info` varchar(255) COMMENT '地址資訊',
+    KEY `idx_orders_user_policy_refund` (`user_id`, `policy_id`, `refund_status`),
+    KEY `idx_orders_vendor_completed_created` (`vendor_id`, `is_completed`, `created_at`),
     FOREIGN KEY (`user_id`) REFERENCES `auth`.`users` (`id`) ON DELETE CASCADE,
     FOREIGN KEY (`vendor_id`) REFERENCES `auth`.`vendors` (`user_id`) ON DELETE CASCADE,
     FOREIGN KEY (`policy_id`) REFERENCES `order`.`discount_policies` (`id`)
@@ -217,6 +249,73 @@ CREATE TABLE `order`.`cart_items` (
     `selected_ice` varchar(50) NOT NULL COMMENT '使用者選的冰塊, e.g., 0%',
     `selected_size` varchar(20) NOT NULL COMMENT '使用者選的大小, e.g., L',
     KEY `idx_cart` (`cart_id`),
+    UNIQUE KEY `uq_cart_items_line` (`cart_id`, `product_id`, `selected_sugar`, `selected_ice`, `selected_size`),
     FOREIGN KEY (`cart_id`) REFERENCES `order`.`carts` (`customer_id`) ON DELETE CASCADE,
     FOREIGN KEY (`product_id`) REFERENCES `store`.`products` (`id`)
 );
+
+CREATE TABLE `order`.`vendor_daily_sales` (
+    `vendor_id` int NOT NULL,
+    `sales_date` date NOT NULL COMMENT '台灣日期',
+    `orders_count` int NOT NULL DEFAULT 0,
+    `gross_revenue` int NOT NULL DEFAULT 0,
+    `discount` int NOT NULL DEFAULT 0,
+    `net_revenue` int NOT NULL DEFAULT 0,
+    PRIMARY KEY (`vendor_id`, `sales_date`),
+    FOREIGN KEY (`vendor_id`) REFERENCES `auth`.`vendors` (`user_id`) ON DELETE CASCADE
+);
+
+CREATE TABLE `order`.`product_daily_sales` (
+    `product_id` int NOT NULL,
+    `sales_date` date NOT NULL COMMENT '台灣日期',
+    `vendor_id` int NOT NULL,
+    `quantity` int NOT NULL DEFAULT 0,
+    `revenue` int NOT NULL DEFAULT 0,
+    PRIMARY KEY (`product_id`, `sales_date`),
+    KEY `idx_product_daily_sales_vendor_date` (`vendor_id`, `sales_date`),
+    FOREIGN KEY (`product_id`) REFERENCES `store`.`products` (`id`) ON DELETE CASCADE,
+    FOREIGN KEY (`vendor_id`) REFERENCES `auth`.`vendors` (`user_id`) ON DELETE CASCADE
+);
+
+CREATE TABLE `order`.`coupon_redemptions` (
+    `customer_id` int NOT NULL,
+    `policy_id` int NOT NULL,
+    `order_id` int NOT NULL,
+    `redeemed_at` timestamp NOT NULL DEFAULT(now()),
+    PRIMARY KEY (`customer_id`, `policy_id`),
+    UNIQUE KEY `uq_coupon_redemptions_order` (`order_id`),
+    FOREIGN KEY (`customer_id`) REFERENCES `auth`.`customers` (`user_id`) ON DELETE CASCADE,
+    FOREIGN KEY (`policy_id`) REFERENCES `order`.`discount_policies` (`id`) ON DELETE CASCADE,
+    FOREIGN KEY (`order_id`) REFERENCES `order`.`orders` (`id`) ON DELETE CASCADE
+);
+
+CREATE TABLE `order`.`checkout_requests` (
+    `customer_id` int NOT NULL,
+    `idempotency_key` varchar(64) NOT NULL,
+    `order_id` int NOT NULL,
+    `created_at` timestamp NOT NULL DEFAULT(now()),
+    PRIMARY KEY (`customer_id`, `idempotency_key`),
+    KEY `idx_checkout_requests_created` (`created_at`),
+    FOREIGN KEY (`customer_id`) REFERENCES `auth`.`customers` (`user_id`) ON DELETE CASCADE,
+    FOREIGN KEY (`order_id`) REFERENCES `order`.`orders` (`id`) ON DELETE CASCADE
+);
+
+CREATE TABLE `order`.`vendor_revenue_shards` (
+    `vendor_id` int NOT NULL,
+    `shard_no` int NOT NULL,
+    `amount` int NOT NULL DEFAULT 0,
+    PRIMARY KEY (`vendor_id`, `shard_no`),
+    FOREIGN KEY (`vendor_id`) REFERENCES `auth`.`vendors` (`user_id`) ON DELETE CASCADE
+);
+
+CREATE TABLE `store`.`vendor_ratings` (
+    `vendor_id` int PRIMARY KEY,
+    `review_count` int NOT NULL DEFAULT 0,
+    `rating_sum` int NOT NULL DEFAULT 0,
+    `rating_1` int NOT NULL DEFAULT 0,
+    `rating_2` int NOT NULL DEFAULT 0,
+    `rating_3` int NOT NULL DEFAULT 0,
+    `rating_4` int NOT NULL DEFAULT 0,
+    `rating_5` int NOT NULL DEFAULT 0,
+    FOREIGN KEY (`vendor_id`) REFERENCES `auth`.`vendors` (`user_id`) ON DELETE CASCADE
+);
@@ -0,0 +1,18 @@
+-- 熱門查詢條件的複合索引
+-- 套用方式: flask --app app migrate  (於 silkroad-backend/src 底下執行)
+-- 索引已存在 (例如資料表是由 db.create_all 建立) 時會略過該行
+
+-- do_discount / view_customer_discounts: 折價券是否已被使用
+CREATE INDEX `idx_orders_user_policy_refund` ON `order`.`orders` (`user_id`, `policy_id`, `refund_status`);
+
+-- get_vendor_sales / view_all_vendor_orders
+CREATE INDEX `idx_orders_vendor_completed_created` ON `order`.`orders` (`vendor_id`, `is_completed`, `created_at`);
+
+-- 店家評論列表
+CREATE INDEX `idx_reviews_vendor_created` ON `store`.`reviews` (`vendor_id`, `created_at`);
+
+-- add_to_cart / 登入合併購物車: 找相同品項
+CREATE INDEX `idx_cart_items_line` ON `order`.`cart_items` (`cart_id`, `product_id`, `selected_sugar`, `selected_ice`, `selected_size`);
+
+-- cleanup_unverified_users
+CREATE INDEX `idx_users_verified_expires` ON `auth`.`users` (`is_verified`, `verification_code_expires_at`);
@@ -0,0 +1,31 @@
+-- 購物車品項唯一鍵: 同一個購物車中相同規格 (product, sugar, ice, size) 只能有一列
+-- 套用方式: flask --app app migrate  (於 silkroad-backend/src 底下執行)
+
+-- 1. 既有的重複品項合併到 id 最小的那一列
+UPDATE `order`.`cart_items` c
+JOIN (
+    SELECT MIN(`id`) AS keep_id, SUM(`quantity`) AS total_quantity
+    FROM `order`.`cart_items`
+    GROUP BY `cart_id`, `product_id`, `selected_sugar`, `selected_ice`, `selected_size`
+    HAVING COUNT(*) > 1
+) d ON c.`id` = d.keep_id
+SET c.`quantity` = d.total_quantity;
+
+-- 2. 刪除其餘重複列
+DELETE c FROM `order`.`cart_items` c
+JOIN (
+    SELECT MIN(`id`) AS keep_id, `cart_id`, `product_id`, `selected_sugar`, `selected_ice`, `selected_size`
+    FROM `order`.`cart_items`
+    GROUP BY `cart_id`, `product_id`, `selected_sugar`, `selected_ice`, `selected_size`
+    HAVING COUNT(*) > 1
+) d ON c.`cart_id` = d.`cart_id`
+    AND c.`product_id` = d.`product_id`
+    AND c.`selected_sugar` = d.`selected_sugar`
+    AND c.`selected_ice` = d.`selected_ice`
+    AND c.`selected_size` = d.`selected_size`
+    AND c.`id` <> d.keep_id;
+
+-- 3. 建立唯一鍵，取代 0001 的一般索引 (先建後刪，cart_id 外鍵隨時都有索引可用)
+CREATE UNIQUE INDEX `uq_cart_items_line` ON `order`.`cart_items` (`cart_id`, `product_id`, `selected_sugar`, `selected_ice`, `selected_size`);
+
+DROP INDEX `idx_cart_items_line` ON `order`.`cart_items`;
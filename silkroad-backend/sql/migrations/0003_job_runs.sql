@@ -0,0 +1,15 @@
+-- 維護排程執行紀錄 (utils/job_runner.py)
+-- 套用方式: flask --app app migrate  (於 silkroad-backend/src 底下執行)
+
+CREATE TABLE `auth`.`job_runs` (
+    `id` int PRIMARY KEY AUTO_INCREMENT,
+    `job_name` varchar(64) NOT NULL,
+    `status` enum('running', 'success', 'failed') NOT NULL DEFAULT 'running',
+    `worker` varchar(128) NOT NULL COMMENT 'hostname:pid',
+    `rows_processed` int NOT NULL DEFAULT 0,
+    `duration_ms` int,
+    `error` text,
+    `started_at` datetime NOT NULL,
+    `finished_at` datetime,
+    KEY `idx_job_runs_name_started` (`job_name`, `started_at`)
+);
@@ -0,0 +1,25 @@
+-- 顧客完成訂單數 (utils/membership.py 維護)，會員等級改由此計數判斷
+-- 套用方式: flask --app app migrate  (於 silkroad-backend/src 底下執行)
+
+ALTER TABLE `auth`.`customers`
+    ADD COLUMN `completed_order_count` int NOT NULL DEFAULT 0 COMMENT '已完成且未退款的訂單數 (utils.membership 維護)'
+    AFTER `membership_level`;
+
+-- 由既有訂單回填計數與等級 (與 reconcile_membership 相同)
+UPDATE `auth`.`customers` c
+LEFT JOIN (
+    SELECT o.user_id, COUNT(*) AS completed_order_count
+    FROM `order`.`orders` o
+    WHERE o.is_completed = true
+      AND (o.refund_status IS NULL OR o.refund_status <> 'refunded')
+    GROUP BY o.user_id
+) t ON t.user_id = c.user_id
+SET c.completed_order_count = COALESCE(t.completed_order_count, 0),
+    c.membership_level =
+    CASE
+        WHEN COALESCE(t.completed_order_count, 0) >= 100 THEN 4
+        WHEN COALESCE(t.completed_order_count, 0) >= 50  THEN 3
+        WHEN COALESCE(t.completed_order_count, 0) >= 20  THEN 2
+        WHEN COALESCE(t.completed_order_count, 0) >= 10  THEN 1
+        ELSE 0
+    END;
@@ -0,0 +1,24 @@
+-- 折價券使用紀錄 (utils/discount_service.py)，「是否已使用」改為主鍵查詢
+-- 套用方式: flask --app app migrate  (於 silkroad-backend/src 底下執行)
+
+CREATE TABLE `order`.`coupon_redemptions` (
+    `customer_id` int NOT NULL,
+    `policy_id` int NOT NULL,
+    `order_id` int NOT NULL,
+    `redeemed_at` timestamp NOT NULL DEFAULT(now()),
+    PRIMARY KEY (`customer_id`, `policy_id`),
+    UNIQUE KEY `uq_coupon_redemptions_order` (`order_id`),
+    FOREIGN KEY (`customer_id`) REFERENCES `auth`.`customers` (`user_id`) ON DELETE CASCADE,
+    FOREIGN KEY (`policy_id`) REFERENCES `order`.`discount_policies` (`id`) ON DELETE CASCADE,
+    FOREIGN KEY (`order_id`) REFERENCES `order`.`orders` (`id`) ON DELETE CASCADE
+);
+
+-- 由既有訂單回填: 每位顧客每張折價券取最早一筆未退款的訂單
+-- (若歷史資料中同一張券被重複使用，只會記錄一筆)
+INSERT IGNORE INTO `order`.`coupon_redemptions` (`customer_id`, `policy_id`, `order_id`, `redeemed_at`)
+SELECT o.user_id, o.policy_id, MIN(o.id), MIN(o.created_at)
+FROM `order`.`orders` o
+JOIN `auth`.`customers` c ON c.user_id = o.user_id
+WHERE o.policy_id IS NOT NULL
+  AND (o.refund_status IS NULL OR o.refund_status <> 'refunded')
+GROUP BY o.user_id, o.policy_id;
@@ -0,0 +1,13 @@
+-- 結帳的 Idempotency-Key (utils/idempotency.py)，重送的結帳請求回傳原訂單
+-- 套用方式: flask --app app migrate  (於 silkroad-backend/src 底下執行)
+
+CREATE TABLE `order`.`checkout_requests` (
+    `customer_id` int NOT NULL,
+    `idempotency_key` varchar(64) NOT NULL,
+    `order_id` int NOT NULL,
+    `created_at` timestamp NOT NULL DEFAULT(now()),
+    PRIMARY KEY (`customer_id`, `idempotency_key`),
+    KEY `idx_checkout_requests_created` (`created_at`),
+    FOREIGN KEY (`customer_id`) REFERENCES `auth`.`customers` (`user_id`) ON DELETE CASCADE,
+    FOREIGN KEY (`order_id`) REFERENCES `order`.`orders` (`id`) ON DELETE CASCADE
+);
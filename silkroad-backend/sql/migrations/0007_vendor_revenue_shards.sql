@@ -0,0 +1,10 @@
+-- 熱門店家的營業額分片計數 (utils/vendor_revenue.py)，VENDOR_REVENUE_SHARDS > 0 時才會寫入
+-- 套用方式: flask --app app migrate  (於 silkroad-backend/src 底下執行)
+
+CREATE TABLE `order`.`vendor_revenue_shards` (
+    `vendor_id` int NOT NULL,
+    `shard_no` int NOT NULL,
+    `amount` int NOT NULL DEFAULT 0,
+    PRIMARY KEY (`vendor_id`, `shard_no`),
+    FOREIGN KEY (`vendor_id`) REFERENCES `auth`.`vendors` (`user_id`) ON DELETE CASCADE
+);
@@ -0,0 +1,35 @@
+-- 由既有訂單回填每日銷售 rollup (與 flask rebuild-sales-rollups 相同)，
+-- 讓 SALES_ROLLUP_ENABLED 預設開啟時，既有資料庫的銷售報表也有歷史資料
+-- 套用方式: flask --app app migrate  (於 silkroad-backend/src 底下執行，rollup 資料表由 migrate 先建立)
+
+DELETE FROM `order`.`vendor_daily_sales`;
+DELETE FROM `order`.`product_daily_sales`;
+
+INSERT INTO `order`.`vendor_daily_sales`
+    (`vendor_id`, `sales_date`, `orders_count`, `gross_revenue`, `discount`, `net_revenue`)
+SELECT t.vendor_id, t.sales_date, COUNT(*), SUM(t.gross), SUM(t.discount), SUM(t.gross - t.discount)
+FROM (
+    SELECT o.vendor_id,
+           DATE(CONVERT_TZ(o.created_at, '+00:00', '+08:00')) AS sales_date,
+           o.discount_amount AS discount,
+           COALESCE(SUM(oi.price * oi.quantity), 0) AS gross
+    FROM `order`.`orders` o
+    LEFT JOIN `order`.`order_items` oi ON oi.order_id = o.id
+    WHERE o.is_completed = true
+      AND (o.refund_status IS NULL OR o.refund_status <> 'refunded')
+    GROUP BY o.id
+) t
+GROUP BY t.vendor_id, t.sales_date;
+
+INSERT INTO `order`.`product_daily_sales`
+    (`product_id`, `sales_date`, `vendor_id`, `quantity`, `revenue`)
+SELECT oi.product_id,
+       DATE(CONVERT_TZ(o.created_at, '+00:00', '+08:00')) AS sales_date,
+       o.vendor_id,
+       SUM(oi.quantity),
+       SUM(oi.price * oi.quantity)
+FROM `order`.`order_items` oi
+JOIN `order`.`orders` o ON o.id = oi.order_id
+WHERE o.is_completed = true
+  AND (o.refund_status IS NULL OR o.refund_status <> 'refunded')
+GROUP BY oi.product_id, sales_date, o.vendor_id;
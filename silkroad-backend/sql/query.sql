@@ -1,17 +1,20 @@
+-- 會員等級對帳 (排程工作 reconcile_membership 執行同樣的 UPDATE，見 src/utils/membership.py)
 UPDATE auth.customers c
-JOIN (
+LEFT JOIN (
     SELECT
         o.user_id,
         SUM(CASE WHEN o.is_completed = true THEN 1 ELSE 0 END) AS completed_order_count
     FROM `order`.orders o
+    WHERE o.refund_status IS NULL OR o.refund_status <> 'refunded'
     GROUP BY o.user_id
 ) t ON t.user_id = c.user_id
-SET c.membership_level =
+SET c.completed_order_count = COALESCE(t.completed_order_count, 0),
+    c.membership_level =
     CASE
-        WHEN t.completed_order_count >= 100 THEN 4
-        WHEN t.completed_order_count >= 50  THEN 3
-        WHEN t.completed_order_count >= 20  THEN 2
-        WHEN t.completed_order_count >= 10  THEN 1
+        WHEN COALESCE(t.completed_order_count, 0) >= 100 THEN 4
+        WHEN COALESCE(t.completed_order_count, 0) >= 50  THEN 3
+        WHEN COALESCE(t.completed_order_count, 0) >= 20  THEN 2
+        WHEN COALESCE(t.completed_order_count, 0) >= 10  THEN 1
         ELSE 0
     END;
 -- CREATE VIEW v_會員 AS
@@ -1,15 +1,20 @@
-from flask import Flask, send_from_directory
+from flask import Flask, send_from_directory, jsonify
 from flask_cors import CORS
-from flask_apscheduler import APScheduler
-from config import init_db
-from config.mail import init_mail
+from config import init_db, db
+from config.pool import pool_stats
 from routes import user_routes, cart_routes, order_routes
 from routes import admin_routes, vendor_routes,customer_routes
 from utils import test_routes, cloudinary_routes
-from utils.tasks import cleanup_unverified_users
+from utils.job_runner import job_scheduler
+from utils.commands import register_commands
+from utils.mail_outbox import outbox_dispatcher
+from utils.server_session import init_session
+from utils.read_routing import init_read_routing
+from utils.metrics import init_metrics
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
+import threading
 
 def create_app():
     """Application Factory"""
@@ -25,14 +30,49 @@ def create_app():
     app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
     app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', os.getenv('MAIL_USERNAME'))
 
-    # Scheduler config
-    app.config['SCHEDULER_API_ENABLED'] = True
+    # Mail outbox (背景寄信) configurations
+    app.config['MAIL_OUTBOX_DISPATCHER_ENABLED'] = os.getenv('MAIL_OUTBOX_DISPATCHER_ENABLED', 'True').lower() == 'true'
+    app.config['MAIL_OUTBOX_POLL_SECONDS'] = int(os.getenv('MAIL_OUTBOX_POLL_SECONDS', 10))
+    app.config['MAIL_OUTBOX_BATCH_SIZE'] = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', 50))
+    app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', 6))
+    app.config['MAIL_OUTBOX_BACKOFF_SECONDS'] = int(os.getenv('MAIL_OUTBOX_BACKOFF_SECONDS', 30))
+
+    # Scheduler config (正式環境由 gunicorn.conf.py 關閉 API，排程器延到第一個 request 才載入)
+    app.config['SCHEDULER_API_ENABLED'] = os.getenv('SCHEDULER_API_ENABLED', 'True').lower() == 'true'
+    app.config['SCHEDULER_ENABLED'] = os.getenv('SCHEDULER_ENABLED', 'True').lower() == 'true'
+    app.config['CLEANUP_USERS_INTERVAL_MINUTES'] = int(os.getenv('CLEANUP_USERS_INTERVAL_MINUTES', 30))
+    app.config['MEMBERSHIP_RECONCILE_INTERVAL_MINUTES'] = int(os.getenv('MEMBERSHIP_RECONCILE_INTERVAL_MINUTES', 1440))
+    app.config['CHECKOUT_REQUESTS_PURGE_INTERVAL_MINUTES'] = int(os.getenv('CHECKOUT_REQUESTS_PURGE_INTERVAL_MINUTES', 60))
+    app.config['VENDOR_REVENUE_RECONCILE_INTERVAL_MINUTES'] = int(os.getenv('VENDOR_REVENUE_RECONCILE_INTERVAL_MINUTES', 1440))
+
+    # 結帳 Idempotency-Key 保留時間 (小時)
+    app.config['CHECKOUT_IDEMPOTENCY_TTL_HOURS'] = int(os.getenv('CHECKOUT_IDEMPOTENCY_TTL_HOURS', 24))
+
+    # 熱門店家營業額分片數 (0 = 關閉)，SHARDED_VENDORS 為逗號分隔的店家 id (空白 = 全部店家)
+    app.config['VENDOR_REVENUE_SHARDS'] = int(os.getenv('VENDOR_REVENUE_SHARDS', 0))
+    app.config['VENDOR_REVENUE_SHARDED_VENDORS'] = {
+        int(v) for v in os.getenv('VENDOR_REVENUE_SHARDED_VENDORS', '').split(',') if v.strip()
+    }
+
+    # 銷售報表改讀每日 rollup (既有資料庫由 migration 0008 回填，之後也可用 flask rebuild-sales-rollups 重建)
+    app.config['SALES_ROLLUP_ENABLED'] = os.getenv('SALES_ROLLUP_ENABLED', 'True').lower() == 'true'
 
     app.config["SESSION_COOKIE_NAME"] = "flask_session"
     app.config['SESSION_COOKIE_HTTPONLY'] = True  # 防止 JavaScript 存取 cookie
     app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # 開發環境用 Lax,跨域部署時用 None
     app.config['SESSION_COOKIE_SECURE'] = False  # 開發環境用 False,生產環境用 True(需要 HTTPS)
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)  # Session 有效期
+
+    # Server-side session: cookie 只放 session id (memory / sqlite / redis / cookie)
+    # sqlite 只存在單一機器上，部署超過一台機器時必須設 SESSION_BACKEND=redis，否則 session 會各自分開
+    app.config['SESSION_BACKEND'] = os.getenv('SESSION_BACKEND', 'sqlite')
+    app.config['SESSION_SQLITE_PATH'] = os.getenv('SESSION_SQLITE_PATH')
+    app.config['SESSION_REDIS_URL'] = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+    init_session(app)
+
+    # 唯讀 API 改讀 replica (DATABASE_READER_URL)，寫入後 N 秒內該使用者仍讀 primary
+    app.config['DB_READ_YOUR_WRITES_SECONDS'] = int(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5))
+    init_read_routing(app)
     #app.config['SQLALCHEMY_ECHO'] = True
     
     CORS(app, 
@@ -46,29 +86,19 @@ def create_app():
     print("[app] 初始化資料庫...")
     init_db(app)
 
-    # 初始化郵件服務
-    print("[app] 初始化郵件服務...")
-    init_mail(app)
+    # 郵件服務: request 只寫 outbox，Flask-Mail 由背景 dispatcher 第一次寄信時才初始化
+    outbox_dispatcher.init_app(app)
 
-    # 初始化排程器
-    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
-        print("[app] 初始化排程器...")
-        scheduler = APScheduler()
-        scheduler.init_app(app)
-        
-        # 註冊定期任務 (每小時執行一次)
-        scheduler.add_job(
-            id='cleanup_users',
-            func=cleanup_unverified_users,
-            args=[app],
-            trigger='interval',
-            minutes=30
-        )
-        scheduler.start()
-        
-        # 啟動時立即執行一次清理
-        print("[app] 執行啟動清理...")
-        cleanup_unverified_users(app)
+    # 初始化排程器 (第一個 request 進來時啟動，多個 worker 以 advisory lock 選出一個執行)
+    job_scheduler.init_app(app)
+
+    # 每個 request 的耗時 / SQL 數量 / 回應大小 (GET /metrics)
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['METRICS_DEBUG_QUERIES'] = os.getenv('METRICS_DEBUG_QUERIES', 'False').lower() == 'true'
+    init_metrics(app)
+
+    # 註冊 CLI 指令
+    register_commands(app)
 
     # 註冊路由
     print("[app] 註冊路由...")
@@ -85,6 +115,22 @@ def create_app():
     def index():
         return "test"
 
+    # Liveness: process 還活著即可，不碰資料庫 (給 load balancer / 平台頻繁探測)
+    @app.route("/healthz")
+    def healthz():
+        return "ok", 200, {"Cache-Control": "no-store"}
+
+    # Readiness: 資料庫可連線才接流量
+    @app.route("/readyz")
+    def readyz():
+        try:
+            db.session.execute(db.text("SELECT 1"))
+        except Exception as e:
+            return jsonify({"status": "unavailable", "error": str(e)}), 503, {"Cache-Control": "no-store"}
+        finally:
+            db.session.remove()
+        return jsonify({"status": "ok", "pool": pool_stats(db.engine)}), 200, {"Cache-Control": "no-store"}
+
     @app.route("/uploads/<path:filename>")
     def uploaded_file(filename):
         uploads_dir = os.path.join(os.path.dirname(__file__), "..", "uploads")
@@ -107,10 +153,29 @@ def route_info_printer(app, bool_debug: bool = True):
     print("[app] ===================================")
 
 
-# 創建應用實例
-app = create_app()
+# 應用實例在第一次存取 app.app 時才建立 (`from app import app`、gunicorn "app:app"、flask --app app 皆同)，
+# 只 import 這個模組 (例如使用 create_app 的工具) 不會連資料庫
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_app():
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = create_app()
+    return _app
+
+
+def __getattr__(name):
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
+    app = get_app()
     # 只在子進程中打印路由信息
     if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
         route_info_printer(app, True)
@@ -1,3 +1,3 @@
-from config.database import db, init_db
+from config.database import db, init_db, warm_up_db
 
-__all__ = ['db', 'init_db']
\ No newline at end of file
+__all__ = ['db', 'init_db', 'warm_up_db']
\ No newline at end of file
@@ -3,10 +3,13 @@ from flask import Flask
 import pymysql
 import os
 from dotenv import load_dotenv
+from config.pool import engine_options_from_env, warm_up_count, warm_up_pool
+from config.routing import RoutingSession, READER_BIND
 
 pymysql.install_as_MySQLdb()
 
-db = SQLAlchemy()
+# RoutingSession: @read_only 的 handler 改讀 reader bind (見 config/routing.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 """ Initialize the database with the Flask app. 
@@ -21,8 +24,41 @@ def init_db(app: Flask):
     load_dotenv()
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # 連線池設定 (環境變數見 config/pool.py)，app.config 內已有的設定優先
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options_from_env(app.config['SQLALCHEMY_DATABASE_URI']),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
+    # 讀取用 replica (可選)，連線池設定與 primary 相同
+    reader_url = os.getenv('DATABASE_READER_URL')
+    if reader_url:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[READER_BIND] = {
+            'url': reader_url,
+            **engine_options_from_env(reader_url),
+        }
     db.init_app(app)
 
     print("[database] 資料庫已初始化")
+    # 開發時啟動即建立缺少的資料表；正式環境 (gunicorn.conf.py) 關閉，
+    # 改由部署時執行 flask --app app migrate，避免每個 worker 啟動都檢查一次所有資料表
+    if os.getenv('DB_CREATE_ALL', 'True').lower() == 'true':
+        with app.app_context():
+            db.create_all()
+
+
+def warm_up_db(app: Flask):
+    """
+    預先建立 DB_POOL_WARMUP 條連線 (在 worker 開始接流量前呼叫，例如 gunicorn post_fork)
+    連不上資料庫時只印出警告，交給 /readyz 回報
+    """
+    count = warm_up_count(app)
+    if not count:
+        return 0
     with app.app_context():
-        db.create_all()
+        try:
+            opened = warm_up_pool(db.engine, count)
+        except Exception as e:
+            print(f"[database] 連線池預熱失敗: {e}")
+            return 0
+    print(f"[database] 連線池預熱完成: {opened} 條連線")
+    return opened
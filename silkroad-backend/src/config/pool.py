@@ -0,0 +1,120 @@
+"""
+資料庫連線池設定、統計與預熱
+
+SQLALCHEMY_ENGINE_OPTIONS 由環境變數組成 (只套用在 MySQL):
+
+    DB_POOL_SIZE          常駐連線數 (預設 10，至少要 >= GUNICORN_THREADS)
+    DB_MAX_OVERFLOW       尖峰時可額外開的連線數 (預設 10)
+    DB_POOL_TIMEOUT       連線池滿時最多等待幾秒 (預設 10)
+    DB_POOL_RECYCLE       連線用多久後重建，需小於 MySQL wait_timeout (預設 280 秒)
+    DB_POOL_PRE_PING      取出連線前先 ping，自動換掉已被 MySQL 關閉的連線 (預設 True)
+    DB_CONNECT_TIMEOUT    建立連線的 timeout (預設 5 秒)
+    DB_READ_TIMEOUT       等待查詢結果的 timeout (預設 30 秒)
+    DB_WRITE_TIMEOUT      送出查詢的 timeout (預設 30 秒)
+    DB_POOL_WARMUP        啟動時預先建立的連線數 (預設 = DB_POOL_SIZE，0 表示不預熱)
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy.pool import QueuePool
+
+
+def _env_bool(env, name, default):
+    return str(env.get(name, default)).lower() == "true"
+
+
+def engine_options_from_env(database_url, env=None):
+    """回傳 SQLALCHEMY_ENGINE_OPTIONS；非 MySQL 回傳空 dict"""
+    env = os.environ if env is None else env
+    if not database_url or not database_url.startswith("mysql"):
+        return {}
+
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": int(env.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(env.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(env.get("DB_POOL_TIMEOUT", 10)),
+        "pool_recycle": int(env.get("DB_POOL_RECYCLE", 280)),
+        "pool_pre_ping": _env_bool(env, "DB_POOL_PRE_PING", "True"),
+        "connect_args": {
+            "connect_timeout": int(env.get("DB_CONNECT_TIMEOUT", 5)),
+            "read_timeout": int(env.get("DB_READ_TIMEOUT", 30)),
+            "write_timeout": int(env.get("DB_WRITE_TIMEOUT", 30)),
+        },
+    }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool + 取得連線的等待時間統計 (包含連線池已滿時的排隊時間與建立新連線的時間)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def recreate(self):
+        # dispose() 會以 recreate() 建立新的 pool，統計數字沿用
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.wait_seconds_total = self.wait_seconds_total
+        pool.wait_seconds_max = self.wait_seconds_max
+        pool.timeouts = self.timeouts
+        return pool
+
+
+def pool_stats(engine):
+    """連線池目前狀態 (dict)，不支援的欄位不列出"""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    if isinstance(pool, TimedQueuePool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_seconds_total": round(pool.wait_seconds_total, 6),
+            "wait_seconds_max": round(pool.wait_seconds_max, 6),
+            "wait_seconds_avg": round(pool.wait_seconds_total / pool.checkouts, 6) if pool.checkouts else 0.0,
+        })
+    return stats
+
+
+def warm_up_pool(engine, count):
+    """同時取出 count 條連線再歸還，讓第一批請求不必等 TCP / 認證，回傳實際建立的連線數"""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.raw_connection())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def warm_up_count(app):
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    if "pool_size" not in options:
+        return 0
+    return int(os.getenv("DB_POOL_WARMUP", options["pool_size"]))
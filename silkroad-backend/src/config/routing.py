@@ -0,0 +1,47 @@
+"""
+Read replica routing: 唯讀 API 的查詢送到 reader bind (DATABASE_READER_URL)
+
+沒有設定 DATABASE_READER_URL 時沒有 reader bind，一切照舊走 primary。
+以下情況一律走 primary:
+  - handler 沒有標記 @read_only (utils.read_routing)
+  - flush 與 INSERT / UPDATE / DELETE、SELECT ... FOR UPDATE、text() 語句
+  - 同一個 request 已經寫入過 (之後的讀取要看得到剛寫的資料)
+  - read-your-writes: 該使用者最近寫入過 (g.db_force_primary，由 utils.read_routing 依 cookie 設定)
+  - request 以外 (CLI、排程工作)
+"""
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.elements import TextClause
+
+READER_BIND = "reader"
+
+
+def _is_write(clause):
+    return clause is not None and getattr(clause, "is_dml", False)
+
+
+def _needs_primary(clause):
+    """寫入、鎖定讀取，以及無法判斷內容的 text() 語句"""
+    if clause is None:
+        return False
+    if _is_write(clause) or isinstance(clause, TextClause):
+        return True
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(Session):
+
+    def _use_reader(self, clause):
+        if READER_BIND not in self._db.engines or not has_app_context():
+            return False
+        if not g.get("db_read_only") or g.get("db_wrote") or g.get("db_force_primary"):
+            return False
+        return not self._flushing and not _needs_primary(clause)
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_reader(clause):
+            return self._db.engines[READER_BIND]
+        if has_app_context() and (self._flushing or _is_write(clause)):
+            g.db_wrote = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
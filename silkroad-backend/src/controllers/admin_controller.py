@@ -4,7 +4,15 @@ from models import Admin,Vendor,Customer
 from models import Block_Record,System_Announcement
 from models import Product, Cart_Item
 from config import db
-from utils import require_login
+from utils import (
+    require_login,
+    read_only,
+    menu_snapshots,
+    vendor_list_snapshots,
+    announcement_snapshots,
+    PUBLIC_VENDORS_KEY,
+    ANNOUNCEMENTS_KEY,
+)
 
 def _toggle_user_status(target_active_status):
     """
@@ -79,6 +87,9 @@ def _toggle_user_status(target_active_status):
 
     try:
         db.session.commit()
+        if target_type == "Vendor":
+            menu_snapshots.bump(int(target_user_id))
+            vendor_list_snapshots.bump(PUBLIC_VENDORS_KEY)
         action = "unblocked" if target_active_status else "blocked"
         
         return jsonify({
@@ -136,6 +147,7 @@ def post_announcement():
     try:
         db.session.add(new_announcement)
         db.session.commit()
+        announcement_snapshots.bump(ANNOUNCEMENTS_KEY)
         
         # 成功回傳
         return jsonify({
@@ -189,6 +201,7 @@ def update_announcement(announcement_id):
     try:
         announcement.message = message
         db.session.commit()
+        announcement_snapshots.bump(ANNOUNCEMENTS_KEY)
 
         return jsonify({
             "success": True,
@@ -244,6 +257,7 @@ def delete_announcement(announcement_id):
     try:
         db.session.delete(announcement)
         db.session.commit()
+        announcement_snapshots.bump(ANNOUNCEMENTS_KEY)
 
         return jsonify({
             "success": True,
@@ -260,6 +274,7 @@ def delete_announcement(announcement_id):
 # ... (保留你原有的 import 和函式)
 
 @require_login(role=["admin"])
+@read_only
 def get_all_customers():
     """
     列出所有已驗證的顧客資料
@@ -293,6 +308,7 @@ def get_all_customers():
 
 
 @require_login(role=["admin"])
+@read_only
 def get_all_vendors():
     """
     列出所有已驗證的店家資料
@@ -325,6 +341,7 @@ def get_all_vendors():
 
 
 # @require_login(role=["admin"])
+@read_only
 def get_all_announcements():
     """
     列出所有系統公告 (建議依時間倒序排列)，包含管理員名字
@@ -360,6 +377,7 @@ def get_all_announcements():
 
 
 @require_login(role=["admin"])
+@read_only
 def get_all_users():
     """
     查詢所有使用者（包含 Admin, Vendor, Customer）
@@ -399,6 +417,7 @@ def get_all_users():
 
 
 @require_login(role=["admin"])
+@read_only
 def get_block_records():
     """
     查詢所有封鎖紀錄
@@ -1,13 +1,19 @@
 from flask import jsonify, request, session
+from sqlalchemy import select
 from config import db
-from models import Cart_Item, Cart, Customer, Product, Sugar_Option, Ice_Option, Sizes_Option
+from models import Cart_Item, Cart, Customer, Sugar_Option, Ice_Option
 from utils import require_login
+from utils.pricing import price_lines
+from utils.cart_merge import add_cart_lines
 
 import uuid
 
 def get_user_cart(customer_id, vendor_id):
     
-    cart = Cart.query.get(customer_id)
+    # 鎖住購物車直到這個 request commit，與結帳 (order_controller.lock_cart) 互相排隊
+    cart = db.session.execute(
+        select(Cart).where(Cart.customer_id == customer_id).with_for_update()
+    ).scalar_one_or_none()
     if cart:
         return cart
     else:
@@ -67,34 +73,16 @@ def add_to_cart():
             "success": False
         }), 400
     
-    existing_item = Cart_Item.query.filter_by(
-    cart_id=customer_id,
-    product_id=product_id,
-    selected_sugar=selected_sugar,
-    selected_ice=selected_ice,
-    selected_size=selected_size_str
-    ).first()
-
-    if existing_item:
-        # 如果找到了，就直接增加數量，不新增紀錄
-        existing_item.quantity += quantity
-        db.session.commit()
-        return jsonify({"message": "商品數量已更新", "success": True}), 200
-    
-
-    new_cart_item = Cart_Item(
-        cart_id = cart_id,
-        product_id = product_id,
-        quantity = quantity,
-        selected_sugar = selected_sugar,
-        selected_ice = selected_ice,
-        
-        # [關鍵修改] 這裡一定要存字串，不能存物件
-        selected_size = selected_size_str 
-    )
-
     try:
-        db.session.add(new_cart_item)
+        # 與 merge_guest_cart 相同，一律以 upsert 寫入：規格不存在就新增，已存在 (包含同時加入的請求) 就累加數量
+        add_cart_lines(cart_id, [{
+            "product_id": product_id,
+            "quantity": quantity,
+            "selected_sugar": selected_sugar,
+            "selected_ice": selected_ice,
+            # [關鍵修改] 這裡一定要存字串，不能存物件
+            "selected_size": selected_size_str,
+        }])
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -171,30 +159,18 @@ def view_cart(cart_id : int):
         cart_items = current_cart.items 
         
         result_list = []
-        total_price = 0
 
-        for item in cart_items:
-            product = item.product
+        # 一次查詢算出所有品項的單價 / 小計 (商品基本價 + 尺寸加價)
+        priced, total_price = price_lines(
+            (item.product_id, item.selected_size, item.quantity) for item in cart_items
+        )
 
-            if product:
-                # --- 修改開始：根據新 SQL 結構查詢加價 ---
-                # 直接從資料庫找出該產品對應的尺寸選項
-                size_opt = Sizes_Option.query.filter_by(
-                    product_id=item.product_id, 
-                    options=item.selected_size
-                ).first()
-
-                # 取得該尺寸專屬的 price_step，若找不到則為 0
-                size_delta = size_opt.price_step if size_opt else 0
-                
-                # 計算正確單價 (產品基本價 + 尺寸加價)
-                final_unit_price = product.price + size_delta
-                
-                # 計算小計
-                item_sub_price = final_unit_price * item.quantity
-                # --- 修改結束 ---
+        for item, line in zip(cart_items, priced):
+            product = line.product
 
-                total_price += item_sub_price
+            if product:
+                final_unit_price = line.unit_price
+                item_sub_price = line.subtotal
 
                 result_list.append({
                     "cart_item_id": item.id,
@@ -343,30 +319,32 @@ def update_cart_item():
                     "message": "數量必須為正整數",
                     "success": False
                 }), 400
-            cart_item.quantity = quantity
-
-        # Update customization options if provided
-        if selected_sugar is not None:
-            cart_item.selected_sugar = selected_sugar
-
-        if selected_ice is not None:
-            cart_item.selected_ice = selected_ice
 
-        if selected_size is not None:
-            cart_item.selected_size = selected_size
+        new_quantity = quantity if quantity is not None else cart_item.quantity
+        new_sugar = selected_sugar if selected_sugar is not None else cart_item.selected_sugar
+        new_ice = selected_ice if selected_ice is not None else cart_item.selected_ice
+        new_size = selected_size if selected_size is not None else cart_item.selected_size
 
+        # 先找「改完之後」是否會與其他品項同規格 (唯一鍵)，
+        # 必須在修改 cart_item 之前查，否則 autoflush 會先寫入而撞到唯一鍵
         duplicate_item = Cart_Item.query.filter(
             Cart_Item.cart_id == customer_id,
             Cart_Item.product_id == cart_item.product_id,
-            Cart_Item.selected_sugar == cart_item.selected_sugar,
-            Cart_Item.selected_ice == cart_item.selected_ice,
-            Cart_Item.selected_size == cart_item.selected_size,
+            Cart_Item.selected_sugar == new_sugar,
+            Cart_Item.selected_ice == new_ice,
+            Cart_Item.selected_size == new_size,
             Cart_Item.id != cart_item.id
         ).first()
 
         if duplicate_item:
-            duplicate_item.quantity += cart_item.quantity
+            # 合併到既有品項
+            duplicate_item.quantity += new_quantity
             db.session.delete(cart_item)
+        else:
+            cart_item.quantity = new_quantity
+            cart_item.selected_sugar = new_sugar
+            cart_item.selected_ice = new_ice
+            cart_item.selected_size = new_size
 
         # Commit changes
         db.session.commit()
@@ -490,37 +468,27 @@ def view_cart_guest(*args, **kwargs):
             "total_amount": 0
         }), 200
 
-    total_price = 0
     result = []
-    
-    for item in session["cart"]["items"]:
-        try:
-            product = Product.query.get(item["product_id"])
-        except Exception as e:
-            return jsonify({
-                "message": str(e),
-                "success": False
-            }), 500
+    items = session["cart"]["items"]
 
+    # 一次查詢算出所有品項的單價 / 小計 (與會員購物車、結帳共用同一套計價)
+    try:
+        priced, total_price = price_lines(
+            (item["product_id"], item["selected_size"], item["quantity"]) for item in items
+        )
+    except Exception as e:
+        return jsonify({
+            "message": str(e),
+            "success": False
+        }), 500
+
+    for item, line in zip(items, priced):
+        product = line.product
         if not product:
             continue
 
-        size_opt = Sizes_Option.query.filter_by(
-            product_id=item["product_id"], 
-            options=item["selected_size"]
-        ).first()
-
-        # 2. 取得該尺寸對應的加價，找不到則為 0
-        size_delta = size_opt.price_step if size_opt else 0
-        
-        # 3. 算出最終單價 (原價 + 尺寸加價)
-        final_unit_price = product.price + size_delta
-        
-        # 4. 算出該項目的小計
-        item_sub_price = final_unit_price * item["quantity"]
-        # ----------------------------------------
-
-        total_price += item_sub_price
+        final_unit_price = line.unit_price
+        item_sub_price = line.subtotal
 
         result.append({
             "cart_item_id": item["tmp_cart_item_id"],
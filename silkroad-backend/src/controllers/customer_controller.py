@@ -3,7 +3,8 @@ from flask import request, jsonify, session
 from models import Order 
 from models.store.review import Review
 from config import db
-from utils import require_login
+from utils import require_login, vendor_list_snapshots, PUBLIC_VENDORS_KEY
+from utils.vendor_rating import add_review
 
 @require_login(role=["customer"])
 def post_vendor_review():
@@ -61,7 +62,11 @@ def post_vendor_review():
 
     try:
         db.session.add(new_review)
+        # 同一個 transaction 更新店家評分彙總
+        add_review(order.vendor_id, rating)
         db.session.commit()
+        # 評分平均會改變，公開店家列表快照失效
+        vendor_list_snapshots.bump(PUBLIC_VENDORS_KEY)
 
         return jsonify({
             "data": [{
@@ -1,73 +1,69 @@
 from flask import jsonify, request,session
 from config import db
-from models import Cart_Item, Cart, Order, Order_Item, Discount_Policy, Customer, Vendor,Review, Sizes_Option
-from datetime import date, datetime
-from sqlalchemy import or_
+from models import Cart_Item, Cart, Order, Order_Item, Customer, Vendor,Review
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload
+from utils import sales_rollup, membership, discount_service, idempotency, vendor_revenue
+from utils.time_range import parse_local_date_range
+from utils.pricing import price_lines
 
-def do_discount(total_price_accumulated, policy_id, user_id):
+def do_discount(total_price_accumulated, policy_id, user_id, vendor_id):
+    # 折價券驗證與計算 (結帳時直接讀取折價券列，不使用列表的快取)
+    return discount_service.apply_discount(total_price_accumulated, policy_id, user_id, vendor_id)
 
-    if not policy_id:
-        return total_price_accumulated
 
-    discount = Discount_Policy.query.get(policy_id)
-    if not discount:
-        raise ValueError("無效的折價券 ID")
-
-    customer = Customer.query.get(user_id)
-    if not customer:
-        raise ValueError("找不到該顧客資訊，無法驗證會員等級")
-
-    membership_level = customer.membership_level
-
-    today = date.today()
-
-    if discount.is_available == False:
-        raise ValueError("折價券已停用")
-
-    if discount.start_date and discount.start_date > today:
-        raise ValueError(f"折價券尚未生效，請於 {discount.start_date.isoformat()} 後使用")
-
-    if discount.expiry_date and discount.expiry_date < today:
-         raise ValueError("折價券已過期")
-
-    if membership_level < discount.membership_limit:
-            raise ValueError("會員資格不符")
-
-    if discount.min_purchase and total_price_accumulated < discount.min_purchase:
-        raise ValueError(f"未達折價券低消限制 (${discount.min_purchase})")
-
-    # --- 檢查折價券是否已被使用過 ---
-    existing_order = Order.query.filter_by(
-        user_id=user_id,
-        policy_id=policy_id
-    ).filter(
-        # 修正：正確處理 NULL 值，只排除明確標記為 'refunded' 的訂單
-        or_(Order.refund_status.is_(None), Order.refund_status != 'refunded')
-    ).first()
-
-    if existing_order:
-        raise ValueError("此折價券已使用過，不可重複使用")
-    
-    discount_amount = 0
-    discount_type = str(discount.type).lower()
-
-    if str(discount_type) == 'percent':
-        # value 是整數（例如 20 代表 20%），需要除以 100 轉換為小數
-        discount_amount = total_price_accumulated * (discount.value / 100)
-    elif str(discount_type) == 'fixed':
-        discount_amount = discount.value
-    
-    discount_amount = int(discount_amount)
+def lock_cart(customer_id):
+    """
+    SELECT ... FOR UPDATE 鎖住購物車，同一購物車的併發結帳 (重複點擊、重送) 在這裡排隊，
+    前一筆 commit 後 (購物車已刪除) 才會繼續。需為結帳 transaction 的第一個查詢
+    """
+    return db.session.execute(
+        select(Cart).where(Cart.customer_id == customer_id).with_for_update().execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+
+
+def deduct_balance(customer_id, amount):
+    """以條件式 UPDATE 原子地扣除儲值餘額，餘額不足時 raise ValueError (不需要先鎖顧客資料)"""
+    customers = Customer.__table__
+    result = db.session.execute(
+        update(customers)
+        .where(customers.c.user_id == customer_id, customers.c.stored_balance >= amount)
+        .values(stored_balance=customers.c.stored_balance - amount)
+    )
+    if result.rowcount == 0:
+        balance = db.session.execute(
+            select(customers.c.stored_balance).where(customers.c.user_id == customer_id)
+        ).scalar()
+        if balance is None:
+            raise ValueError("找不到顧客資訊")
+        raise ValueError(f"儲值餘額不足！目前餘額：${balance}，訂單金額：${amount}")
+
+
+def credit_balance(customer_id, amount):
+    """以單一 UPDATE 原子地加回儲值餘額 (退款)，回傳是否找到顧客"""
+    customers = Customer.__table__
+    result = db.session.execute(
+        update(customers)
+        .where(customers.c.user_id == customer_id)
+        .values(stored_balance=customers.c.stored_balance + amount)
+    )
+    return result.rowcount == 1
 
-    if discount.max_discount is not None:
-        if discount_amount > discount.max_discount:
-            discount_amount = discount.max_discount
 
-    final_price = total_price_accumulated - discount_amount
-    return int(max(final_price, 0))
+def replay_order(order_id):
+    """相同 Idempotency-Key 的重送: 回傳原本的訂單"""
+    order = db.session.get(Order, order_id)
+    return jsonify({
+                    "order_id": order.id,
+                    "total_amount": order.total_price,
+                    "message": "訂單建立成功且已結帳",
+                    "success": True,
+                    "replayed": True
+                    }), 201, {"Idempotent-Replayed": "true"}
 
 
-def generate_new_order(cart, policy_id, note, payment_methods, is_delivered, address_info):
+def generate_new_order(cart, policy_id, note, payment_methods, is_delivered, address_info, idempotency_key=None):
     user_id = cart.customer_id
     vendor_id = cart.vendor_id
     total_price_accumulated = 0
@@ -75,35 +71,25 @@ def generate_new_order(cart, policy_id, note, payment_methods, is_delivered, add
     try:
         # --- 步驟 1: 先計算購物車總價（不創建訂單） ---
         item_details = []
+        cart_items = cart.items
 
-        for item in cart.items:
-            product = item.product
-            if not product:
-                raise ValueError(f"商品 ID {item.product_id} 不存在")
-
-            # --- 修改開始：根據新 SQL 結構查詢加價 ---
-            # 直接從 Sizes_Option 表中查找該產品對應的尺寸資料
-            size_opt = Sizes_Option.query.filter_by(
-                product_id=item.product_id, 
-                options=item.selected_size
-            ).first()
-
-            # 取得該尺寸專屬的 price_step，若找不到則預設加價為 0
-            size_delta = size_opt.price_step if size_opt else 0
-            # --- 修改結束 ---
+        # 一次查詢算出所有品項的單價 (與購物車頁面共用同一套計價)
+        priced, total_price_accumulated = price_lines(
+            (item.product_id, item.selected_size, item.quantity) for item in cart_items
+        )
 
-            # 計算單價與累加總價
-            unit_price = product.price + size_delta
-            total_price_accumulated += unit_price * item.quantity
+        for item, line in zip(cart_items, priced):
+            if not line.product:
+                raise ValueError(f"商品 ID {item.product_id} 不存在")
 
             # 暫存計算好的結果，確保後續寫入 Order_Item 時價格一致
             item_details.append({
                 "item_obj": item,
-                "calculated_unit_price": unit_price
+                "calculated_unit_price": line.unit_price
             })
 
         # --- 步驟 2: 驗證並計算折扣（在創建訂單之前） ---
-        final_price = do_discount(total_price_accumulated, policy_id, user_id)
+        final_price = do_discount(total_price_accumulated, policy_id, user_id, vendor_id)
 
         # --- 步驟 3: 折扣驗證通過後，才創建訂單 ---
         new_order = Order(
@@ -125,22 +111,21 @@ def generate_new_order(cart, policy_id, note, payment_methods, is_delivered, add
         db.session.add(new_order)
         db.session.flush()
 
+        # 記錄 Idempotency-Key (主鍵衝突代表相同的請求已經完成結帳)
+        if idempotency_key:
+            idempotency.record(user_id, idempotency_key, new_order.id)
+
+        # 記錄折價券使用 (主鍵衝突代表同一張券已被其他訂單使用)
+        if policy_id:
+            discount_service.redeem(user_id, policy_id, new_order.id)
+
         # --- 步驟 4: 創建訂單項目 ---
         for detail in item_details:
             store_and_calculate_item(new_order, detail["item_obj"], detail["calculated_unit_price"])
 
-        # --- 步驟 5: 如果使用儲值餘額支付，扣除餘額 ---
+        # --- 步驟 5: 如果使用儲值餘額支付，扣除餘額 (放在最後，顧客資料列的鎖持有時間最短) ---
         if payment_methods == 'button':
-            customer = Customer.query.filter_by(user_id=user_id).first()
-            if not customer:
-                raise ValueError("找不到顧客資訊")
-
-            # 檢查餘額是否足夠
-            if customer.stored_balance < final_price:
-                raise ValueError(f"儲值餘額不足！目前餘額：${customer.stored_balance}，訂單金額：${final_price}")
-
-            # 扣除餘額
-            customer.stored_balance -= final_price
+            deduct_balance(user_id, final_price)
 
         db.session.delete(cart)
         db.session.commit()
@@ -150,7 +135,11 @@ def generate_new_order(cart, policy_id, note, payment_methods, is_delivered, add
                         "message": "訂單建立成功且已結帳",                  
                         "success": True
                         }), 201
-    
+
+    except idempotency.DuplicateRequest:
+        db.session.rollback()
+        return replay_order(idempotency.find_order(user_id, idempotency_key))
+
     except ValueError as ve:
         db.session.rollback()
         return jsonify({"message": str(ve), "success": False}), 400
@@ -242,6 +231,7 @@ def trans_to_order():
     "payment_methods":enum('cash','button'),
     "is_delivered":bool,
     "shipping_address":string (外送時必填)
+    "idempotency_key":string (optional，也可用 Idempotency-Key header)
     }
     """
 
@@ -256,7 +246,20 @@ def trans_to_order():
         return jsonify({"message": "缺少 customer_id 或 vendor_id ",
                         "success": False}), 400
 
-    cart = Cart.query.get(customer_id)
+    try:
+        idempotency_key = idempotency.request_key(data)
+    except ValueError as ve:
+        return jsonify({"message": str(ve), "success": False}), 400
+
+    # 結帳在同一個 transaction 內完成，第一步先鎖住購物車
+    cart = lock_cart(customer_id)
+
+    # 相同 key 已經結帳過 (在取得鎖之後查，才看得到前一筆剛 commit 的結果)
+    if idempotency_key:
+        order_id = idempotency.find_order(customer_id, idempotency_key)
+        if order_id:
+            db.session.rollback()
+            return replay_order(order_id)
 
     if not cart:
         return jsonify({"message": "購物車中沒有商品",
@@ -304,7 +307,7 @@ def trans_to_order():
         address_info = None
 
     # --- [修改 3] 將 address_info 傳遞給下一個函式 ---
-    return generate_new_order(cart, policy_id, note, payment_methods, is_delivered, address_info)
+    return generate_new_order(cart, policy_id, note, payment_methods, is_delivered, address_info, idempotency_key)
 
 def view_order():
     data = request.get_json()
@@ -413,11 +416,22 @@ def update_orderinfo():
         return jsonify({"message": "order_id為空",
                         "success": False}), 400
     
-    order = Order.query.filter_by(id=order_id).first()
+    # 鎖住訂單直到 commit: 併發的完成 / 退款請求在這裡排隊，
+    # 後到的一方讀到已更新的狀態，rollup / 會員 / 營業額 / 折價券的增量不會重複套用
+    order = (
+        Order.query.filter_by(id=order_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
     if not order:
         return jsonify({"message": f"找不到 ID 為 {order_id} 的訂單",
                         "success": False}), 404
     
+    # 記下更新前是否計入營收，commit 前比對後更新銷售 rollup
+    counted_before = sales_rollup.is_counted(order)
+    refunded_before = order.refund_status == 'refunded'
+
     refund_status = data.get("refund_status")
     
     refund_at = data.get("refund_at") #格式： YYYY-MM-DD HH:mm:ss
@@ -449,21 +463,11 @@ def update_orderinfo():
 
             # 如果是儲值金支付，退款到顧客帳戶
             if order.payment_methods == 'button':
-                customer = Customer.query.filter_by(user_id=order.user_id).first()
-                if not customer:
+                if not credit_balance(order.user_id, order.total_price):
+                    db.session.rollback()
                     return jsonify({"message": "找不到顧客資訊",
                                     "success": False}), 404
 
-                refund_amount = order.total_price
-                customer.stored_balance += refund_amount
-
-            # 如果訂單已完成，減少商家營業額
-            if order.is_completed:
-                vendor = Vendor.query.filter_by(user_id=order.vendor_id).first()
-                if vendor:
-                    revenue_decrease = order.total_price
-                    vendor.revenue -= revenue_decrease
-
         elif refund_status != 'refunded' and refund_at is not None:
              return jsonify({"message": "refund_status 不為 'refunded'",
                              "success": False}), 400
@@ -475,35 +479,6 @@ def update_orderinfo():
                 return jsonify({"message": "is_completed 必須是bool",
                                 "success": False}), 400
 
-            # 如果訂單從未完成變為完成，增加商家營業額
-            if is_completed and not order.is_completed:
-                vendor = Vendor.query.filter_by(user_id=order.vendor_id).first()
-                if vendor:
-                    revenue_increase = order.total_price
-                    vendor.revenue += revenue_increase
-                    
-                # --- 更新會員等級 ---
-                customer = Customer.query.filter_by(user_id=order.user_id).first()
-                if customer:
-                    # 查詢該顧客已完成的訂單數量
-                    completed_orders_count = (
-                        Order.query
-                        .filter_by(user_id=order.user_id, is_completed=True)
-                        .count()
-                    )
-
-                    # 根據規則更新 membership_level
-                    if completed_orders_count >= 100:
-                        customer.membership_level = 4
-                    elif completed_orders_count >= 50:
-                        customer.membership_level = 3
-                    elif completed_orders_count >= 20:
-                        customer.membership_level = 2
-                    elif completed_orders_count >= 10:
-                        customer.membership_level = 1
-                    else:
-                        customer.membership_level = 0
-
             order.is_completed = is_completed
 
         if is_delivered is not None:
@@ -517,6 +492,22 @@ def update_orderinfo():
                 return jsonify({"message": "deliver_status 傳值錯誤，必須是 'delivering', 'delivered' 或 None",
                                 "success": False}), 400
             order.deliver_status = deliver_status
+
+        counted_after = sales_rollup.is_counted(order)
+        if counted_after != counted_before:
+            sales_rollup.apply_order(order, 1 if counted_after else -1)
+            # 完成 / 退款: 原子地調整顧客完成訂單數與會員等級
+            membership.apply_completion(order.user_id, 1 if counted_after else -1)
+            # 商家營業額: 原子地累加 (熱門店家寫入分片)
+            vendor_revenue.apply_revenue(order.vendor_id, order.total_price if counted_after else -order.total_price)
+
+        # 退款釋放折價券；退款被撤回時重新佔用 (已被其他訂單使用則失敗)
+        refunded_after = order.refund_status == 'refunded'
+        if order.policy_id and refunded_after != refunded_before:
+            if refunded_after:
+                discount_service.release(order.id)
+            else:
+                discount_service.redeem(order.user_id, order.policy_id, order.id)
         
         db.session.commit()
         # return jsonify({"message": "訂單資訊更新成功",
@@ -556,14 +547,110 @@ def update_orderinfo():
             "message": "訂單資訊更新成功",
             "success": True,         
         }) ,200
-        
+
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"message": str(ve), "success": False}), 400
+
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": "伺服器內部錯誤", "success": False}), 500
     
-def view_all_user_orders():
-    from sqlalchemy.orm import joinedload
+# 訂單列表分頁：有帶 cursor 或 limit 才分頁 (舊前端不帶參數時維持回傳全部)
+ORDER_PAGE_DEFAULT_LIMIT = 20
+ORDER_PAGE_MAX_LIMIT = 100
+ABLE_REFUND_FILTERS = ['pending', 'refunded', 'rejected', 'none']
+
+
+def _parse_order_list_params(data):
+    """
+    解析訂單列表的分頁 / 篩選參數，格式錯誤時 raise ValueError
+    回傳 (filters, limit, summary_only)，limit 為 None 代表不分頁
+    """
+    filters = []
 
+    cursor = data.get("cursor")
+    limit = data.get("limit")
+
+    if cursor is not None:
+        if not isinstance(cursor, int) or isinstance(cursor, bool) or cursor <= 0:
+            raise ValueError("cursor 必須是正整數")
+        # keyset：只取比上一頁最後一筆還舊的訂單
+        filters.append(Order.id < cursor)
+
+    if limit is not None:
+        if not isinstance(limit, int) or isinstance(limit, bool) or not (1 <= limit <= ORDER_PAGE_MAX_LIMIT):
+            raise ValueError(f"limit 必須介於 1 ~ {ORDER_PAGE_MAX_LIMIT}")
+    elif cursor is not None:
+        limit = ORDER_PAGE_DEFAULT_LIMIT
+
+    is_completed = data.get("is_completed")
+    if is_completed is not None:
+        if not isinstance(is_completed, bool):
+            raise ValueError("is_completed 必須是bool")
+        filters.append(Order.is_completed == is_completed)
+
+    refund_status = data.get("refund_status")
+    if refund_status is not None:
+        if refund_status not in ABLE_REFUND_FILTERS:
+            raise ValueError("refund_status 傳值錯誤")
+        if refund_status == 'none':
+            filters.append(Order.refund_status.is_(None))
+        else:
+            filters.append(Order.refund_status == refund_status)
+
+    start_utc, end_utc = parse_local_date_range(data.get("from"), data.get("to"))
+    if start_utc:
+        filters.append(Order._created_at >= start_utc)
+    if end_utc:
+        filters.append(Order._created_at < end_utc)
+
+    summary_only = data.get("summary_only", False)
+    if not isinstance(summary_only, bool):
+        raise ValueError("summary_only 必須是bool")
+
+    return filters, limit, summary_only
+
+
+def _fetch_order_page(query, limit, summary_only):
+    """依 id 由新到舊取出一頁訂單，回傳 (orders, next_cursor)"""
+    if not summary_only:
+        # selectinload：分頁時不會因 JOIN 明細讓 LIMIT 失準，也不會重複傳訂單欄位
+        query = query.options(selectinload(Order.items).joinedload(Order_Item.product))
+
+    query = query.order_by(Order.id.desc())
+    if limit is None:
+        return query.all(), None
+
+    # 多拿一筆判斷是否還有下一頁
+    orders = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = orders[-1].id
+    return orders, next_cursor
+
+
+def _serialize_order_items(order):
+    items = []
+    for item in order.items:
+        product = item.product
+        items.append({
+            "order_item_id": item.id,
+            "product_id": item.product_id,
+            "product_name": product.name if product else "未知商品",
+            "product_image": product.image_url if product else None,
+            "price": item.price,
+            "quantity": item.quantity,
+            "subtotal": item.price * item.quantity,
+            "selected_sugar": item.selected_sugar,
+            "selected_ice": item.selected_ice,
+            "selected_size": item.selected_size
+        })
+    return items
+
+
+def view_all_user_orders():
     data = request.get_json()
     request_user_id = data.get("user_id")
 
@@ -571,44 +658,34 @@ def view_all_user_orders():
         return jsonify({"message": "缺少 user_id", "success": False}), 400
 
     try:
-        # 1. 抓取該使用者的所有訂單，使用 eager loading 避免 N+1 查詢問題
-        orders = Order.query.filter_by(user_id=request_user_id)\
-            .options(joinedload(Order.items).joinedload(Order_Item.product))\
-            .order_by(Order.id.desc()).all()
+        filters, limit, summary_only = _parse_order_list_params(data)
+    except ValueError as e:
+        return jsonify({"message": str(e), "success": False}), 400
 
-        # 1.5 批量查詢所有訂單的評論（避免 N+1 查詢）
+    try:
+        # 1. 抓取該使用者的訂單 (可分頁)，明細以 selectinload 一次載入避免 N+1
+        orders, next_cursor = _fetch_order_page(
+            Order.query.filter_by(user_id=request_user_id).filter(*filters),
+            limit,
+            summary_only,
+        )
+
+        # 1.5 批量查詢這一頁訂單的評論（避免 N+1 查詢）
         order_ids = [order.id for order in orders]
-        reviews = Review.query.filter(Review.order_id.in_(order_ids)).all()
+        reviews = Review.query.filter(Review.order_id.in_(order_ids)).all() if order_ids else []
         # 建立 order_id -> review 的映射
         review_map = {review.order_id: review for review in reviews}
 
         all_orders_data = []
 
         for order in orders:
-            # 2. 針對「每一筆訂單」建立其商品清單
-            items_in_this_order = []
-            for item in order.items:
-                product = item.product
-                items_in_this_order.append({
-                    "order_item_id": item.id,
-                    "product_id": item.product_id,
-                    "product_name": product.name if product else "未知商品",
-                    "product_image": product.image_url if product else None,
-                    "price": item.price,
-                    "quantity": item.quantity,
-                    "subtotal": item.price * item.quantity,
-                    "selected_sugar": item.selected_sugar,
-                    "selected_ice": item.selected_ice,
-                    "selected_size": item.selected_size
-                })
-
-            # 2.5 從映射中查找該訂單的評論（記憶體查找，不查詢資料庫）
+            # 2. 從映射中查找該訂單的評論（記憶體查找，不查詢資料庫）
             review = review_map.get(order.id)
             has_reviewed = review is not None
             review_id = review.id if review else None
 
             # 3. 將訂單摘要與商品詳情打包
-            all_orders_data.append({
+            order_data = {
                 "order_id": order.id,
                 "vendor_id": order.vendor_id,
                 "total_price": order.total_price,
@@ -618,13 +695,16 @@ def view_all_user_orders():
                 "created_at": order.created_at.strftime('%Y-%m-%d %H:%M:%S'),
                 "has_reviewed": has_reviewed,
                 "review_id": review_id,
-                "items": items_in_this_order,
                 "address_info": order.address_info,
                 "deliver_status": order.deliver_status
-            })
+            }
+            if not summary_only:
+                order_data["items"] = _serialize_order_items(order)
+            all_orders_data.append(order_data)
 
         return jsonify({
             "data": all_orders_data,
+            "next_cursor": next_cursor,
             "message": "成功取得所有訂單與細項",
             "success": True,
         })
@@ -632,8 +712,6 @@ def view_all_user_orders():
         return jsonify({"message": "系統錯誤", "error": str(e), "success": False}), 500
 
 def view_all_vendor_orders():
-    from sqlalchemy.orm import joinedload
-
     data = request.get_json()
     request_vendor_id = data.get("vendor_id")
 
@@ -641,33 +719,23 @@ def view_all_vendor_orders():
         return jsonify({"message": "缺少 vendor_id", "success": False}), 400
 
     try:
-        # 抓取該 vendor 的所有訂單，使用 eager loading 避免 N+1 查詢問題
-        orders = Order.query.filter_by(vendor_id=request_vendor_id)\
-            .options(joinedload(Order.items).joinedload(Order_Item.product))\
-            .order_by(Order.id.desc()).all()
+        filters, limit, summary_only = _parse_order_list_params(data)
+    except ValueError as e:
+        return jsonify({"message": str(e), "success": False}), 400
+
+    try:
+        # 抓取該 vendor 的訂單 (可分頁)，明細以 selectinload 一次載入避免 N+1
+        orders, next_cursor = _fetch_order_page(
+            Order.query.filter_by(vendor_id=request_vendor_id).filter(*filters),
+            limit,
+            summary_only,
+        )
 
         all_orders_data = []
 
         for order in orders:
-            # 針對每一筆訂單建立其商品清單
-            items_in_this_order = []
-            for item in order.items:
-                product = item.product
-                items_in_this_order.append({
-                    "order_item_id": item.id,
-                    "product_id": item.product_id,
-                    "product_name": product.name if product else "未知商品",
-                    "product_image": product.image_url if product else None,
-                    "price": item.price,
-                    "quantity": item.quantity,
-                    "subtotal": item.price * item.quantity,
-                    "selected_sugar": item.selected_sugar,
-                    "selected_ice": item.selected_ice,
-                    "selected_size": item.selected_size
-                })
-
             # 將訂單摘要與商品詳情打包
-            all_orders_data.append({
+            order_data = {
                 "order_id": order.id,
                 "user_id": order.user_id,
                 "total_price": order.total_price,
@@ -678,13 +746,16 @@ def view_all_vendor_orders():
                 "refund_status": str(order.refund_status) if order.refund_status else None,
                 "note": order.note,
                 "created_at": order.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                "items": items_in_this_order,
                 "address_info": order.address_info,
                 "deliver_status": order.deliver_status
-            })
+            }
+            if not summary_only:
+                order_data["items"] = _serialize_order_items(order)
+            all_orders_data.append(order_data)
 
         return jsonify({
             "data": all_orders_data,
+            "next_cursor": next_cursor,
             "message": "成功取得 vendor 所有訂單與細項",
             "success": True,
         })
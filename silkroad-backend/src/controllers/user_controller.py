@@ -1,28 +1,35 @@
 from flask import request, jsonify, session, current_app
 from models import User
-from models import Admin,Vendor,Customer,Vendor_Manager,Cart,Cart_Item,System_Announcement,Review
+from models import Admin,Vendor,Customer,Vendor_Manager,Cart,Cart_Item,System_Announcement,Review,Vendor_Rating
 from config import db
-from config.mail import mail
-from flask_mail import Message
-from utils import require_login
+from utils import (
+    require_login,
+    read_only,
+    vendor_list_snapshots,
+    announcement_snapshots,
+    PUBLIC_VENDORS_KEY,
+    ANNOUNCEMENTS_KEY,
+    snapshot_response,
+)
+from utils.mail_outbox import enqueue_email, outbox_dispatcher
+from utils.cart_merge import merge_guest_cart
+from utils.server_session import regenerate_session
+from utils import vendor_revenue
 from sqlalchemy import or_
 import random
 import string
 from datetime import datetime, timedelta, timezone
 
-def send_verification_email(user_email, code, subject="SilkRoad Email Verification"):
-    """發送驗證碼郵件"""
-    try:
-        msg = Message(
-            subject,
-            recipients=[user_email]
-        )
-        msg.body = f"Your verification code is: {code}\nThis code will expire in 10 minutes."
-        mail.send(msg)
-        return True
-    except Exception as e:
-        print(f"[Mail Error] {str(e)}")
-        return False
+def queue_verification_email(user_email, code, subject="SilkRoad Email Verification"):
+    """
+    將驗證碼郵件放入 outbox (不 commit，需與驗證碼一起提交)
+    實際寄送由背景 dispatcher 處理，request 不再等待 SMTP
+    """
+    enqueue_email(
+        user_email,
+        subject,
+        f"Your verification code is: {code}\nThis code will expire in 10 minutes."
+    )
 
 def generate_verification_code(length=6):
     """生成 6 位數隨機驗證碼"""
@@ -207,27 +214,10 @@ def register_step2(role):
             # 這裡選擇維持現狀，但在驗證通過前不設定登入 Session
             guest_cart = session.get('cart')
             if guest_cart and guest_cart.get("items"):
-                
-                # A. 建立資料庫 Cart
-                new_db_cart = Cart(
-                    customer_id=new_user.id,
-                    vendor_id=guest_cart["vendor_id"]
-                )
-                db.session.add(new_db_cart)
-                
-                # B. 搬移商品
-                for item in guest_cart["items"]:
-                    new_db_item = Cart_Item(
-                        cart_id=new_user.id,
-                        product_id=item["product_id"],
-                        quantity=item["quantity"],
-                        selected_sugar=item["selected_sugar"],
-                        selected_ice=item["selected_ice"],
-                        selected_size=item["selected_size"]
-                    )
-                    db.session.add(new_db_item)
-                
-                # C. 清除 Session 購物車
+                # 建立資料庫 Cart 並搬移商品 (與使用者同一個交易提交)
+                merge_guest_cart(new_user.id, guest_cart)
+
+                # 清除 Session 購物車
                 session.pop('cart', None)
 
         # 4. 生成驗證碼
@@ -236,14 +226,16 @@ def register_step2(role):
         new_user.verification_code_expires_at = datetime.now() + timedelta(minutes=10)
         new_user.is_verified = False
 
-        # 5. 最終提交
+        # 5. 驗證信放入 outbox，與使用者資料同一個交易提交
         if target_role != 'customer':
             db.session.add(new_user)
-            
+
+        queue_verification_email(new_user.email, verification_code)
         db.session.commit()
 
-        # 6. 發送驗證信 (非同步發送更好，但目前先同步處理)
-        mail_sent = send_verification_email(new_user.email, verification_code)
+        # 6. 通知背景 dispatcher 寄信 (mail_sent 代表已排入寄送佇列)
+        outbox_dispatcher.notify()
+        mail_sent = True
 
         # 7. 註冊成功後的處理 (不設定登入 Session，要求跳轉驗證頁)
         session.pop('reg_temp', None)
@@ -320,7 +312,8 @@ def login_user():
                 "email": user.email
             }), 403
 
-    # 4. 登入成功：設定 Session
+    # 4. 登入成功：換發 session id (防止 session fixation) 後設定 Session
+    regenerate_session()
     session["user_id"] = user.id
     session["role"] = user.role
     session.modified = True # 確保 session 被更新
@@ -330,52 +323,13 @@ def login_user():
         guest_cart = session.get('cart')
         if guest_cart and guest_cart.get("items"):
             try:
-                # A. 查詢或建立該 Customer 的 Cart
-                existing_cart = Cart.query.filter_by(customer_id=user.id).first()
-
-                if not existing_cart:
-                    # 如果沒有購物車，建立新的
-                    existing_cart = Cart(
-                        customer_id=user.id,
-                        vendor_id=guest_cart["vendor_id"]
-                    )
-                    db.session.add(existing_cart)
-                else:
-                    # 如果已有購物車但 vendor 不同，清空舊購物車
-                    if existing_cart.vendor_id != guest_cart["vendor_id"]:
-                        Cart_Item.query.filter_by(cart_id=user.id).delete()
-                        existing_cart.vendor_id = guest_cart["vendor_id"]
-
-                # B. 將訪客購物車的商品加入資料庫
-                for item in guest_cart["items"]:
-                    # 檢查是否已有相同商品和選項
-                    existing_item = Cart_Item.query.filter_by(
-                        cart_id=user.id,
-                        product_id=item["product_id"],
-                        selected_sugar=item["selected_sugar"],
-                        selected_ice=item["selected_ice"],
-                        selected_size=item["selected_size"]
-                    ).first()
-
-                    if existing_item:
-                        # 如果已存在相同商品，增加數量
-                        existing_item.quantity += item["quantity"]
-                    else:
-                        # 否則新增商品
-                        new_item = Cart_Item(
-                            cart_id=user.id,
-                            product_id=item["product_id"],
-                            quantity=item["quantity"],
-                            selected_sugar=item["selected_sugar"],
-                            selected_ice=item["selected_ice"],
-                            selected_size=item["selected_size"]
-                        )
-                        db.session.add(new_item)
-
-                # C. 提交資料庫變更
+                # A. 合併到該 Customer 的 Cart (相同規格累加數量，不同店家則先清空)
+                merge_guest_cart(user.id, guest_cart)
+
+                # B. 提交資料庫變更
                 db.session.commit()
 
-                # D. 清除 Session 購物車
+                # C. 清除 Session 購物車
                 session.pop('cart', None)
                 session.modified = True
 
@@ -431,7 +385,7 @@ def login_user():
             "is_active": getattr(user, 'is_active', True),
             "description": getattr(user, 'description', ""),
             "logo_url": getattr(user, 'logo_url', None),
-            "revenue": getattr(user, 'revenue', 0),
+            "revenue": vendor_revenue.revenue_of(user.id),
             "vendor_manager": manager_info
         }
 
@@ -502,6 +456,8 @@ def update_user():
             user.address = address
 
         db.session.commit()
+        if user.role == 'vendor':
+            vendor_list_snapshots.bump(PUBLIC_VENDORS_KEY)
 
         # 4. 組裝回傳資料 (保持與 Login/Register 結構一致)
         # 這是為了讓前端更新 context 時不會少欄位
@@ -606,11 +562,15 @@ def delete_user(user_id):
         return jsonify({"message": "User not found", "success": False}), 404
 
     try:
+        is_vendor = user.role == 'vendor'
         db.session.delete(user)
         db.session.commit()
+        if is_vendor:
+            vendor_list_snapshots.bump(PUBLIC_VENDORS_KEY)
         if current_user_id == user_id:
             session.pop('user_id', None)
             session.pop('role', None)
+            regenerate_session()
 
         return jsonify({
             "message": "User deleted successfully",
@@ -686,7 +646,7 @@ def current_user():
             "is_active": getattr(user, 'is_active', True),
             "description": getattr(user, 'description', ""),
             "logo_url": getattr(user, 'logo_url', None),
-            "revenue": getattr(user, 'revenue', 0),
+            "revenue": vendor_revenue.revenue_of(user.id),
             "vendor_manager": manager_info
         }
 
@@ -696,10 +656,18 @@ def current_user():
 
     return jsonify({"success": True, "data": response_data}), 200
 
+# 不標記 @read_only: 快取未命中時在 primary 重建快照。replica 落後時，bump 之後讀到的舊資料
+# 會以新版本號寫進快取，連剛寫入的使用者都會拿到舊內容直到 ttl 過期
 def get_all_announcements():
     """
     列出所有系統公告 (建議依時間倒序排列)
     """
+    snap = announcement_snapshots.get(ANNOUNCEMENTS_KEY)
+    if snap is not None:
+        return snapshot_response(snap)
+
+    version = announcement_snapshots.version(ANNOUNCEMENTS_KEY)
+
     try:
         # 依建立時間由新到舊排序
         announcements = System_Announcement.query.order_by(System_Announcement.created_at.desc()).all()
@@ -711,11 +679,14 @@ def get_all_announcements():
             "created_at": a.created_at.isoformat() if a.created_at else None
         } for a in announcements]
 
-        return jsonify({
+        body = jsonify({
             "success": True,
             "message": "Retrieved all announcements successfully",
             "data": result
-        }), 200
+        }).get_data()
+        snap = announcement_snapshots.put(ANNOUNCEMENTS_KEY, version, body)
+
+        return snapshot_response(snap)
 
     except Exception as e:
         return jsonify({
@@ -830,6 +801,7 @@ def topup_balance():
             "success": False
         }), 500
     
+@read_only
 def get_vendor_reviews(vendor_id):
     """
     取得指定店家的所有評論 (僅內容、評分、時間)
@@ -870,10 +842,19 @@ def get_vendor_reviews(vendor_id):
                 "created_at": r.created_at.isoformat() if r.created_at else None
             })
 
+        # 4. 評分摘要 (直接讀彙總表)
+        rating = Vendor_Rating.query.get(vendor_id)
+        rating_summary = {
+            "review_count": rating.review_count if rating else 0,
+            "avg_rating": rating.avg_rating if rating else 0,
+            "histogram": rating.histogram if rating else {str(star): 0 for star in range(1, 6)}
+        }
+
         return jsonify({
             "success": True,
             "message": f"Retrieved {len(result)} reviews for vendor {vendor_id}",
-            "data": result
+            "data": result,
+            "rating_summary": rating_summary
         }), 200
 
     except Exception as e:
@@ -911,8 +892,11 @@ def verify_email():
         user.verification_code = None
         user.verification_code_expires_at = None
         db.session.commit()
+        if user.role == 'vendor':
+            vendor_list_snapshots.bump(PUBLIC_VENDORS_KEY)
 
-        # 自動登入：設定 Session
+        # 自動登入：換發 session id 後設定 Session
+        regenerate_session()
         session["user_id"] = user.id
         session["role"] = user.role
         session.modified = True 
@@ -922,35 +906,7 @@ def verify_email():
             guest_cart = session.get('cart')
             if guest_cart and guest_cart.get("items"):
                 try:
-                    existing_cart = Cart.query.filter_by(customer_id=user.id).first()
-                    if not existing_cart:
-                        existing_cart = Cart(customer_id=user.id, vendor_id=guest_cart["vendor_id"])
-                        db.session.add(existing_cart)
-                    else:
-                        if existing_cart.vendor_id != guest_cart["vendor_id"]:
-                            Cart_Item.query.filter_by(cart_id=user.id).delete()
-                            existing_cart.vendor_id = guest_cart["vendor_id"]
-
-                    for item in guest_cart["items"]:
-                        existing_item = Cart_Item.query.filter_by(
-                            cart_id=user.id,
-                            product_id=item["product_id"],
-                            selected_sugar=item["selected_sugar"],
-                            selected_ice=item["selected_ice"],
-                            selected_size=item["selected_size"]
-                        ).first()
-                        if existing_item:
-                            existing_item.quantity += item["quantity"]
-                        else:
-                            new_item = Cart_Item(
-                                cart_id=user.id,
-                                product_id=item["product_id"],
-                                quantity=item["quantity"],
-                                selected_sugar=item["selected_sugar"],
-                                selected_ice=item["selected_ice"],
-                                selected_size=item["selected_size"]
-                            )
-                            db.session.add(new_item)
+                    merge_guest_cart(user.id, guest_cart)
                     db.session.commit()
                     session.pop('cart', None)
                     session.modified = True
@@ -984,13 +940,14 @@ def resend_verification_code():
         code = generate_verification_code()
         user.verification_code = code
         user.verification_code_expires_at = datetime.now() + timedelta(minutes=10)
+        queue_verification_email(user.email, code)
         db.session.commit()
+        outbox_dispatcher.notify()
 
-        mail_sent = send_verification_email(user.email, code)
         return jsonify({
             "message": "Verification code resent",
             "success": True,
-            "mail_sent": mail_sent
+            "mail_sent": True
         }), 200
     except Exception as e:
         db.session.rollback()
@@ -1016,15 +973,16 @@ def forgot_password_send_code():
         code = generate_verification_code()
         user.verification_code = code
         user.verification_code_expires_at = datetime.now() + timedelta(minutes=10)
-        db.session.commit()
 
-        # 發送驗證碼郵件
-        mail_sent = send_verification_email(user.email, code, subject="密碼重置驗證碼")
+        # 驗證碼郵件放入 outbox，與驗證碼一起提交
+        queue_verification_email(user.email, code, subject="密碼重置驗證碼")
+        db.session.commit()
+        outbox_dispatcher.notify()
 
         return jsonify({
             "message": "驗證碼已發送至您的信箱",
             "success": True,
-            "mail_sent": mail_sent
+            "mail_sent": True
         }), 200
     except Exception as e:
         db.session.rollback()
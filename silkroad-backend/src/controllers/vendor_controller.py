@@ -1,4 +1,4 @@
-from flask import jsonify, request, session
+from flask import jsonify, request, session, Response, current_app, stream_with_context
 from werkzeug.utils import secure_filename
 import os
 import uuid
@@ -11,12 +11,28 @@ from models import (
     Discount_Policy,
     Vendor_Manager,
     Order,
+    Order_Item,
+    Vendor_Daily_Sales,
+    Product_Daily_Sales,
     Customer,
     User,
-    Review
+    Review,
+    Vendor_Rating
 )
 from config.database import db
-from utils import require_login
+from utils import (
+    require_login,
+    read_only,
+    menu_snapshots,
+    vendor_list_snapshots,
+    PUBLIC_VENDORS_KEY,
+    snapshot_response,
+)
+from utils.time_range import parse_local_date, parse_local_date_range, tw_local_time
+from utils import sales_rollup
+from utils import menu_io
+from utils import discount_service
+from utils import vendor_revenue
 
 from datetime import datetime, date
 from sqlalchemy import or_, and_, func
@@ -93,6 +109,7 @@ def update_products_listed():
                 }), 404
 
         db.session.commit()
+        menu_snapshots.bump(vendor_id)
 
         return jsonify({
             "message": "Products updated successfully",
@@ -401,6 +418,7 @@ def add_product():
             ))
 
         db.session.commit()
+        menu_snapshots.bump(vendor_id)
 
         return jsonify({
             "message": "Product added successfully",
@@ -453,6 +471,7 @@ def add_single_option(): # 路由函式通常不帶參數
             return jsonify({"message": f"不支援的類別: {category}", "success": False}), 400
 
         db.session.commit()
+        menu_snapshots.bump(vendor_id)
         return jsonify({
             "message": f"成功新增{category}選項: {option_val}",
             "success": True,
@@ -644,6 +663,7 @@ def update_products():
 
     try:
         db.session.commit()
+        menu_snapshots.bump(*{p.vendor_id for p in updated_products})
         # 回傳資料也精簡為基本屬性
         products_data = [
             {
@@ -709,6 +729,7 @@ def delete_single_option():
 
         db.session.delete(target)
         db.session.commit()
+        menu_snapshots.bump(vendor_id)
 
         return jsonify({
             "message": f"已成功刪除{category}選項: {option_val}",
@@ -817,7 +838,17 @@ def view_vendor_products(vendor_id):
     #     )
 '''
 
+# 不標記 @read_only: 快取未命中時在 primary 重建快照。replica 落後時，bump 之後讀到的舊資料
+# 會以新版本號寫進快取，連剛寫入的使用者都會拿到舊內容直到 ttl 過期
 def view_vendor_products(vendor_id): #c
+    # 菜單快照：命中時直接回傳已序列化的 bytes，不再做 ORM 查詢
+    snap = menu_snapshots.get(vendor_id)
+    if snap is not None:
+        return snapshot_response(snap)
+
+    # 先記下版本號，查詢途中若有寫入會 bump，put() 就不會把舊資料寫進快取
+    version = menu_snapshots.version(vendor_id)
+
     try:
         # 1. 執行資料庫查詢
         products = (
@@ -870,11 +901,14 @@ def view_vendor_products(vendor_id): #c
                 "is_listed": p.is_listed,
             })
 
-        return jsonify({
+        body = jsonify({
             "message": "查詢成功",
             "success": True,
             "products": data
-        }), 200
+        }).get_data()
+        snap = menu_snapshots.put(vendor_id, version, body)
+
+        return snapshot_response(snap)
 
     except Exception as e:
         print(f"Error in view_vendor_products: {str(e)}")
@@ -930,7 +964,15 @@ def view_vendor_product_detail(vendor_id, product_id):
         return jsonify({"message": f"Fail with {str(e)}", "success": False}), 500
 '''
 
+# 同 view_vendor_products，不標記 @read_only
 def view_vendor_product_detail(vendor_id, product_id): #c
+    # 商品詳情快照掛在店家的菜單版本底下，菜單有任何寫入時一併失效
+    snap = menu_snapshots.get(vendor_id, sub=product_id)
+    if snap is not None:
+        return snapshot_response(snap)
+
+    version = menu_snapshots.version(vendor_id)
+
     try:
         # ... (前面檢查邏輯保持不變) ...
         product = Product.query.get(product_id)
@@ -952,7 +994,7 @@ def view_vendor_product_detail(vendor_id, product_id): #c
             })
         # --- 修改結束 ---
 
-        return jsonify({
+        body = jsonify({
             "message": "find product success",
             "success": True,
             "product": {
@@ -965,7 +1007,14 @@ def view_vendor_product_detail(vendor_id, product_id): #c
                 "ice_option": [i.options for i in sorted_ices],
                 "size_option": sizes_data
             },
-        }), 200
+        }).get_data()
+
+        # 只有商品確實屬於網址上的店家時才快取，否則該店家的 bump 管不到這份快照
+        if product.vendor_id == vendor_id:
+            snap = menu_snapshots.put(vendor_id, version, body, sub=product_id)
+            return snapshot_response(snap)
+
+        return Response(body, status=200, mimetype="application/json")
 
     except Exception as e:
         return jsonify({"message": f"Fail with {str(e)}", "success": False}), 500
@@ -1178,6 +1227,7 @@ def add_discount_policy():
 
         db.session.add(add_discount_policy)
         db.session.commit()
+        discount_service.invalidate(add_discount_policy.vendor_id)
 
         return (
             jsonify(
@@ -1279,88 +1329,23 @@ def view_customer_discounts():
     if not customer_id:
         return jsonify({"message": "缺少 customer_id", "success": False}), 400
 
-    tw_tz = pytz.timezone('Asia/Taipei')
-    today = datetime.now(tw_tz).date()
+    vendor_id = request.args.get("vendor_id")
+    if vendor_id is not None:
+        try:
+            vendor_id = int(vendor_id)
+        except ValueError:
+            return jsonify({"message": "vendor_id 必須是整數", "success": False}), 400
 
     try:
         # 1. 獲取該用戶目前的會員等級
-        customer_info = Customer.query.filter_by(user_id=customer_id).first()
-        if not customer_info:
+        user_level = db.session.execute(
+            db.select(Customer.membership_level).where(Customer.user_id == customer_id)
+        ).scalar()
+        if user_level is None:
             return jsonify({"message": "找不到該客戶的會員資料", "success": False}), 404
-        user_level = customer_info.membership_level
-
-        # 2. 獲取該用戶的使用紀錄
-        used_policies_query = db.session.query(Order.policy_id).filter(
-            Order.user_id == customer_id,
-            Order.policy_id.isnot(None),
-            or_(Order.refund_status.is_(None), Order.refund_status != 'refunded')
-        ).distinct().all()
-        used_ids = [row[0] for row in used_policies_query]
-
-        # 3. 查詢所有優惠券 (不再於資料庫階段過濾等級與日期)
-        # 只過濾掉被管理員完全關閉 (is_available=False) 的券
-        # 同時過濾掉被 ban 或未驗證的 vendor 的券
-        query = db.session.query(Discount_Policy, Vendor.name).join(
-            Vendor, Discount_Policy.vendor_id == Vendor.id
-        ).filter(
-            Discount_Policy.is_available == True,
-            Vendor.is_active == True,  # 只顯示活躍 vendor 的券
-            Vendor.is_verified == True  # 只顯示已驗證 vendor 的券
-        )
-
-        policies_with_names = query.all()
-
-        # 4. 格式化並判斷狀態
-        result = []
-        for policy, vendor_name in policies_with_names:
-            # 判斷是否符合條件 (等級與日期)
-            is_expired = policy.expiry_date and policy.expiry_date < today
-            is_not_started = policy.start_date and policy.start_date > today
-            level_not_met = policy.membership_limit > user_level
-            is_used = policy.id in used_ids
-            
-            # 建議補充：如果 expiry_date 為 None，仍要檢查 start_date 是否大於今天。
-            # # 判斷是否符合條件 (等級與日期)
-            # if policy.expiry_date:
-            #     is_expired = policy.expiry_date < today
-            # else:
-            #     is_expired = False  # 永久有效不算過期
-
-            # # 即使 expiry_date 為 None，也要檢查 start_date
-            # is_not_started = policy.start_date and policy.start_date > today
-            # level_not_met = policy.membership_limit > user_level
-
-            if is_expired and not is_used:
-                continue
-
-            # 核心狀態判斷邏輯
-            if policy.id in used_ids:
-                status = "used"
-            elif is_expired or is_not_started or level_not_met:
-                status = "disabled"
-            else:
-                status = "available"
-
-            result.append({
-                "policy_id": policy.id,
-                "vendor_id": policy.vendor_id,  # 添加 vendor_id
-                "vendor_name": vendor_name,
-                "code": policy.code,
-                "type": policy.type,
-                "value": policy.value,
-                "min_purchase": policy.min_purchase,
-                "max_discount": policy.max_discount,  # 添加 max_discount
-                "membership_limit": policy.membership_limit,
-                "expiry_date": str(policy.expiry_date) if policy.expiry_date else "永久有效",
-                "status": status,
-                # 額外回傳不符合的原因，方便前端顯示（可選）
-                "disable_reason": "等級不足" if level_not_met else "已過期/尚未開始" if (is_expired or is_not_started) else None
-            })
 
-        # 5. 自定義排序邏輯
-        # 權重分配：available=0, used=1, disabled=2
-        status_weight = {"available": 0, "used": 1, "disabled": 2}
-        result.sort(key=lambda x: status_weight[x['status']])
+        # 2. 有效折價券 (快取) + 使用紀錄 (set)，判斷狀態並排序
+        result = discount_service.customer_discounts(customer_id, user_level, vendor_id)
 
         return jsonify({
             "success": True,
@@ -1408,6 +1393,7 @@ def invalid_discount_policy():
 
         policy.is_available = False
         db.session.commit()
+        discount_service.invalidate(policy.vendor_id)
 
         return jsonify({"message": "成功停用折價券", "success": True}), 200
 
@@ -1646,6 +1632,7 @@ def update_discount_policy():
             policy.expiry_date = parsed_expiry_date
 
         db.session.commit()
+        discount_service.invalidate(policy.vendor_id)
 
         return (
             jsonify(
@@ -1679,22 +1666,25 @@ def update_discount_policy():
 
 from sqlalchemy import func
 
+# 同 view_vendor_products，不標記 @read_only
 def get_public_vendors():
+    snap = vendor_list_snapshots.get(PUBLIC_VENDORS_KEY)
+    if snap is not None:
+        return snapshot_response(snap)
+
+    version = vendor_list_snapshots.version(PUBLIC_VENDORS_KEY)
+
     try:
+        # 評分改讀預先彙總的 vendor_ratings，不再對整張 reviews 做 AVG / COUNT
         vendors = (
-            db.session.query(
-                Vendor,
-                func.coalesce(func.avg(Review.rating), 0).label("avg_rating"),
-                func.count(Review.id).label("review_count")
-            )
-            .outerjoin(Review, Vendor.id == Review.vendor_id)
+            db.session.query(Vendor, Vendor_Rating)
+            .outerjoin(Vendor_Rating, Vendor_Rating.vendor_id == Vendor.id)
             .filter(Vendor.is_active == True, Vendor.is_verified == True)
-            .group_by(Vendor.id)
             .all()
         )
 
         result = []
-        for v, avg_rating, review_count in vendors:
+        for v, rating in vendors:
             result.append(
                 {
                     "id": v.id,
@@ -1704,16 +1694,19 @@ def get_public_vendors():
                     "email": v.email,
                     "description": v.description,
                     "logo_url": v.logo_url,
-                    "avg_rating": round(avg_rating, 2),
-                    "review_count": review_count
+                    "avg_rating": rating.avg_rating if rating else 0,
+                    "review_count": rating.review_count if rating else 0
                 }
             )
 
-        return jsonify({
+        body = jsonify({
             "success": True,
             "message": "Retrieved public vendor list successfully",
             "data": result,
-        }), 200
+        }).get_data()
+        snap = vendor_list_snapshots.put(PUBLIC_VENDORS_KEY, version, body)
+
+        return snapshot_response(snap)
 
     except Exception as e:
         return jsonify({
@@ -1724,112 +1717,216 @@ def get_public_vendors():
 
 
 
+def _menu_format(filename=None):
+    """由 ?format= / 檔名副檔名 / Content-Type 判斷格式，預設 jsonl"""
+    fmt = request.args.get("format")
+    if not fmt and filename and "." in filename:
+        fmt = filename.rsplit(".", 1)[1]
+    if not fmt and request.mimetype == "text/csv":
+        fmt = "csv"
+    fmt = (fmt or "jsonl").lower()
+    return "jsonl" if fmt in ("json", "ndjson") else fmt
+
+
+def _sales_bucket_columns(gran, date_expr):
+    """依 granularity 產生分桶欄位 (date_expr 需為台灣時間)"""
+    if gran == 'daily':
+        cols = [func.year(date_expr), func.month(date_expr), func.dayofmonth(date_expr)]
+    elif gran == 'weekly':
+        # mode 3 = ISO 週 (週一開始，年份跟著 ISO 週走)，回傳 YYYYWW
+        cols = [func.yearweek(date_expr, 3)]
+    elif gran == 'monthly':
+        cols = [func.year(date_expr), func.month(date_expr)]
+    else:  # yearly
+        cols = [func.year(date_expr)]
+    return [c.label(f'b{i}') for i, c in enumerate(cols)]
+
+
+def _sales_label(gran, k):
+    # create human friendly label
+    if gran == 'daily':
+        year, month, day = k
+        return f"{year:04d}-{month:02d}-{day:02d}"
+    elif gran == 'weekly':
+        year, week = divmod(k[0], 100)
+        return f"{year}-W{week}"
+    elif gran == 'monthly':
+        year, month = k
+        return f"{year:04d}-{month:02d}"
+    else:
+        (year,) = k
+        return f"{year}"
+
+
+def _sales_from_rollups(vendor_id, gran, date_from, date_to):
+    """
+    讀每日 rollup：回傳 (series_rows, top_rows)
+    series_rows: (*bucket, gross, discount, orders)
+    top_rows:    (product_id, product_name, quantity, revenue)
+    """
+    filters = [Vendor_Daily_Sales.vendor_id == vendor_id]
+    product_filters = [Product_Daily_Sales.vendor_id == vendor_id]
+    if date_from:
+        filters.append(Vendor_Daily_Sales.sales_date >= date_from)
+        product_filters.append(Product_Daily_Sales.sales_date >= date_from)
+    if date_to:
+        filters.append(Vendor_Daily_Sales.sales_date <= date_to)
+        product_filters.append(Product_Daily_Sales.sales_date <= date_to)
+
+    bucket_cols = _sales_bucket_columns(gran, Vendor_Daily_Sales.sales_date)
+    series_rows = (
+        db.session.query(
+            *bucket_cols,
+            func.sum(Vendor_Daily_Sales.gross_revenue),
+            func.sum(Vendor_Daily_Sales.discount),
+            func.sum(Vendor_Daily_Sales.orders_count),
+        )
+        .filter(*filters)
+        .group_by(*bucket_cols)
+        # 退款後整天歸零的日期不顯示
+        .having(func.sum(Vendor_Daily_Sales.orders_count) > 0)
+        .order_by(*bucket_cols)
+        .all()
+    )
+
+    qty_sum = func.sum(Product_Daily_Sales.quantity)
+    top_rows = (
+        db.session.query(
+            Product_Daily_Sales.product_id,
+            Product.name,
+            qty_sum,
+            func.sum(Product_Daily_Sales.revenue),
+        )
+        .outerjoin(Product, Product.id == Product_Daily_Sales.product_id)
+        .filter(*product_filters)
+        .group_by(Product_Daily_Sales.product_id, Product.name)
+        .having(qty_sum > 0)
+        .order_by(qty_sum.desc(), Product_Daily_Sales.product_id)
+        .limit(10)
+        .all()
+    )
+    return series_rows, top_rows
+
+
+def _sales_from_orders(vendor_id, gran, start_utc, end_utc):
+    """直接由訂單計算 (SALES_ROLLUP_ENABLED 關閉時使用)，回傳格式同 _sales_from_rollups"""
+    order_filters = [Order.vendor_id == vendor_id, *sales_rollup.counted_order_filters()]
+    if start_utc:
+        order_filters.append(Order._created_at >= start_utc)
+    if end_utc:
+        order_filters.append(Order._created_at < end_utc)
+
+    bucket_cols = _sales_bucket_columns(gran, tw_local_time(Order._created_at))
+
+    # 1. 每筆訂單的毛收入 (一筆訂單一列)
+    per_order = (
+        db.session.query(
+            Order.id.label('order_id'),
+            Order.discount_amount.label('discount'),
+            func.coalesce(func.sum(Order_Item.price * Order_Item.quantity), 0).label('gross'),
+            *bucket_cols,
+        )
+        .outerjoin(Order_Item, Order_Item.order_id == Order.id)
+        .filter(*order_filters)
+        .group_by(Order.id)
+        .subquery()
+    )
+
+    # 2. 依分桶加總
+    bucket_refs = [per_order.c[c.name] for c in bucket_cols]
+    series_rows = (
+        db.session.query(
+            *bucket_refs,
+            func.sum(per_order.c.gross),
+            func.sum(per_order.c.discount),
+            func.count(),
+        )
+        .group_by(*bucket_refs)
+        .order_by(*bucket_refs)
+        .all()
+    )
+
+    # 3. 熱銷前 10 名 (一次 GROUP BY order_items)
+    qty_sum = func.sum(Order_Item.quantity)
+    top_rows = (
+        db.session.query(
+            Order_Item.product_id,
+            Product.name,
+            qty_sum,
+            func.sum(Order_Item.price * Order_Item.quantity),
+        )
+        .join(Order, Order.id == Order_Item.order_id)
+        .outerjoin(Product, Product.id == Order_Item.product_id)
+        .filter(*order_filters)
+        .group_by(Order_Item.product_id, Product.name)
+        .order_by(qty_sum.desc(), Order_Item.product_id)
+        .limit(10)
+        .all()
+    )
+    return series_rows, top_rows
+
+
+@read_only
 def get_vendor_sales(vendor_id: int):
     """Compute sales summary for a vendor with requested granularity.
 
     Query param: granularity in ['daily','weekly','monthly','yearly'] (default 'weekly')
+    Query param: from / to (YYYY-MM-DD, 台灣日期, 含頭含尾, 皆可省略)
     Returns JSON with:
       - 'series': list of { label, gross_revenue, discount, net_revenue, orders }
       - 'top_drinks': list of { product_id, product_name, quantity, revenue }
       - 'summary': totals
+
+    預設讀每日 rollup 表 (SALES_ROLLUP_ENABLED)，關閉時直接以 SQL 由訂單計算。
     """
+    gran = (request.args.get('granularity') or 'weekly').lower()
+    if gran not in ('daily', 'weekly', 'monthly', 'yearly'):
+        gran = 'weekly'
+
     try:
-        gran = (request.args.get('granularity') or 'weekly').lower()
-        if gran not in ('daily', 'weekly', 'monthly', 'yearly'):
-            gran = 'weekly'
+        date_from = parse_local_date(request.args.get('from'))
+        date_to = parse_local_date(request.args.get('to'))
+        start_utc, end_utc = parse_local_date_range(request.args.get('from'), request.args.get('to'))
+    except ValueError as e:
+        return jsonify({'message': str(e), 'success': False}), 400
 
+    try:
         COST_RATIO = 0.6
 
-        orders = (
-            Order.query
-            .filter_by(vendor_id=vendor_id)
-            .filter(Order.is_completed == True)
-            .all()
-        )
+        if current_app.config.get('SALES_ROLLUP_ENABLED', True):
+            series_rows, top_rows = _sales_from_rollups(
+                vendor_id, gran,
+                date_from.date() if date_from else None,
+                date_to.date() if date_to else None,
+            )
+        else:
+            series_rows, top_rows = _sales_from_orders(vendor_id, gran, start_utc, end_utc)
 
         total_gross = 0
         total_discount = 0
         total_orders = 0
-
-        buckets = {}
-        product_sales = {}
-
-        for o in orders:
-            if o.refund_status == 'refunded':
-                continue
-
-            total_orders += 1
-            gross = 0
-            for it in getattr(o, 'items', []):
-                qty = getattr(it, 'quantity', 0) or 0
-                price = getattr(it, 'price', 0) or 0
-                gross += price * qty
-
-                pid = getattr(it, 'product_id', None)
-                pname = None
-                if getattr(it, 'product', None):
-                    pname = getattr(it.product, 'name', None)
-                if pid is not None:
-                    ps = product_sales.get(pid)
-                    if not ps:
-                        ps = {'product_id': pid, 'product_name': pname or 'Unknown', 'quantity': 0, 'revenue': 0}
-                        product_sales[pid] = ps
-                    ps['quantity'] += qty
-                    ps['revenue'] += price * qty
-
-            total_gross += gross
-            total_discount += (o.discount_amount or 0)
-
-            dt = o.created_at
-            if not dt:
-                # fallback bucket
-                key = ('1970', 0)
-            else:
-                if gran == 'daily':
-                    key = (dt.year, dt.month, dt.day)
-                elif gran == 'weekly':
-                    y, w, _ = dt.isocalendar()
-                    key = (y, w)
-                elif gran == 'monthly':
-                    key = (dt.year, dt.month)
-                else:  # yearly
-                    key = (dt.year,)
-
-            entry = buckets.get(key)
-            if not entry:
-                entry = {'gross_revenue': 0, 'discount': 0, 'orders': 0}
-                buckets[key] = entry
-
-            entry['gross_revenue'] += gross
-            entry['discount'] += (o.discount_amount or 0)
-            entry['orders'] += 1
-
-        # build series sorted by key
         series = []
-        def key_sort(k):
-            return k
-
-        for k, v in sorted(buckets.items(), key=lambda kv: key_sort(kv[0])):
-            # create human friendly label
-            if gran == 'daily':
-                year, month, day = k
-                label = f"{year:04d}-{month:02d}-{day:02d}"
-            elif gran == 'weekly':
-                year, week = k
-                label = f"{year}-W{week}"
-            elif gran == 'monthly':
-                year, month = k
-                label = f"{year:04d}-{month:02d}"
-            else:
-                (year,) = k
-                label = f"{year}"
 
-            revenue = v.get('gross_revenue', 0)
-            discount = v.get('discount', 0)
-            net = revenue - discount
-            series.append({'label': label, 'gross_revenue': revenue, 'discount': discount, 'net_revenue': net, 'orders': v.get('orders', 0)})
+        for row in series_rows:
+            k = [int(v) for v in row[:-3]]
+            revenue = int(row[-3] or 0)
+            discount = int(row[-2] or 0)
+            orders_count = int(row[-1] or 0)
+
+            total_gross += revenue
+            total_discount += discount
+            total_orders += orders_count
+            series.append({'label': _sales_label(gran, k), 'gross_revenue': revenue, 'discount': discount, 'net_revenue': revenue - discount, 'orders': orders_count})
 
-        top_drinks = sorted(product_sales.values(), key=lambda x: x['quantity'], reverse=True)[:10]
+        top_drinks = [
+            {
+                'product_id': pid,
+                'product_name': pname or 'Unknown',
+                'quantity': int(qty or 0),
+                'revenue': int(revenue or 0),
+            }
+            for pid, pname, qty, revenue in top_rows
+        ]
 
         summary = {
             'total_gross_revenue': total_gross,
@@ -1901,6 +1998,7 @@ def update_vendor_description():
         vendor.description = new_description
         
         db.session.commit()
+        vendor_list_snapshots.bump(PUBLIC_VENDORS_KEY)
 
         return jsonify({
             "success": True,
@@ -2031,7 +2129,7 @@ def get_info(vendor_id : int):
         "success": True,
         "message": "Vendor information retrieved successfully",
         "data": {
-            "revenue": vendor.revenue,
+            "revenue": vendor_revenue.revenue_of(vendor.user_id),
             "address": vendor.address,
             "vendor_manager_id": vendor.vendor_manager_id,
             "logo_url": vendor.logo_url,
@@ -2090,6 +2188,7 @@ def update_vendor_logo():
     try:
         vendor.logo_url = logo_url
         db.session.commit()
+        vendor_list_snapshots.bump(PUBLIC_VENDORS_KEY)
 
         return jsonify({
             "message": "Logo updated successfully.",
@@ -2151,9 +2250,79 @@ def update_product(product_id):
 
         # --- 5. 提交更新 ---
         db.session.commit()
+        menu_snapshots.bump(vendor_id)
 
         return jsonify({"message": "Product updated successfully", "success": True})
 
     except Exception as e:
         db.session.rollback()
-        return jsonify({"message": f"Update failed: {str(e)}", "success": False}), 500
\ No newline at end of file
+        return jsonify({"message": f"Update failed: {str(e)}", "success": False}), 500
+
+
+@require_login(role=["vendor"])
+def import_products():
+    vendor_id = session.get("user_id")
+    dry_run = request.args.get("dry_run", "false").lower() == "true"
+
+    # 支援 multipart 上傳檔案 (file) 或直接把內容放在 request body
+    upload = request.files.get("file")
+    try:
+        if upload:
+            fmt = _menu_format(upload.filename)
+            text = upload.read().decode("utf-8-sig")
+        else:
+            fmt = _menu_format()
+            text = request.get_data(as_text=True)
+        rows = menu_io.parse_rows(text, fmt)
+    except (menu_io.MenuImportError, UnicodeDecodeError) as e:
+        return jsonify({"message": str(e), "success": False}), 400
+
+    if not rows:
+        return jsonify({"message": "No rows to import", "success": False}), 400
+
+    clean_rows, errors = menu_io.validate_rows(rows)
+    if errors:
+        return jsonify({
+            "message": f"{len(errors)} row(s) failed validation, nothing was imported",
+            "success": False,
+            "errors": errors,
+        }), 400
+
+    if dry_run:
+        return jsonify({
+            "message": "Validation passed (dry run)",
+            "success": True,
+            "data": {"count": len(clean_rows)},
+        }), 200
+
+    try:
+        ids = menu_io.insert_products(vendor_id, clean_rows)
+        db.session.commit()
+        menu_snapshots.bump(vendor_id)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": f"Import failed: {str(e)}", "success": False}), 500
+
+    return jsonify({
+        "message": "Products imported successfully",
+        "success": True,
+        "data": {
+            "count": len(ids),
+            "product_ids": [ids[row["image_url"]] for row in clean_rows],
+        },
+    }), 201
+
+
+@require_login(role=["vendor"])
+def export_products():
+    vendor_id = session.get("user_id")
+    fmt = _menu_format()
+    if fmt not in menu_io.FORMATS:
+        return jsonify({"message": f"Unsupported format: {fmt}", "success": False}), 400
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(menu_io.iter_export(vendor_id, fmt)),
+        mimetype=f"{mimetype}; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename=menu_{vendor_id}.{fmt}"},
+    )
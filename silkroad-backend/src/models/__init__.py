@@ -10,9 +10,17 @@ from models.auth.customer import Customer
 from models.order.discount_policy import Discount_Policy
 from models.order.order_item import Order_Item
 from models.order.order import Order
+from models.order.vendor_daily_sales import Vendor_Daily_Sales
+from models.order.product_daily_sales import Product_Daily_Sales
+from models.order.coupon_redemption import Coupon_Redemption
+from models.order.checkout_request import Checkout_Request
+from models.order.vendor_revenue_shard import Vendor_Revenue_Shard
 from models.store.product import Product
 from models.store.review import Review
+from models.store.vendor_rating import Vendor_Rating
 from models.auth.system_announcement import System_Announcement
+from models.auth.email_outbox import Email_Outbox
+from models.auth.job_run import Job_Run
 from models.auth.vendor_manager import Vendor_Manager
 from models.auth.vendor import Vendor
 from models.store.sugar_option import Sugar_Option
@@ -32,9 +40,17 @@ __all__ = [
     "Discount_Policy",
     "Order_Item",
     "Order",
+    "Vendor_Daily_Sales",
+    "Product_Daily_Sales",
+    "Coupon_Redemption",
+    "Checkout_Request",
+    "Vendor_Revenue_Shard",
     "Product",
     "Review",
+    "Vendor_Rating",
     "System_Announcement",
+    "Email_Outbox",
+    "Job_Run",
     "User",
     "Vendor_Manager",
     "Vendor",
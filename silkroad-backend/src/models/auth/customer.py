@@ -11,6 +11,7 @@ class Customer(User):
 
     user_id           = db.Column(db.Integer, db.ForeignKey("auth.users.id"), primary_key=True)
     membership_level  = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
+    completed_order_count = db.Column(db.Integer, nullable=False, server_default=db.text("0"), comment="已完成且未退款的訂單數 (utils.membership 維護)")
     is_active         = db.Column(db.Boolean, nullable=False, server_default=db.text("true"))
     stored_balance    = db.Column(db.Integer, nullable=False, server_default=db.text("0"))
     address           = db.Column(db.String(255), nullable=False)
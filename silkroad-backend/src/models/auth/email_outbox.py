@@ -0,0 +1,28 @@
+from config.database import db
+
+class Email_Outbox(db.Model):
+    """
+    待寄送郵件 (transactional outbox)
+    與使用者資料在同一個交易中寫入，由 utils.mail_outbox 的背景 dispatcher 寄出
+    status: pending -> sending -> sent / failed (重試次數用完)
+    時間欄位皆為 UTC
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        db.Index("idx_email_outbox_status_next", "status", "next_attempt_at"),
+        {"schema": "auth"},
+    )
+
+    id              = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    recipient       = db.Column(db.String(255), nullable=False)
+    subject         = db.Column(db.String(255), nullable=False)
+    body            = db.Column(db.Text, nullable=False)
+    status          = db.Column(db.Enum("pending", "sending", "sent", "failed"), nullable=False, default="pending")
+    attempts        = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False)
+    last_error      = db.Column(db.Text, nullable=True)
+    created_at      = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+    sent_at         = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Email_Outbox {self.id} {self.status}>"
@@ -0,0 +1,26 @@
+from config.database import db
+
+class Job_Run(db.Model):
+    """
+    維護排程的執行紀錄 (每次實際執行一列)
+    由 utils.job_runner 寫入；拿不到鎖 (其他 worker 正在跑) 或這個間隔內已經成功執行過而略過的那次不會記錄
+    排程器以此表判斷各 worker 的觸發是否需要實際執行
+    """
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        db.Index("idx_job_runs_name_started", "job_name", "started_at"),
+        {"schema": "auth"},
+    )
+
+    id              = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    job_name        = db.Column(db.String(64), nullable=False)
+    status          = db.Column(db.Enum("running", "success", "failed"), nullable=False, default="running")
+    worker          = db.Column(db.String(128), nullable=False)
+    rows_processed  = db.Column(db.Integer, nullable=False, default=0)
+    duration_ms     = db.Column(db.Integer, nullable=True)
+    error           = db.Column(db.Text, nullable=True)
+    started_at      = db.Column(db.DateTime, nullable=False)
+    finished_at     = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job_Run {self.job_name} {self.status}>"
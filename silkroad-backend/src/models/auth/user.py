@@ -7,7 +7,11 @@ from datetime import timezone, timedelta
 class User(db.Model):
     #指定這個模型所對應的資料表名稱
     __tablename__ = 'users'
-    __table_args__ = {"schema" : "auth"}  #指定schema
+    __table_args__ = (
+        # 排程清理未驗證帳號
+        db.Index("idx_users_verified_expires", "is_verified", "verification_code_expires_at"),
+        {"schema" : "auth"}  #指定schema
+    )
     __mapper_args__ = {
         'polymorphic_identity': 'user',
         'polymorphic_on': "role"
@@ -2,15 +2,19 @@ from config.database import db
 
 class Cart_Item(db.Model):
     __tablename__ = "cart_items"
-    __table_args__ = {"schema": "order"}
+    __table_args__ = (
+        # 同一個購物車中相同規格只能有一列 (加入購物車 / 登入合併以 upsert 累加數量)
+        db.Index("uq_cart_items_line", "cart_id", "product_id", "selected_sugar", "selected_ice", "selected_size", unique=True),
+        {"schema": "order"}
+    )
 
     id              = db.Column(db.Integer, primary_key=True, autoincrement=True)
     cart_id = db.Column(db.Integer, db.ForeignKey("order.carts.customer_id"), nullable=False)
     product_id      = db.Column(db.Integer, db.ForeignKey("store.products.id"), nullable=False)
     quantity        = db.Column(db.Integer, nullable=False, server_default=db.text("1"))
-    selected_sugar  = db.Column(db.String(50), nullable=True, comment='使用者選的甜度, e.g. 半糖')
-    selected_ice    = db.Column(db.String(50), nullable=True, comment='使用者選的冰塊, e.g. 少冰')
-    selected_size   = db.Column(db.String(20), nullable=True, comment='使用者選的大小, e.g. L')
+    selected_sugar  = db.Column(db.String(50), nullable=False, comment='使用者選的甜度, e.g. 半糖')
+    selected_ice    = db.Column(db.String(50), nullable=False, comment='使用者選的冰塊, e.g. 少冰')
+    selected_size   = db.Column(db.String(20), nullable=False, comment='使用者選的大小, e.g. L')
 
     #relationship
     cart = db.relationship("Cart", back_populates="items")
@@ -0,0 +1,22 @@
+from config.database import db
+
+class Checkout_Request(db.Model):
+    """
+    結帳的 Idempotency-Key 紀錄 (每位顧客每個 key 一列)
+    與訂單在同一個 transaction 寫入；同一個 key 重送時回傳原本的訂單，不會再結帳一次
+    超過 CHECKOUT_IDEMPOTENCY_TTL_HOURS 的紀錄由排程工作 purge_checkout_requests 刪除
+    由 utils.idempotency 維護
+    """
+    __tablename__ = "checkout_requests"
+    __table_args__ = (
+        db.Index("idx_checkout_requests_created", "created_at"),
+        {"schema" : "order"},
+    )
+
+    customer_id     = db.Column(db.Integer, db.ForeignKey("auth.customers.user_id", ondelete="CASCADE"), primary_key=True)
+    idempotency_key = db.Column(db.String(64), primary_key=True)
+    order_id        = db.Column(db.Integer, db.ForeignKey("order.orders.id", ondelete="CASCADE"), nullable=False)
+    created_at      = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+    def __repr__(self):
+        return f"<Checkout_Request customer:{self.customer_id} key:{self.idempotency_key} order:{self.order_id}>"
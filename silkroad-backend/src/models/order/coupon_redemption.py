@@ -0,0 +1,19 @@
+from config.database import db
+
+class Coupon_Redemption(db.Model):
+    """
+    折價券使用紀錄 (每位顧客每張折價券最多一列)
+    結帳時與訂單在同一個 transaction 寫入，訂單退款時刪除；
+    主鍵 (customer_id, policy_id) 保證同一張券不會被兩筆併發的結帳同時使用
+    由 utils.discount_service 維護
+    """
+    __tablename__ = "coupon_redemptions"
+    __table_args__ = {"schema" : "order"}
+
+    customer_id     = db.Column(db.Integer, db.ForeignKey("auth.customers.user_id", ondelete="CASCADE"), primary_key=True)
+    policy_id       = db.Column(db.Integer, db.ForeignKey("order.discount_policies.id", ondelete="CASCADE"), primary_key=True)
+    order_id        = db.Column(db.Integer, db.ForeignKey("order.orders.id", ondelete="CASCADE"), nullable=False, unique=True)
+    redeemed_at     = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+    def __repr__(self):
+        return f"<Coupon_Redemption customer:{self.customer_id} policy:{self.policy_id} order:{self.order_id}>"
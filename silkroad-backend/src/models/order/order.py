@@ -6,7 +6,13 @@ from datetime import timezone, timedelta
 
 class Order(db.Model):
     __tablename__ = "orders"
-    __table_args__ = {"schema" : "order"}
+    __table_args__ = (
+        # 折扣使用次數 (do_discount / view_customer_discounts)
+        db.Index("idx_orders_user_policy_refund", "user_id", "policy_id", "refund_status"),
+        # 店家訂單列表 / 銷售報表
+        db.Index("idx_orders_vendor_completed_created", "vendor_id", "is_completed", "created_at"),
+        {"schema" : "order"}
+    )
 
     id              = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id         = db.Column(db.Integer, db.ForeignKey("auth.users.id"), nullable=False)
@@ -0,0 +1,20 @@
+from config.database import db
+
+class Product_Daily_Sales(db.Model):
+    """
+    商品每日銷售彙總 (rollup)，規則同 Vendor_Daily_Sales
+    """
+    __tablename__ = "product_daily_sales"
+    __table_args__ = (
+        db.Index("idx_product_daily_sales_vendor_date", "vendor_id", "sales_date"),
+        {"schema" : "order"}
+    )
+
+    product_id      = db.Column(db.Integer, db.ForeignKey("store.products.id", ondelete="CASCADE"), primary_key=True)
+    sales_date      = db.Column(db.Date, primary_key=True)
+    vendor_id       = db.Column(db.Integer, db.ForeignKey("auth.vendors.user_id", ondelete="CASCADE"), nullable=False)
+    quantity        = db.Column(db.Integer, nullable=False, default=0)
+    revenue         = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Product_Daily_Sales product:{self.product_id} {self.sales_date}>"
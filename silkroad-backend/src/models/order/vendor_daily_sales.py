@@ -0,0 +1,20 @@
+from config.database import db
+
+class Vendor_Daily_Sales(db.Model):
+    """
+    店家每日銷售彙總 (rollup)
+    sales_date 為台灣日期；只計入已完成且未退款的訂單
+    由 utils.sales_rollup 在訂單完成 / 退款時增量維護，可用 rebuild 指令重建
+    """
+    __tablename__ = "vendor_daily_sales"
+    __table_args__ = {"schema" : "order"}
+
+    vendor_id       = db.Column(db.Integer, db.ForeignKey("auth.vendors.user_id", ondelete="CASCADE"), primary_key=True)
+    sales_date      = db.Column(db.Date, primary_key=True)
+    orders_count    = db.Column(db.Integer, nullable=False, default=0)
+    gross_revenue   = db.Column(db.Integer, nullable=False, default=0)
+    discount        = db.Column(db.Integer, nullable=False, default=0)
+    net_revenue     = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Vendor_Daily_Sales vendor:{self.vendor_id} {self.sales_date}>"
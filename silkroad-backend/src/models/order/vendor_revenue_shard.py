@@ -0,0 +1,18 @@
+from config.database import db
+
+class Vendor_Revenue_Shard(db.Model):
+    """
+    熱門店家的營業額分片計數 (VENDOR_REVENUE_SHARDS > 0 時啟用)
+    訂單完成 / 退款時隨機累加其中一列，分散對 vendors.revenue 單一列的鎖競爭
+    店家營業額 = vendors.revenue + 所有分片的 amount，對帳工作會把分片併回 vendors.revenue
+    由 utils.vendor_revenue 維護
+    """
+    __tablename__ = "vendor_revenue_shards"
+    __table_args__ = {"schema" : "order"}
+
+    vendor_id       = db.Column(db.Integer, db.ForeignKey("auth.vendors.user_id", ondelete="CASCADE"), primary_key=True)
+    shard_no        = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    amount          = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Vendor_Revenue_Shard vendor:{self.vendor_id} shard:{self.shard_no} amount:{self.amount}>"
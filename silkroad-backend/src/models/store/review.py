@@ -15,6 +15,7 @@ class Review(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('order_id', name='unique_order_review'),
+        db.Index("idx_reviews_vendor_created", "vendor_id", "created_at"),
         {"schema": "store"}
     )
 
@@ -0,0 +1,32 @@
+from config.database import db
+
+class Vendor_Rating(db.Model):
+    """
+    店家評分彙總 (每個店家一列)
+    由 utils.vendor_rating 在新增評論時增量維護，可用 rebuild 指令重建
+    平均分數 = rating_sum / review_count
+    """
+    __tablename__ = "vendor_ratings"
+    __table_args__ = {"schema" : "store"}
+
+    vendor_id       = db.Column(db.Integer, db.ForeignKey("auth.vendors.user_id", ondelete="CASCADE"), primary_key=True)
+    review_count    = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum      = db.Column(db.Integer, nullable=False, default=0)
+    rating_1        = db.Column(db.Integer, nullable=False, default=0)
+    rating_2        = db.Column(db.Integer, nullable=False, default=0)
+    rating_3        = db.Column(db.Integer, nullable=False, default=0)
+    rating_4        = db.Column(db.Integer, nullable=False, default=0)
+    rating_5        = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def avg_rating(self):
+        if not self.review_count:
+            return 0
+        return round(self.rating_sum / self.review_count, 2)
+
+    @property
+    def histogram(self):
+        return {str(star): getattr(self, f"rating_{star}") for star in range(1, 6)}
+
+    def __repr__(self):
+        return f"<Vendor_Rating vendor:{self.vendor_id} {self.rating_sum}/{self.review_count}>"
@@ -13,6 +13,7 @@ order_routes.route('/trans', methods=['POST'])(trans_to_order)
     #     "payment_methods":enum(str),
     #     "is_delivered":boolean,
     #     "shipping_address":string (外送時必填)
+    #     "idempotency_key":string (optional，也可用 Idempotency-Key header，最長 64 字元)
     #     }
 
         # 可能會回傳:
@@ -20,6 +21,7 @@ order_routes.route('/trans', methods=['POST'])(trans_to_order)
     #        "message": "...",
     #        "success": True/False
     #        }   
+    #     相同 idempotency_key 重送時不會重複扣款，直接回傳原本的訂單 (201，"replayed": True，header Idempotent-Replayed: true)
 
 order_routes.route('/view', methods=['POST'])(view_order)
 
@@ -119,10 +121,12 @@ order_routes.route('/view_user_orders', methods=['POST'])(view_all_user_orders)
 
 """
 需要 { "user_id": int }
+可選 (分頁 / 篩選，見下方「訂單列表共用參數」)
 
 回傳
 jsonify({
             "data": result_list,
+            "next_cursor": int | None,
             "message": "成功取得所有訂單",
             "success": True,
         })
@@ -145,10 +149,12 @@ order_routes.route('/view_vendor_orders', methods=['POST'])(view_all_vendor_orde
 
 """
 需要 { "vendor_id": int }
+可選 (分頁 / 篩選，見下方「訂單列表共用參數」)
 
 回傳
 jsonify({
             "data": result_list,
+            "next_cursor": int | None,
             "message": "成功取得 vendor 所有訂單與細項",
             "success": True,
         })
@@ -182,6 +188,22 @@ result_list 包含一個或多個
     ]
 }
 """
+"""
+訂單列表共用參數 (/view_user_orders, /view_vendor_orders，皆可省略)
+{
+    "cursor": int,            上一頁回傳的 next_cursor，取 id 更小 (更舊) 的訂單
+    "limit": int,             每頁筆數 1 ~ 100 (只帶 cursor 時預設 20)
+    "is_completed": bool,
+    "refund_status": "pending" | "refunded" | "rejected" | "none",
+    "from": "YYYY-MM-DD",     台灣日期，含當天
+    "to": "YYYY-MM-DD",       台灣日期，含當天
+    "summary_only": bool      true 時不回傳 items (不查詢明細)
+}
+沒帶 cursor / limit 時不分頁、回傳全部 (next_cursor 為 None)
+next_cursor 為 None 代表已經是最後一頁
+參數格式錯誤時回傳 400
+"""
+
 order_routes.route('/check_review', methods=['POST'])(check_order_review_status)
 """
 if success:
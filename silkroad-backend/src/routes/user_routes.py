@@ -461,7 +461,12 @@ Return:
             "order_id": int,
             "content": string,
             "created_at": datetime
-    }]
+    }],
+    "rating_summary": {
+        "review_count": int,
+        "avg_rating": float,
+        "histogram": { "1": int, "2": int, "3": int, "4": int, "5": int }
+    }
 }
 else:
 {
@@ -19,7 +19,9 @@ from controllers import (
     update_vendor_logo,
     get_vendor_sales,
     add_single_option,
-    delete_single_option
+    delete_single_option,
+    import_products,
+    export_products
 )
 vendor_routes = Blueprint('vendor', __name__)
 vendor_routes.route("/products/<int:product_id>", methods=["PATCH"])(update_product)
@@ -216,6 +218,42 @@ vendor_routes.route("/product/delete_option", methods=["POST"])(delete_single_op
 }
 '''
 
+vendor_routes.route("/product/import", methods=["POST"])(import_products)
+'''
+批次匯入菜單 (一次請求寫入整份菜單，同一個交易)
+query string:
+    format=csv|jsonl (可省略，會依上傳檔名副檔名判斷，預設 jsonl)
+    dry_run=true     只驗證不寫入
+
+前端給 (multipart 欄位 file，或直接把內容放在 body):
+JSON Lines，每行格式同 /product/add:
+{"name": "紅茶", "price": 30, "description": "...", "image_url": "https://...",
+ "options": {"size": "M,L", "step": "0,10", "sugar": "正常,半糖", "ice": "正常,去冰"}, "is_listed": false}
+
+CSV (第一列為標題，is_listed 可省略，預設 false):
+name,price,description,image_url,size,step,sugar,ice,is_listed
+紅茶,30,...,https://...,"M,L","0,10","正常,半糖","正常,去冰",false
+
+成功 201:
+{
+    "message": "Products imported successfully",
+    "success": true,
+    "data": {"count": 2, "product_ids": [31, 32]}   依輸入順序
+}
+任一列驗證失敗 400 (全部不寫入):
+{
+    "message": "1 row(s) failed validation, nothing was imported",
+    "success": false,
+    "errors": [{"row": 3, "message": "Invalid or missing field: price"}]   row 從 1 起算 (CSV 不含標題列)
+}
+'''
+
+vendor_routes.route("/product/export", methods=["GET"])(export_products)
+'''
+匯出整份菜單 (串流下載)，格式與 /product/import 相同，可直接再匯入
+query string: format=csv|jsonl (預設 jsonl)
+'''
+
 
 
 vendor_routes.route("/<int:vendor_id>/view_products", methods=["GET"])(view_vendor_products)
@@ -266,29 +304,36 @@ vendor_routes.route("/<int:vendor_id>/view_products", methods=["GET"])(view_vend
 vendor_routes.route("/<int:vendor_id>/sales_summary", methods=["GET"])(get_vendor_sales)
 """
 function:
-    獲得vendor中所有product的簡單資訊狀態
-    簡單資訊包括 id, name, price, image_url, is_listed
-    用於當 customer 點擊 vendor 後進入用於陳列該店家所有product的頁面
-    
-expected get:
-    No expected get
+    店家銷售報表，分桶與加總皆在 SQL 端完成
+
+expected get (query string, 皆可省略):
+    granularity: "daily" | "weekly" | "monthly" | "yearly"  (default "weekly")
+    from: "YYYY-MM-DD"  台灣日期，含當天
+    to:   "YYYY-MM-DD"  台灣日期，含當天
 
 return:
 {
     "message": String,
     "success": bool,
-    "products": [ (if successful)
-        {
-            "id": int,
-            "name": string,
-            "price": int,
-            "image_url": string,
-            "is_listed": bool 
-        },
+    "granularity": String,
+    "summary": {
+        "total_gross_revenue": int,
+        "total_discount": int,
+        "total_net_revenue": int,
+        "estimated_cost": int,
+        "estimated_profit": int,
+        "orders_count": int
+    },
+    "series": [
+        { "label": "2025-W1", "gross_revenue": int, "discount": int, "net_revenue": int, "orders": int },
         ...
+    ],
+    "top_drinks": [
+        { "product_id": int, "product_name": String, "quantity": int, "revenue": int },
+        ...  (最多 10 筆)
     ]
 }
-
+日期格式錯誤時回傳 400
 """
 
 vendor_routes.route("/<int:vendor_id>/view_product_detail/<int:product_id>", methods=["GET"])(view_vendor_product_detail)
@@ -428,8 +473,13 @@ data包含
 vendor_routes.route("/view_customer_discounts", methods=["GET"])(view_customer_discounts)
 '''
 需要{
-    "customer_id": int
+    "customer_id": int  (從 session 取得)
 }
+query 參數 (可選):
+    ?vendor_id=3   只列出該店家的折價券
+
+已過期且未使用的折價券不會列出；有效折價券在 process 內快取 (DISCOUNT_POLICY_CACHE_TTL 秒)，
+新增 / 修改 / 停用折價券時立即失效
 
 回傳
 
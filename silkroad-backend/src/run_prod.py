@@ -1,6 +1,28 @@
+"""
+正式環境入口: 以 gunicorn (設定見 silkroad-backend/gunicorn.conf.py) 啟動
+
+    python src/run_prod.py
+
+gunicorn 不支援 Windows，在 Windows 上會退回 Flask 開發伺服器 (僅供本機測試)。
+"""
+
 import os
-from app import app
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUNICORN_CONFIG = os.path.join(BACKEND_DIR, "gunicorn.conf.py")
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))  # Render 提供的 PORT
-    app.run(host="0.0.0.0", port=port, debug=False)  # 對外開放，關閉 debug
+    try:
+        from gunicorn.app.wsgiapp import WSGIApplication
+    except ImportError:
+        print("[run_prod] 找不到 gunicorn，改用 Flask 開發伺服器 (不適合正式環境)")
+        from app import app
+        from config import warm_up_db
+
+        warm_up_db(app)
+        port = int(os.environ.get("PORT", 5000))  # Render 提供的 PORT
+        app.run(host="0.0.0.0", port=port, debug=False)
+    else:
+        sys.argv = [sys.argv[0], "--config", GUNICORN_CONFIG, *sys.argv[1:]]
+        WSGIApplication("%(prog)s [OPTIONS]").run()
@@ -1,3 +1,12 @@
 from utils.test import test_routes
 from utils.login_verify import require_login, switcher
-from utils.cloudflare import cloudinary_routes
\ No newline at end of file
+from utils.read_routing import read_only
+from utils.cloudflare import cloudinary_routes
+from utils.snapshot_cache import (
+    menu_snapshots,
+    vendor_list_snapshots,
+    announcement_snapshots,
+    PUBLIC_VENDORS_KEY,
+    ANNOUNCEMENTS_KEY,
+)
+from utils.conditional import snapshot_response
@@ -0,0 +1,59 @@
+"""
+Cart merge: 把訪客購物車 (session['cart']) 合併進會員的資料庫購物車
+
+login_user / verify_email / register_step2 共用。
+購物車品項以 (cart_id, product_id, selected_sugar, selected_ice, selected_size)
+為唯一鍵 (uq_cart_items_line)，合併時:
+  1. 訪客購物車內相同規格的品項先在記憶體中加總
+  2. 整批交給一個 upsert statement: 不存在就新增，已存在就累加數量
+     (MySQL: INSERT ... ON DUPLICATE KEY UPDATE)
+不論訪客購物車有幾項，資料庫往返次數都是固定的。
+"""
+
+from config.database import db
+from models import Cart, Cart_Item
+from utils.upsert import upsert
+
+LINE_KEY = ("product_id", "selected_sugar", "selected_ice", "selected_size")
+CONFLICT_COLS = ("cart_id",) + LINE_KEY
+
+
+def collapse_items(items):
+    """相同規格的品項合併數量，保留第一次出現的順序"""
+    merged = {}
+    for item in items:
+        key = tuple(item[k] for k in LINE_KEY)
+        if key in merged:
+            merged[key]["quantity"] += item["quantity"]
+        else:
+            merged[key] = {k: item[k] for k in LINE_KEY}
+            merged[key]["quantity"] = item["quantity"]
+    return list(merged.values())
+
+
+def add_cart_lines(customer_id, items):
+    """以單一 upsert 寫入品項 (已存在的規格累加數量)，不 commit"""
+    rows = [dict(item, cart_id=customer_id) for item in collapse_items(items)]
+    upsert(Cart_Item, rows, increments=("quantity",), conflict_cols=CONFLICT_COLS)
+    return len(rows)
+
+
+def merge_guest_cart(customer_id, guest_cart):
+    """
+    合併訪客購物車，回傳合併的品項數 (不 commit，由呼叫端提交)
+    會員原本的購物車若屬於其他店家，會先清空再放入訪客購物車的內容
+    """
+    if not guest_cart or not guest_cart.get("items"):
+        return 0
+
+    vendor_id = guest_cart["vendor_id"]
+    cart = db.session.get(Cart, customer_id)
+    if cart is None:
+        db.session.add(Cart(customer_id=customer_id, vendor_id=vendor_id))
+    elif cart.vendor_id != vendor_id:
+        Cart_Item.query.filter_by(cart_id=customer_id).delete(synchronize_session=False)
+        cart.vendor_id = vendor_id
+
+    # upsert 是 Core statement，不會自動 flush，先讓 Cart 寫入
+    db.session.flush()
+    return add_cart_lines(customer_id, guest_cart["items"])
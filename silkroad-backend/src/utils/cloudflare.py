@@ -1,24 +1,34 @@
 from flask import Blueprint, jsonify
 
-import cloudinary
-import cloudinary.utils
 import time
 import os
 
 cloudinary_routes = Blueprint("cloudinary", __name__)
 
+_configured = False
 
-# Could use env variables to store sensitive info
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_NAME"),  # Replace with your Cloudinary cloud name
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),  # Replace with your Cloudinary API secret
-)
+
+def _cloudinary():
+    """第一次使用時才 import 並設定 cloudinary，啟動時不需要載入"""
+    global _configured
+    import cloudinary
+    import cloudinary.utils
+
+    if not _configured:
+        # Could use env variables to store sensitive info
+        cloudinary.config(
+            cloud_name=os.getenv("CLOUDINARY_NAME"),  # Replace with your Cloudinary cloud name
+            api_key=os.getenv("CLOUDINARY_API_KEY"),
+            api_secret=os.getenv("CLOUDINARY_API_SECRET"),  # Replace with your Cloudinary API secret
+        )
+        _configured = True
+    return cloudinary
 
 # Maybe folder name could name by "vendor_{vendor_id}/product_images"
 # Maybe need @login_required decorator or other auth methods
 @cloudinary_routes.route("/cloudinary-signature", methods=["GET"])
 def generate_signature():
+    cloudinary = _cloudinary()
     timestamp = int(time.time())
     folder_name = "your_folder_name"  # TODO: Replace with your desired folder name
     params = {
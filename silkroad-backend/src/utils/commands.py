@@ -0,0 +1,121 @@
+"""
+Flask CLI 指令 (於 silkroad-backend/src 底下執行)
+
+    flask --app app rebuild-sales-rollups [--vendor-id 3]
+    flask --app app rebuild-vendor-ratings [--vendor-id 3] [--check]
+    flask --app app dispatch-outbox [--batch-size 50]
+    flask --app app migrate [--list]
+    flask --app app explain-hot-queries
+    flask --app app run-job cleanup_users
+    flask --app app generate-data --preset small [--seed 0]
+"""
+
+import click
+
+
+def register_commands(app):
+
+    @app.cli.command("rebuild-sales-rollups")
+    @click.option("--vendor-id", type=int, default=None, help="只重建指定店家 (預設全部)")
+    def rebuild_sales_rollups_command(vendor_id):
+        """由歷史訂單重建每日銷售 rollup"""
+        from utils.sales_rollup import rebuild_sales_rollups
+
+        vendor_count, product_count = rebuild_sales_rollups(vendor_id)
+        print(f"[rollup] 重建完成: vendor_daily_sales {vendor_count} 筆, product_daily_sales {product_count} 筆")
+
+    @app.cli.command("rebuild-vendor-ratings")
+    @click.option("--vendor-id", type=int, default=None, help="只重建指定店家 (預設全部)")
+    @click.option("--check", is_flag=True, help="只檢查彙總是否與評論一致，不寫入")
+    def rebuild_vendor_ratings_command(vendor_id, check):
+        """由評論重建店家評分彙總"""
+        from utils.vendor_rating import rebuild_vendor_ratings, find_rating_mismatches
+
+        if check:
+            mismatches = find_rating_mismatches(vendor_id)
+            print(f"[rating] 不一致的店家: {mismatches if mismatches else '無'}")
+            if mismatches:
+                raise SystemExit(1)
+            return
+
+        count = rebuild_vendor_ratings(vendor_id)
+        print(f"[rating] 重建完成: vendor_ratings {count} 筆")
+
+    @app.cli.command("dispatch-outbox")
+    @click.option("--batch-size", type=int, default=None, help="每批寄送封數 (預設 MAIL_OUTBOX_BATCH_SIZE)")
+    def dispatch_outbox_command(batch_size):
+        """立即寄出 outbox 中所有到期的郵件"""
+        from utils.mail_outbox import dispatch_outbox
+
+        sent, failed = dispatch_outbox(app, batch_size)
+        print(f"[mail] 寄送完成: 成功 {sent} 封, 失敗 {failed} 封")
+
+    @app.cli.command("migrate")
+    @click.option("--list", "list_only", is_flag=True, help="只列出 migration 狀態，不執行")
+    def migrate_command(list_only):
+        """建立缺少的資料表並套用 sql/migrations/ 中尚未執行的 migration"""
+        from utils.migrations import list_migrations, applied_versions, apply_migrations, create_missing_tables
+
+        if list_only:
+            done = applied_versions()
+            for version, _ in list_migrations():
+                print(f"[migrate] {'applied' if version in done else 'pending'}  {version}")
+            return
+
+        created = create_missing_tables()
+        if created:
+            print(f"[migrate] 建立資料表: {', '.join(created)}")
+        applied = apply_migrations()
+        print(f"[migrate] 套用完成: {', '.join(applied) if applied else '沒有待套用的 migration'}")
+
+    @app.cli.command("explain-hot-queries")
+    def explain_hot_queries_command():
+        """EXPLAIN 熱門查詢，確認有用到對應索引 (任一未使用則 exit code 1)"""
+        from utils.query_plan import check_hot_queries
+
+        results = check_hot_queries()
+        for result in results:
+            print(f"[explain] {'OK  ' if result['used'] else 'MISS'} {result['name']} -> {result['index']}")
+            for line in result["plan"]:
+                print(f"           {line}")
+        if not all(result["used"] for result in results):
+            raise SystemExit(1)
+
+    @app.cli.command("run-job")
+    @click.argument("name")
+    def run_job_command(name):
+        """立即執行一個排程工作 (同樣會取得 advisory lock 並寫入 job_runs)"""
+        from utils.job_runner import JOBS, run_job
+
+        if name not in JOBS:
+            print(f"[job] 未知的工作: {name} (可用: {', '.join(JOBS)})")
+            raise SystemExit(1)
+
+        run = run_job(app, name)
+        if run is None:
+            print(f"[job] {name}: 其他 worker 正在執行，略過")
+            return
+        print(f"[job] {name}: {run.status}, {run.rows_processed} 筆, {run.duration_ms} ms")
+        if run.status == "failed":
+            raise SystemExit(1)
+
+    @app.cli.command("generate-data")
+    @click.option("--preset", type=click.Choice(["small", "medium", "large"]), default="small", show_default=True)
+    @click.option("--seed", type=int, default=0, show_default=True, help="相同 seed 產生相同資料，中斷後以同一個 seed 重跑會接續")
+    @click.option("--chunk-size", type=int, default=2000, show_default=True, help="每個 transaction 寫入的筆數")
+    @click.option("--vendors", type=int, default=None, help="覆寫 preset 的店家數")
+    @click.option("--customers", type=int, default=None, help="覆寫 preset 的顧客數")
+    @click.option("--orders", type=int, default=None, help="覆寫 preset 的訂單數")
+    @click.option("--skip-derived", is_flag=True, help="不重建銷售 rollup / 店家評分 / 會員等級 / 店家營業額")
+    def generate_data_command(preset, seed, chunk_size, vendors, customers, orders, skip_derived):
+        """產生容量測試用的大量資料 (請勿對正式資料庫執行)"""
+        from utils.synthetic_data import generate, scaled
+
+        target = scaled(preset, vendors=vendors, customers=customers, orders=orders)
+        print(f"[synthetic] {preset}: {target}")
+
+        def log(stage, done, total):
+            print(f"[synthetic] {stage}: {done}/{total}")
+
+        generate(target, seed=seed, chunk_size=chunk_size, log=log, rebuild_derived=not skip_derived)
+        print("[synthetic] 完成")
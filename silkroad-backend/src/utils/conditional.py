@@ -0,0 +1,26 @@
+"""
+Conditional response: 以 Snapshot 的 ETag / Last-Modified 回應 GET
+
+- 用戶端帶 If-None-Match (或 If-Modified-Since) 且內容沒變 -> 304，不帶 body
+- 否則回傳 200 + 快照 bytes
+
+Cache-Control 使用 "public, no-cache"：允許快取，但每次使用前都要回來驗證，
+輪詢的用戶端因此只會收到 304，不會拿到過期資料。
+"""
+
+from flask import Response, request
+
+from utils.snapshot_cache import Snapshot
+
+
+def snapshot_response(snap: Snapshot, status: int = 200) -> Response:
+    resp = Response(snap.body, status=status, mimetype="application/json")
+    resp.set_etag(snap.etag)
+    resp.last_modified = snap.last_modified
+    resp.cache_control.public = True
+    resp.cache_control.no_cache = True
+
+    # 只有成功的回應才會轉成 304
+    if status == 200:
+        resp.make_conditional(request)
+    return resp
@@ -0,0 +1,299 @@
+"""
+Discount service: 折價券列表與結帳共用的有效折價券查詢
+
+有效折價券 = is_available 且未過期 (日期在 SQL 端過濾)，且店家為 active + verified。
+列表的查詢結果以 ActivePolicy (不綁 session 的 frozen dataclass) 快取在 process 內:
+
+    key = vendor_id        單一店家 (?vendor_id= 篩選)
+    key = ALL_VENDORS_KEY  所有店家 (顧客折價券列表)
+
+新增 / 修改 / 停用折價券 commit 之後呼叫 invalidate(vendor_id)。
+與 snapshot_cache 相同，put 前版本已被 bump 的結果不寫入；
+多 worker 部署時其他 worker 靠 DISCOUNT_POLICY_CACHE_TTL 過期 (預設 60 秒)，
+日期換日時快取也會失效。
+結帳 (apply_discount) 不讀快取: 其他 worker 剛停用的折價券在 TTL 內仍會被快取，
+所以以一個查詢直接讀取折價券列、顧客會員等級與使用紀錄。
+
+「是否已使用」讀 order.coupon_redemptions (主鍵 customer_id, policy_id):
+結帳時 redeem() 與訂單同一個 transaction 寫入，退款時 release() 刪除，
+兩筆併發的結帳使用同一張券時，後寫入的一方會撞到主鍵而失敗。
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from config.database import db
+from models import Coupon_Redemption, Customer, Discount_Policy, Vendor
+from utils.time_range import TW_OFFSET
+
+ALL_VENDORS_KEY = "all"
+
+
+@dataclass(frozen=True)
+class ActivePolicy:
+    id: int
+    vendor_id: int
+    vendor_name: str
+    code: str | None
+    type: str
+    value: int
+    min_purchase: int | None
+    max_discount: int | None
+    membership_limit: int
+    start_date: date | None
+    expiry_date: date | None
+
+    def discount_for(self, total):
+        """折扣金額 (percent 的 value 為整數，例如 20 代表 20%)"""
+        if str(self.type).lower() == "percent":
+            amount = int(total * (self.value / 100))
+        else:
+            amount = int(self.value)
+        if self.max_discount is not None and amount > self.max_discount:
+            amount = self.max_discount
+        return amount
+
+
+def tw_today():
+    return datetime.now(timezone(TW_OFFSET)).date()
+
+
+class ActivePolicyCache:
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versions: dict = {}
+        self._entries: dict = {}  # key -> (version, day, built_at, policies)
+
+    def version(self, key) -> int:
+        return self._versions.get(key, 0)
+
+    def get(self, key, day):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        version, entry_day, built_at, policies = entry
+        if version != self._versions.get(key, 0) or entry_day != day:
+            return None
+        if self.ttl and time.monotonic() - built_at > self.ttl:
+            return None
+        return policies
+
+    def put(self, key, version, day, policies):
+        with self._lock:
+            # 查詢期間版本已被 bump -> 這份資料可能是舊的，不寫入快取
+            if self._versions.get(key, 0) == version:
+                self._entries[key] = (version, day, time.monotonic(), policies)
+        return policies
+
+    def bump(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.clear()
+
+
+policy_cache = ActivePolicyCache(ttl=float(os.getenv("DISCOUNT_POLICY_CACHE_TTL", "60")))
+
+
+def invalidate(vendor_id):
+    """折價券有異動時 (commit 之後) 呼叫"""
+    policy_cache.bump(vendor_id, ALL_VENDORS_KEY)
+
+
+def _policy_query(*conditions):
+    return (
+        select(Discount_Policy, Vendor.name)
+        .join(Vendor, Discount_Policy.vendor_id == Vendor.id)
+        .where(
+            Discount_Policy.is_available == True,
+            Vendor.is_active == True,
+            Vendor.is_verified == True,
+            *conditions,
+        )
+        .order_by(Discount_Policy.id)
+    )
+
+
+def _to_active(policy, vendor_name):
+    return ActivePolicy(
+        id=policy.id,
+        vendor_id=policy.vendor_id,
+        vendor_name=vendor_name,
+        code=policy.code,
+        type=policy.type,
+        value=policy.value,
+        min_purchase=policy.min_purchase,
+        max_discount=policy.max_discount,
+        membership_limit=policy.membership_limit,
+        start_date=policy.start_date,
+        expiry_date=policy.expiry_date,
+    )
+
+
+def active_policies(vendor_id=None, today=None):
+    """回傳未過期的有效折價券 tuple (依 id 排序)"""
+    today = today or tw_today()
+    key = ALL_VENDORS_KEY if vendor_id is None else vendor_id
+
+    policies = policy_cache.get(key, today)
+    if policies is not None:
+        return policies
+
+    version = policy_cache.version(key)
+    conditions = [or_(Discount_Policy.expiry_date.is_(None), Discount_Policy.expiry_date >= today)]
+    if vendor_id is not None:
+        conditions.append(Discount_Policy.vendor_id == vendor_id)
+    rows = db.session.execute(_policy_query(*conditions)).all()
+    return policy_cache.put(key, version, today, tuple(_to_active(p, name) for p, name in rows))
+
+
+def used_policy_ids(customer_id):
+    """該顧客已使用 (訂單未退款) 的 policy_id set"""
+    return set(db.session.execute(
+        select(Coupon_Redemption.policy_id).where(Coupon_Redemption.customer_id == customer_id)
+    ).scalars())
+
+
+def redeem(customer_id, policy_id, order_id):
+    """
+    記錄折價券已被 order_id 使用，不 commit
+    同一張券已被使用 (包含併發的另一筆結帳) 時 raise ValueError
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.add(Coupon_Redemption(customer_id=customer_id, policy_id=policy_id, order_id=order_id))
+    except IntegrityError:
+        raise ValueError("此折價券已使用過，不可重複使用")
+
+
+def release(order_id):
+    """訂單退款: 折價券可再次使用，不 commit"""
+    db.session.execute(delete(Coupon_Redemption.__table__).where(Coupon_Redemption.__table__.c.order_id == order_id))
+
+
+def _expired_used_policies(policy_ids, vendor_id, today):
+    """已使用但已過期的折價券 (列表中仍顯示為 used)，不快取"""
+    if not policy_ids:
+        return []
+    conditions = [Discount_Policy.id.in_(policy_ids), Discount_Policy.expiry_date < today]
+    if vendor_id is not None:
+        conditions.append(Discount_Policy.vendor_id == vendor_id)
+    return [_to_active(p, name) for p, name in db.session.execute(_policy_query(*conditions)).all()]
+
+
+def customer_discounts(customer_id, membership_level, vendor_id=None):
+    """
+    顧客折價券列表，每張附上 status:
+      used       已使用
+      available  可使用
+      disabled   等級不足 / 尚未開始 (disable_reason 說明原因)
+    排序: available -> used -> disabled
+    """
+    today = tw_today()
+    policies = active_policies(vendor_id, today)
+    used_ids = used_policy_ids(customer_id)
+
+    active_ids = {policy.id for policy in policies}
+    policies = list(policies) + _expired_used_policies(used_ids - active_ids, vendor_id, today)
+
+    result = []
+    for policy in policies:
+        is_not_started = policy.start_date is not None and policy.start_date > today
+        level_not_met = policy.membership_limit > membership_level
+
+        if policy.id in used_ids:
+            status = "used"
+        elif is_not_started or level_not_met:
+            status = "disabled"
+        else:
+            status = "available"
+
+        is_expired = policy.expiry_date is not None and policy.expiry_date < today
+        result.append({
+            "policy_id": policy.id,
+            "vendor_id": policy.vendor_id,
+            "vendor_name": policy.vendor_name,
+            "code": policy.code,
+            "type": policy.type,
+            "value": policy.value,
+            "min_purchase": policy.min_purchase,
+            "max_discount": policy.max_discount,
+            "membership_limit": policy.membership_limit,
+            "expiry_date": str(policy.expiry_date) if policy.expiry_date else "永久有效",
+            "status": status,
+            "disable_reason": "等級不足" if level_not_met else "已過期/尚未開始" if (is_expired or is_not_started) else None,
+        })
+
+    status_weight = {"available": 0, "used": 1, "disabled": 2}
+    result.sort(key=lambda x: status_weight[x["status"]])
+    return result
+
+
+def _unavailable_reason(policy_id, today):
+    """快取中找不到時，查出原因 (只在錯誤路徑執行)"""
+    discount = db.session.get(Discount_Policy, policy_id)
+    if not discount:
+        return "無效的折價券 ID"
+    if discount.is_available == False:
+        return "折價券已停用"
+    if discount.expiry_date and discount.expiry_date < today:
+        return "折價券已過期"
+    return "此店家無法使用此折價券"
+
+
+def apply_discount(total_price, policy_id, customer_id, vendor_id):
+    """驗證折價券並回傳折扣後金額，不符合時 raise ValueError"""
+    if not policy_id:
+        return total_price
+
+    today = tw_today()
+    membership_level = (
+        select(Customer.membership_level).where(Customer.user_id == customer_id).scalar_subquery()
+    )
+    redeemed = (
+        select(Coupon_Redemption.policy_id)
+        .where(Coupon_Redemption.customer_id == customer_id, Coupon_Redemption.policy_id == policy_id)
+        .exists()
+    )
+    row = db.session.execute(
+        _policy_query(
+            Discount_Policy.id == policy_id,
+            Discount_Policy.vendor_id == vendor_id,
+            or_(Discount_Policy.expiry_date.is_(None), Discount_Policy.expiry_date >= today),
+        ).add_columns(membership_level, redeemed)
+    ).first()
+    if row is None:
+        raise ValueError(_unavailable_reason(policy_id, today))
+
+    policy = _to_active(row[0], row[1])
+    membership_level, redeemed = row[2], row[3]
+    if membership_level is None:
+        raise ValueError("找不到該顧客資訊，無法驗證會員等級")
+
+    if policy.start_date and policy.start_date > today:
+        raise ValueError(f"折價券尚未生效，請於 {policy.start_date.isoformat()} 後使用")
+
+    if membership_level < policy.membership_limit:
+        raise ValueError("會員資格不符")
+
+    if policy.min_purchase and total_price < policy.min_purchase:
+        raise ValueError(f"未達折價券低消限制 (${policy.min_purchase})")
+
+    # 真正防止重複使用的是 redeem() 寫入時的主鍵
+    if redeemed:
+        raise ValueError("此折價券已使用過，不可重複使用")
+
+    return int(max(total_price - policy.discount_for(total_price), 0))
@@ -0,0 +1,70 @@
+"""
+Idempotency keys: 結帳請求可帶 Idempotency-Key header (或 body 的 idempotency_key)
+
+    - 第一次: 正常結帳，record() 與訂單在同一個 transaction 寫入 order.checkout_requests
+    - 重送:   find_order() 找到原本的訂單，直接回傳，不會再扣款 / 建立訂單
+    - 併發:   兩個相同 key 的請求同時結帳時，後寫入的一方撞到主鍵 (DuplicateRequest)，
+              rollback 後同樣回傳先完成的訂單
+
+結帳失敗 (rollback) 不會留下紀錄，同一個 key 可以再試一次。
+紀錄保留 CHECKOUT_IDEMPOTENCY_TTL_HOURS 小時 (預設 24)，由排程工作 purge_checkout_requests 刪除。
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app, request
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from config.database import db
+from models import Checkout_Request
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 64
+DEFAULT_TTL_HOURS = 24
+
+
+class DuplicateRequest(Exception):
+    """相同 key 的請求已經 (或正在) 完成結帳"""
+
+
+def request_key(data):
+    """取得這個請求的 key (沒有帶時回傳 None)，格式不符時 raise ValueError"""
+    key = request.headers.get(IDEMPOTENCY_HEADER) or (data or {}).get("idempotency_key")
+    if key is None:
+        return None
+    key = str(key).strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise ValueError(f"{IDEMPOTENCY_HEADER} 需為 1 ~ {MAX_KEY_LENGTH} 個字元")
+    return key
+
+
+def find_order(customer_id, key):
+    """已用這個 key 完成的訂單 id"""
+    return db.session.execute(
+        select(Checkout_Request.order_id).where(
+            Checkout_Request.customer_id == customer_id,
+            Checkout_Request.idempotency_key == key,
+        )
+    ).scalar()
+
+
+def record(customer_id, key, order_id):
+    """記錄 key -> order_id，不 commit；已有相同 key 時 raise DuplicateRequest"""
+    try:
+        with db.session.begin_nested():
+            db.session.add(Checkout_Request(customer_id=customer_id, idempotency_key=key, order_id=order_id))
+    except IntegrityError:
+        raise DuplicateRequest(key)
+
+
+def purge_expired(ttl_hours=None):
+    """刪除過期的紀錄，回傳刪除筆數"""
+    if ttl_hours is None:
+        ttl_hours = current_app.config.get("CHECKOUT_IDEMPOTENCY_TTL_HOURS", DEFAULT_TTL_HOURS)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=ttl_hours)
+    result = db.session.execute(
+        delete(Checkout_Request.__table__).where(Checkout_Request.__table__.c.created_at < cutoff)
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,206 @@
+"""
+Job runner: APScheduler 定期工作 + 資料庫 advisory lock + 執行紀錄
+
+多個 worker (gunicorn 多 process / 多台機器) 都會啟動排程器，各自有自己的間隔，
+所以每個間隔內每個 worker 都會觸發一次。觸發時:
+
+1. 先搶 advisory lock，避免同時執行 (沒搶到的直接略過):
+    MySQL   SELECT GET_LOCK('silkroad:<job>', 0)   (連線結束時自動釋放)
+    其他    process 內的 threading.Lock (單機開發用)
+2. 搶到鎖後查 auth.job_runs: 這個間隔內 (其他 worker) 已經成功執行過就略過，
+   因此不論有幾個 worker，每個間隔只會實際執行一次。失敗的執行不算，下一次觸發會重試
+
+每次實際執行都會在 auth.job_runs 留下一筆紀錄 (處理筆數、耗時、錯誤)。
+
+    SCHEDULER_ENABLED              是否啟動排程器 (預設 True)
+    CLEANUP_USERS_INTERVAL_MINUTES 清理未驗證帳號的間隔 (預設 30)
+    MEMBERSHIP_RECONCILE_INTERVAL_MINUTES 會員等級對帳的間隔 (預設 1440)
+    CHECKOUT_REQUESTS_PURGE_INTERVAL_MINUTES 清除過期 Idempotency-Key 的間隔 (預設 60)
+    VENDOR_REVENUE_RECONCILE_INTERVAL_MINUTES 店家營業額對帳的間隔 (預設 1440)
+
+排程器在第一個 request 進來時才啟動，所以 CLI 指令與 reloader 的父程序不會啟動它；
+也可以用 flask --app app run-job <name> 手動執行。
+"""
+
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from config.database import db
+from models import Job_Run
+from utils.tasks import cleanup_unverified_users
+from utils.membership import reconcile_membership
+from utils.idempotency import purge_expired as purge_checkout_requests
+from utils.vendor_revenue import reconcile_revenue
+
+LOCK_PREFIX = "silkroad:"
+
+# 最近一次成功距今不到「間隔 × 此比例」時略過；留一點餘裕，避免各 worker 的觸發時間些微提早而多跑一次
+RECENT_RUN_RATIO = 0.9
+
+# 工作名稱 -> (函式, 間隔設定 key, 預設間隔分鐘)
+JOBS = {
+    "cleanup_users": (cleanup_unverified_users, "CLEANUP_USERS_INTERVAL_MINUTES", 30),
+    "reconcile_membership": (reconcile_membership, "MEMBERSHIP_RECONCILE_INTERVAL_MINUTES", 1440),
+    "purge_checkout_requests": (purge_checkout_requests, "CHECKOUT_REQUESTS_PURGE_INTERVAL_MINUTES", 60),
+    "reconcile_vendor_revenue": (reconcile_revenue, "VENDOR_REVENUE_RECONCILE_INTERVAL_MINUTES", 1440),
+}
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"[:128]
+
+
+@contextmanager
+def advisory_lock(name):
+    """
+    非阻塞地取得名為 name 的鎖，yield 是否取得
+    MySQL 的 GET_LOCK 綁定在連線上，所以另外拿一條連線持有到工作結束
+    """
+    if db.engine.dialect.name != "mysql":
+        with _local_locks_guard:
+            lock = _local_locks.setdefault(name, threading.Lock())
+        acquired = lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    lock_name = LOCK_PREFIX + name
+    with db.engine.connect() as conn:
+        acquired = conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": lock_name}).scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": lock_name})
+
+
+def _finish(run_id, status, rows, started, error=None):
+    db.session.rollback()
+    run = db.session.get(Job_Run, run_id)
+    run.status = status
+    run.rows_processed = rows
+    run.duration_ms = int((time.perf_counter() - started) * 1000)
+    run.error = error
+    run.finished_at = datetime.now()
+    db.session.commit()
+    db.session.refresh(run)  # session 結束後呼叫端仍可讀取結果
+    return run
+
+
+def interval_minutes(app, name):
+    _, interval_key, default_minutes = JOBS[name]
+    return app.config.get(interval_key, default_minutes)
+
+
+def ran_recently(name, minutes):
+    """這個間隔內是否已經有成功的執行紀錄"""
+    since = datetime.now() - timedelta(minutes=minutes * RECENT_RUN_RATIO)
+    last_success = db.session.execute(
+        select(func.max(Job_Run.started_at)).where(Job_Run.job_name == name, Job_Run.status == "success")
+    ).scalar()
+    return last_success is not None and last_success >= since
+
+
+def run_job(app, name, skip_if_recent=False):
+    """
+    在 app context 中執行工作，回傳 Job_Run；
+    其他 worker 正在執行 (拿不到鎖)，或 skip_if_recent 且這個間隔內已經成功執行過時回傳 None
+    (排程器觸發時 skip_if_recent=True；手動 run-job 一律執行)
+    """
+    job = JOBS[name][0]
+    with app.app_context():
+        try:
+            with advisory_lock(name) as acquired:
+                if not acquired:
+                    print(f"[Scheduler] {name}: 其他 worker 正在執行，略過")
+                    return None
+                if skip_if_recent and ran_recently(name, interval_minutes(app, name)):
+                    print(f"[Scheduler] {name}: 這個間隔內已經執行過，略過")
+                    return None
+
+                run = Job_Run(job_name=name, status="running", worker=worker_name(), started_at=datetime.now())
+                db.session.add(run)
+                db.session.commit()
+                run_id = run.id
+
+                started = time.perf_counter()
+                try:
+                    rows = job() or 0
+                except Exception as e:
+                    traceback.print_exc()
+                    run = _finish(run_id, "failed", 0, started, error=str(e))
+                    print(f"[Scheduler Error] {name} failed after {run.duration_ms} ms: {e}")
+                    return run
+
+                run = _finish(run_id, "success", rows, started)
+                print(f"[Scheduler] {name}: processed {rows} rows in {run.duration_ms} ms")
+                return run
+        finally:
+            db.session.remove()
+
+
+class JobScheduler:
+    """包裝 APScheduler: 第一個 request 進來時才啟動，並註冊 JOBS 中的工作"""
+
+    def __init__(self):
+        self._app = None
+        self._scheduler = None
+        self._started = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        if app.config.get("SCHEDULER_ENABLED", True):
+            # APScheduler.init_app 會註冊 SCHEDULER_API 的路由，必須在處理第一個 request 之前呼叫；
+            # 沒有開 API 時整個排程器 (包含 import) 延到第一個 request 才建立
+            if app.config.get("SCHEDULER_API_ENABLED"):
+                self._create_scheduler()
+            app.before_request(self._ensure_started)
+
+    def _create_scheduler(self):
+        from flask_apscheduler import APScheduler
+
+        self._scheduler = APScheduler()
+        self._scheduler.init_app(self._app)
+
+    def _ensure_started(self):
+        # 測試時由測試自行呼叫 run_job，不啟動排程器
+        if self._started or self._app.testing:
+            return
+        with self._lock:
+            if self._started:
+                return
+            print("[app] 啟動排程器...")
+            if self._scheduler is None:
+                self._create_scheduler()
+            scheduler = self._scheduler
+            for name in JOBS:
+                scheduler.add_job(
+                    id=name,
+                    func=run_job,
+                    args=[self._app, name],
+                    kwargs={"skip_if_recent": True},
+                    trigger="interval",
+                    minutes=interval_minutes(self._app, name),
+                    next_run_time=datetime.now(),  # 啟動時立即執行一次 (其他 worker 剛執行過則略過)
+                    max_instances=1,
+                    coalesce=True,
+                )
+            scheduler.start()
+            self._started = True
+
+
+job_scheduler = JobScheduler()
@@ -0,0 +1,208 @@
+"""
+Mail outbox: 交易式郵件佇列
+
+寄信不再於 request 中同步連 SMTP:
+  1. enqueue_email() 只把郵件寫進 auth.email_outbox (加入 db.session，不 commit)，
+     由呼叫端與使用者資料一起 commit —— 使用者存在 <=> 信一定會寄
+  2. 背景 dispatcher 批次取出到期的郵件，同一批共用一條 SMTP 連線 (mail.connect())
+  3. 失敗以指數退避重試，超過 MAIL_OUTBOX_MAX_ATTEMPTS 次標記為 failed
+
+多個 worker 同時跑 dispatcher 時，以「認領」避免重複寄送:
+取出時把狀態改為 sending 並把 next_attempt_at 往後推一個租約時間 (lease)；
+若 worker 在寄送途中掛掉，租約到期後其他 worker 會重新認領。
+
+手動清空佇列: flask --app app dispatch-outbox
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, and_
+
+from config.database import db
+from models import Email_Outbox
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_BACKOFF_SECONDS = 30       # 第 n 次失敗後等待 30 * 2^(n-1) 秒
+MAX_BACKOFF_SECONDS = 3600
+LEASE_SECONDS = 300                # 認領後多久沒結果視為 worker 已失效
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_email(recipient, subject, body):
+    """把郵件放進 outbox (不 commit，由呼叫端的交易一起提交)"""
+    entry = Email_Outbox(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=_utcnow(),
+    )
+    db.session.add(entry)
+    return entry
+
+
+def backoff_delay(attempts, base=DEFAULT_BACKOFF_SECONDS):
+    """第 attempts 次失敗後，下次重試前要等待的時間"""
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS))
+
+
+def _claim_batch(batch_size):
+    """認領一批到期的郵件，回傳 [(id, recipient, subject, body, attempts)]"""
+    now = _utcnow()
+    entries = (
+        Email_Outbox.query
+        .filter(
+            or_(
+                and_(Email_Outbox.status == "pending", Email_Outbox.next_attempt_at <= now),
+                # 租約過期的 sending (上一個 worker 沒寄完)
+                and_(Email_Outbox.status == "sending", Email_Outbox.next_attempt_at <= now),
+            )
+        )
+        .order_by(Email_Outbox.next_attempt_at, Email_Outbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    claimed = []
+    for entry in entries:
+        entry.status = "sending"
+        entry.next_attempt_at = now + timedelta(seconds=LEASE_SECONDS)
+        claimed.append((entry.id, entry.recipient, entry.subject, entry.body, entry.attempts))
+    db.session.commit()
+    return claimed
+
+
+def _record_results(results, max_attempts, backoff_base):
+    """results: {id: None (成功) 或 錯誤訊息}"""
+    now = _utcnow()
+    for entry in Email_Outbox.query.filter(Email_Outbox.id.in_(results.keys())).all():
+        error = results[entry.id]
+        entry.attempts += 1
+        if error is None:
+            entry.status = "sent"
+            entry.sent_at = now
+            entry.last_error = None
+        elif entry.attempts >= max_attempts:
+            entry.status = "failed"
+            entry.last_error = error
+        else:
+            entry.status = "pending"
+            entry.next_attempt_at = now + backoff_delay(entry.attempts, backoff_base)
+            entry.last_error = error
+    db.session.commit()
+
+
+def dispatch_batch(app, batch_size=None):
+    """
+    寄出一批到期的郵件 (需在 app context 內呼叫)
+    回傳 (sent, failed) 本批成功 / 失敗的封數
+    """
+    batch_size = batch_size or app.config.get("MAIL_OUTBOX_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    max_attempts = app.config.get("MAIL_OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+    backoff_base = app.config.get("MAIL_OUTBOX_BACKOFF_SECONDS", DEFAULT_BACKOFF_SECONDS)
+
+    claimed = _claim_batch(batch_size)
+    if not claimed:
+        return 0, 0
+
+    # Flask-Mail 只有 dispatcher 用得到，第一次寄信時才載入並初始化
+    from flask_mail import Message
+    from config.mail import mail, init_mail
+
+    if "mail" not in app.extensions:
+        init_mail(app)
+
+    results = {}
+    try:
+        # 同一批共用一條 SMTP 連線 (只做一次 TLS / 登入)
+        with mail.connect() as conn:
+            for entry_id, recipient, subject, body, _ in claimed:
+                try:
+                    msg = Message(subject, recipients=[recipient], body=body)
+                    conn.send(msg)
+                    results[entry_id] = None
+                except Exception as e:
+                    results[entry_id] = str(e)
+    except Exception as e:
+        # 連不上 SMTP: 這批還沒寄出的全部記為失敗，稍後重試
+        for entry_id, *_ in claimed:
+            results.setdefault(entry_id, f"SMTP connection failed: {e}")
+
+    _record_results(results, max_attempts, backoff_base)
+
+    sent = sum(1 for error in results.values() if error is None)
+    return sent, len(results) - sent
+
+
+def dispatch_outbox(app, batch_size=None):
+    """持續寄送直到沒有到期的郵件，回傳 (sent, failed) 總數"""
+    total_sent = total_failed = 0
+    with app.app_context():
+        try:
+            while True:
+                sent, failed = dispatch_batch(app, batch_size)
+                if sent == 0 and failed == 0:
+                    break
+                total_sent += sent
+                total_failed += failed
+                # 整批都失敗 (通常是 SMTP 掛了)，交給下一輪重試，不要原地打轉
+                if sent == 0:
+                    break
+        except Exception as e:
+            db.session.rollback()
+            print(f"[Mail Outbox Error] Dispatch failed: {str(e)}")
+        finally:
+            db.session.remove()
+
+    if total_sent or total_failed:
+        print(f"[Mail Outbox] sent {total_sent}, failed {total_failed}")
+    return total_sent, total_failed
+
+
+class OutboxDispatcher:
+    """
+    每個 process 一條背景執行緒:
+    有新郵件時被 notify() 立即喚醒，平時每 MAIL_OUTBOX_POLL_SECONDS 秒掃一次 (處理重試)
+    執行緒在第一個 request 進來時才啟動，所以 CLI 指令與 reloader 的父程序不會啟動它
+    """
+
+    def __init__(self):
+        self._app = None
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        if app.config.get("MAIL_OUTBOX_DISPATCHER_ENABLED", True):
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        # 測試時由測試自行呼叫 dispatch_outbox，不啟動背景執行緒
+        if self._thread is not None or self._app.testing:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mail-outbox", daemon=True)
+                self._thread.start()
+
+    def notify(self):
+        """請 dispatcher 盡快處理佇列 (在 commit 之後呼叫)"""
+        self._wakeup.set()
+
+    def _run(self):
+        poll_seconds = self._app.config.get("MAIL_OUTBOX_POLL_SECONDS", 10)
+        while True:
+            self._wakeup.wait(timeout=poll_seconds)
+            self._wakeup.clear()
+            dispatch_outbox(self._app)
+
+
+outbox_dispatcher = OutboxDispatcher()
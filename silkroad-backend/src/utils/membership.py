@@ -0,0 +1,80 @@
+"""
+Membership: 顧客完成訂單數 (customers.completed_order_count) 與會員等級的維護
+
+- 增量：訂單「是否計入」改變時 (完成 / 退款)，呼叫 apply_completion(user_id, +1 / -1)
+        以單一 UPDATE 原子地調整計數並依新的計數設定等級 (與訂單更新在同一個 transaction)
+- 對帳：reconcile_membership() 由訂單重算所有顧客的計數與等級，只修正不一致的列
+        (排程工作 reconcile_membership，或 flask --app app run-job reconcile_membership)
+
+計入的訂單與銷售 rollup 相同 = 已完成 (is_completed) 且未退款 (refund_status != 'refunded')
+"""
+
+from sqlalchemy import case, func, or_, select, update
+
+from config.database import db
+from models import Customer, Order
+
+# (最少完成訂單數, 會員等級)，由高到低
+MEMBERSHIP_TIERS = [
+    (100, 4),
+    (50, 3),
+    (20, 2),
+    (10, 1),
+]
+
+
+def level_for(count):
+    for threshold, level in MEMBERSHIP_TIERS:
+        if count >= threshold:
+            return level
+    return 0
+
+
+def level_case(count_expr):
+    """SQL 版本的 level_for"""
+    return case(
+        *[(count_expr >= threshold, level) for threshold, level in MEMBERSHIP_TIERS],
+        else_=0,
+    )
+
+
+def apply_completion(user_id, delta):
+    """
+    調整完成訂單數並重算等級，不 commit
+    等級以「舊計數 + delta」計算，MySQL 與其他資料庫的 SET 求值順序差異不影響結果
+    """
+    customers = Customer.__table__
+    new_count = customers.c.completed_order_count + delta
+    db.session.execute(
+        update(customers)
+        .where(customers.c.user_id == user_id)
+        .ordered_values(
+            (customers.c.membership_level, level_case(new_count)),
+            (customers.c.completed_order_count, new_count),
+        )
+    )
+
+
+def reconcile_membership():
+    """由訂單重算計數與等級 (sql/query.sql 的整批 UPDATE)，回傳修正的顧客數"""
+    customers = Customer.__table__
+    orders = Order.__table__
+    actual = (
+        select(func.count(orders.c.id))
+        .where(
+            orders.c.user_id == customers.c.user_id,
+            orders.c.is_completed == True,
+            or_(orders.c.refund_status.is_(None), orders.c.refund_status != "refunded"),
+        )
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(customers)
+        .where(or_(
+            customers.c.completed_order_count != actual,
+            customers.c.membership_level != level_case(actual),
+        ))
+        .values(completed_order_count=actual, membership_level=level_case(actual))
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,290 @@
+"""
+Menu import / export: 店家菜單批次匯入與匯出
+
+每一列 (row) 就是一個 /api/vendor/product/add 的 payload:
+  JSON Lines: 每行一個 JSON
+      {"name": "紅茶", "price": 30, "description": "...", "image_url": "...",
+       "options": {"size": "M,L", "step": "0,10", "sugar": "正常,半糖", "ice": "正常,去冰"},
+       "is_listed": false}
+  CSV: 同樣的欄位攤平
+      name,price,description,image_url,size,step,sugar,ice,is_listed
+
+匯出使用完全相同的格式，因此匯出的檔案可以直接再匯入。
+
+匯入時:
+  - 每列用與 add_product 相同的規則驗證，錯誤以列號回報
+  - 全部通過才寫入；商品一次 executemany，再用 image_url 對回 id，
+    三張選項表各一次 executemany，全部在同一個交易中
+"""
+
+import csv
+import io
+import json
+
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+from config.database import db
+from models import Product, Sugar_Option, Ice_Option, Sizes_Option
+
+FORMATS = ("csv", "jsonl")
+CSV_COLUMNS = ["name", "price", "description", "image_url", "size", "step", "sugar", "ice", "is_listed"]
+OPTION_KEYS = ["size", "ice", "sugar", "step"]
+MAX_IMPORT_ROWS = 1000
+EXPORT_CHUNK_SIZE = 200
+
+
+class MenuImportError(ValueError):
+    """整份檔案無法解析 (格式錯誤、列數過多等)"""
+
+
+def _split(value):
+    return [s.strip() for s in value.split(",") if s.strip()]
+
+
+def _parse_bool(value, default=False):
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "1", "yes"):
+        return True
+    if isinstance(value, str) and value.strip().lower() in ("false", "0", "no"):
+        return False
+    raise ValueError("is_listed must be a boolean")
+
+
+def parse_rows(text, fmt):
+    """將上傳內容解析成 [(line_no, dict)]，line_no 從 1 開始 (CSV 不含標題列)"""
+    if fmt not in FORMATS:
+        raise MenuImportError(f"Unsupported format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+    rows = []
+    if fmt == "jsonl":
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = e  # 交給 validate_row 回報為該列錯誤
+            rows.append((line_no, row))
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        missing = [c for c in CSV_COLUMNS if c != "is_listed" and c not in (reader.fieldnames or [])]
+        if missing:
+            raise MenuImportError(f"Missing CSV columns: {', '.join(missing)}")
+        for line_no, record in enumerate(reader, start=1):
+            price = record.get("price")
+            rows.append((line_no, {
+                "name": record.get("name"),
+                "price": int(price) if price and price.strip().lstrip("-").isdigit() else price,
+                "description": record.get("description"),
+                "image_url": record.get("image_url"),
+                "options": {key: record.get(key) or "" for key in OPTION_KEYS},
+                "is_listed": record.get("is_listed"),
+            }))
+
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise MenuImportError(f"Too many rows: {len(rows)} (max {MAX_IMPORT_ROWS})")
+    return rows
+
+
+def validate_row(row):
+    """
+    與 add_product 相同的檢查，回傳 (clean, error)
+    clean: {"name", "price", "description", "image_url", "is_listed", "sizes": [(name, step)], "sugars", "ices"}
+    """
+    if isinstance(row, Exception):
+        return None, f"Invalid JSON: {row}"
+    if not isinstance(row, dict):
+        return None, "Row must be a JSON object"
+
+    required_fields = {
+        "name": str,
+        "price": int,
+        "description": str,
+        "options": dict,
+        "image_url": str,
+    }
+    for field, field_type in required_fields.items():
+        # bool 是 int 的子類別，需排除
+        if field not in row or not isinstance(row[field], field_type) or isinstance(row[field], bool):
+            return None, f"Invalid or missing field: {field}"
+
+    if not row["name"].strip() or not row["image_url"].strip():
+        return None, "name and image_url must not be empty"
+    if row["price"] < 0:
+        return None, "price must not be negative"
+
+    options = row["options"]
+    for key in OPTION_KEYS:
+        if key not in options or not isinstance(options[key], str):
+            return None, f"'{key}' must be a comma-separated string"
+
+    sizes = _split(options["size"])
+    steps = _split(options["step"])
+    sugars = _split(options["sugar"])
+    ices = _split(options["ice"])
+
+    if len(sizes) != len(steps):
+        return None, "size and step must have the same number of values"
+    try:
+        steps = [int(s) for s in steps]
+    except ValueError:
+        return None, "step values must be integers"
+
+    for values in (sizes, sugars, ices):
+        if len(set(values)) != len(values):
+            return None, "option values must not repeat"
+
+    try:
+        is_listed = _parse_bool(row.get("is_listed"))
+    except ValueError as e:
+        return None, str(e)
+
+    return {
+        "name": row["name"],
+        "price": row["price"],
+        "description": row["description"],
+        "image_url": row["image_url"],
+        "is_listed": is_listed,
+        "sizes": list(zip(sizes, steps)),
+        "sugars": sugars,
+        "ices": ices,
+    }, None
+
+
+def validate_rows(rows):
+    """回傳 (clean_rows, errors)；errors 為 [{"row": line_no, "message": ...}]"""
+    clean_rows = []
+    errors = []
+    seen_urls = {}
+
+    for line_no, row in rows:
+        clean, error = validate_row(row)
+        if error:
+            errors.append({"row": line_no, "message": error})
+            continue
+        if clean["image_url"] in seen_urls:
+            errors.append({"row": line_no, "message": f"Duplicate image_url (same as row {seen_urls[clean['image_url']]})"})
+            continue
+        seen_urls[clean["image_url"]] = line_no
+        clean_rows.append((line_no, clean))
+
+    # image_url 在資料庫中為 unique，一次查詢找出已被使用的
+    if seen_urls:
+        taken = {
+            url for (url,) in db.session.query(Product.image_url)
+            .filter(Product.image_url.in_(seen_urls.keys()))
+        }
+        for line_no, clean in clean_rows:
+            if clean["image_url"] in taken:
+                errors.append({"row": line_no, "message": "image_url already exists"})
+        clean_rows = [(n, c) for n, c in clean_rows if c["image_url"] not in taken]
+
+    errors.sort(key=lambda e: e["row"])
+    return [c for _, c in clean_rows], errors
+
+
+def insert_products(vendor_id, clean_rows):
+    """
+    批次寫入商品與選項 (不 commit)
+    回傳 {image_url: product_id}
+    """
+    if not clean_rows:
+        return {}
+
+    # 直接對 Table 做 Core executemany (不經 ORM 物件)
+    db.session.execute(insert(Product.__table__), [
+        {
+            "vendor_id": vendor_id,
+            "name": row["name"],
+            "price": row["price"],
+            "description": row["description"],
+            "image_url": row["image_url"],
+            "is_listed": row["is_listed"],
+        }
+        for row in clean_rows
+    ])
+
+    # executemany 拿不到每列的自增 id，用 unique 的 image_url 對回來
+    ids = dict(
+        db.session.query(Product.image_url, Product.id)
+        .filter(Product.vendor_id == vendor_id, Product.image_url.in_([r["image_url"] for r in clean_rows]))
+        .all()
+    )
+
+    sugar_rows, ice_rows, size_rows = [], [], []
+    for row in clean_rows:
+        product_id = ids[row["image_url"]]
+        sugar_rows += [{"product_id": product_id, "options": s} for s in row["sugars"]]
+        ice_rows += [{"product_id": product_id, "options": i} for i in row["ices"]]
+        size_rows += [{"product_id": product_id, "options": name, "price_step": step} for name, step in row["sizes"]]
+
+    for model, option_rows in ((Sugar_Option, sugar_rows), (Ice_Option, ice_rows), (Sizes_Option, size_rows)):
+        if option_rows:
+            db.session.execute(insert(model.__table__), option_rows)
+
+    return ids
+
+
+def _export_row(product):
+    sizes = sorted(product.sizes_options, key=lambda x: x.price_step)
+    return {
+        "name": product.name,
+        "price": product.price,
+        "description": product.description or "",
+        "image_url": product.image_url,
+        "options": {
+            "size": ",".join(s.options for s in sizes),
+            "step": ",".join(str(s.price_step) for s in sizes),
+            "sugar": ",".join(s.options for s in product.sugar_options),
+            "ice": ",".join(i.options for i in product.ice_options),
+        },
+        "is_listed": bool(product.is_listed),
+    }
+
+
+def _iter_export_rows(vendor_id):
+    """以 id 為 keyset 每次讀 EXPORT_CHUNK_SIZE 個商品 (選項用 selectinload 一起帶出)"""
+    last_id = 0
+    while True:
+        products = (
+            Product.query
+            .options(
+                selectinload(Product.sizes_options),
+                selectinload(Product.sugar_options),
+                selectinload(Product.ice_options),
+            )
+            .filter(Product.vendor_id == vendor_id, Product.id > last_id)
+            .order_by(Product.id)
+            .limit(EXPORT_CHUNK_SIZE)
+            .all()
+        )
+        if not products:
+            break
+        rows = [_export_row(p) for p in products]
+        last_id = products[-1].id
+        # 每批讀完就結束交易並清掉 identity map，匯出大菜單時不佔住連線與記憶體
+        db.session.rollback()
+        db.session.expunge_all()
+        yield from rows
+
+
+def iter_export(vendor_id, fmt):
+    """逐批讀取店家商品並產生匯出內容 (generator，供 streaming response 使用)"""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        for row in _iter_export_rows(vendor_id):
+            writer.writerow({**{k: v for k, v in row.items() if k != "options"}, **row["options"]})
+            if buffer.tell() >= 8192:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for row in _iter_export_rows(vendor_id):
+            yield json.dumps(row, ensure_ascii=False) + "\n"
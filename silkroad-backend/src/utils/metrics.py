@@ -0,0 +1,220 @@
+"""
+Request metrics: 每個 request 的耗時、SQL 數量 / 時間、回應大小，以 Prometheus text 格式輸出
+
+    GET /metrics                 (設定 METRICS_TOKEN 時需帶 Authorization: Bearer <token>)
+
+    silkroad_request_duration_seconds{endpoint,method,status}   histogram
+    silkroad_request_sql_statements{endpoint}                   histogram
+    silkroad_request_db_seconds{endpoint}                       histogram
+    silkroad_response_size_bytes{endpoint}                      histogram
+    silkroad_db_pool_*{bind}                                    gauge (config.pool.pool_stats)
+
+endpoint 為 Flask endpoint 名稱 (blueprint.function)，找不到路由時為 "unmatched"。
+SQL 由 SQLAlchemy 的 before_cursor_execute / after_cursor_execute 事件計時，
+只計算 request 中執行的語句 (背景執行緒、CLI 不算)。
+
+X-Debug-Queries: METRICS_DEBUG_QUERIES=True 時，request 帶 X-Debug-Queries: 1
+會在回應附上該 request 執行的所有 SQL (JSON 物件回應加上 debug_queries 欄位，
+其他回應只有 X-Query-Count / X-DB-Time-Ms header)，用來抓 N+1 查詢。正式環境請勿開啟。
+
+數字存在各 process 的記憶體中，gunicorn 多 worker 時每次 scrape 只會拿到其中一個 worker 的數字，
+標籤 pid 可用來區分。
+"""
+
+import bisect
+import os
+import threading
+import time
+
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.database import db
+from config.pool import pool_stats
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+POOL_GAUGES = ("size", "checkedin", "checkedout", "overflow", "checkouts", "timeouts", "wait_seconds_total", "wait_seconds_max")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self, label_values):
+        """回傳 (bucket 累計 list, sum, count)"""
+        series = self._series.get(tuple(label_values))
+        if series is None:
+            return None
+        cumulative, total = [], 0
+        for n in series[:len(self.buckets)]:
+            total += n
+            cumulative.append(total)
+        return cumulative, series[-2], series[-1]
+
+    def render(self, extra_labels=()):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(value)) for key, value in self._series.items())
+        for label_values, series in items:
+            labels = list(zip(self.label_names, label_values)) + list(extra_labels)
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{{{_format_labels(labels + [('le', bound)])}}} {cumulative}")
+            lines.append(f"{self.name}_bucket{{{_format_labels(labels + [('le', '+Inf')])}}} {series[-1]}")
+            lines.append(f"{self.name}_sum{{{_format_labels(labels)}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{_format_labels(labels)}}} {series[-1]}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+request_duration = Histogram(
+    "silkroad_request_duration_seconds", "Request wall time.", ("endpoint", "method", "status"), DURATION_BUCKETS
+)
+request_sql_statements = Histogram(
+    "silkroad_request_sql_statements", "SQL statements executed per request.", ("endpoint",), SQL_COUNT_BUCKETS
+)
+request_db_time = Histogram(
+    "silkroad_request_db_seconds", "Time spent in SQL per request.", ("endpoint",), DURATION_BUCKETS
+)
+response_size = Histogram(
+    "silkroad_response_size_bytes", "Response body size.", ("endpoint",), SIZE_BUCKETS
+)
+HISTOGRAMS = (request_duration, request_sql_statements, request_db_time, response_size)
+
+
+# ==================== SQL 計時 ====================
+
+class _RequestQueries:
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self, keep_statements):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = [] if keep_statements else None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "_queries" in g:
+        conn.info.setdefault("_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("_query_started")
+    if not started or not has_request_context() or "_queries" not in g:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    queries = g._queries
+    queries.count += 1
+    queries.seconds += elapsed
+    if queries.statements is not None:
+        queries.statements.append({"sql": statement, "ms": round(elapsed * 1000, 3)})
+
+
+# ==================== Middleware ====================
+
+def _start_request():
+    g._request_started = time.perf_counter()
+    g._queries = _RequestQueries(keep_statements=_debug_queries_requested())
+
+
+def _debug_queries_requested():
+    return bool(current_app.config.get("METRICS_DEBUG_QUERIES")) and request.headers.get("X-Debug-Queries") == "1"
+
+
+def _record_request(response):
+    started = g.pop("_request_started", None)
+    queries = g.pop("_queries", None)
+    if started is None or queries is None:
+        return response
+
+    endpoint = request.endpoint or "unmatched"
+    request_duration.observe(time.perf_counter() - started, endpoint, request.method, response.status_code)
+    request_sql_statements.observe(queries.count, endpoint)
+    request_db_time.observe(queries.seconds, endpoint)
+    size = response.calculate_content_length()
+    if size is not None:
+        response_size.observe(size, endpoint)
+
+    if queries.statements is not None:
+        _attach_debug_queries(response, queries)
+    return response
+
+
+def _attach_debug_queries(response, queries):
+    response.headers["X-Query-Count"] = str(queries.count)
+    response.headers["X-DB-Time-Ms"] = f"{queries.seconds * 1000:.3f}"
+    if not response.is_json or response.is_streamed:
+        return
+    body = response.get_json(silent=True)
+    if isinstance(body, dict):
+        body["debug_queries"] = {
+            "count": queries.count,
+            "db_time_ms": round(queries.seconds * 1000, 3),
+            "statements": queries.statements,
+        }
+        response.set_data(jsonify(body).get_data())
+
+
+def render_metrics():
+    extra = [("pid", os.getpid())]
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render(extra))
+
+    pool_lines = {name: [] for name in POOL_GAUGES}
+    for bind, engine in db.engines.items():
+        stats = pool_stats(engine)
+        labels = _format_labels([("bind", bind or "default")] + extra)
+        for name in POOL_GAUGES:
+            if name in stats:
+                pool_lines[name].append(f"silkroad_db_pool_{name}{{{labels}}} {stats[name]}")
+    for name, samples in pool_lines.items():
+        if samples:
+            lines.append(f"# TYPE silkroad_db_pool_{name} gauge")
+            lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def init_metrics(app):
+    app.before_request(_start_request)
+    app.after_request(_record_request)
+
+    @app.route("/metrics")
+    def metrics():
+        token = app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return jsonify({"message": "權限不足", "success": False}), 403
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
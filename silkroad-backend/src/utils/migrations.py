@@ -0,0 +1,107 @@
+"""
+Schema migrations: 套用 sql/migrations/ 底下的 SQL 檔到既有資料庫
+
+    flask --app app migrate            建立缺少的資料表，再套用尚未執行的 migration
+    flask --app app migrate --list     列出每個 migration 的狀態
+
+檔名格式 NNNN_描述.sql，依檔名排序執行；執行過的版本記錄在 schema_migrations。
+新資料庫由 sql/main.sql (或 db.create_all) 建立時，裡面已有的物件再建立一次會失敗，
+因此「已存在 / 已刪除」這幾類錯誤視為該行已套用並略過。
+"""
+
+import os
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from config.database import db
+
+MIGRATIONS_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "sql", "migrations")
+)
+
+# MySQL error codes: 1050 table exists, 1060 duplicate column, 1061 duplicate key name,
+# 1091 can't drop (不存在), 1826 duplicate foreign key
+IGNORABLE_MYSQL_ERRORS = {1050, 1060, 1061, 1091, 1826}
+
+
+def split_statements(sql):
+    """去掉 -- 註解後以分號切成多個 statement"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def list_migrations():
+    """回傳 [(version, path)]，version 為不含副檔名的檔名"""
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return []
+    return [
+        (name[:-4], os.path.join(MIGRATIONS_DIR, name))
+        for name in sorted(os.listdir(MIGRATIONS_DIR))
+        if name.endswith(".sql")
+    ]
+
+
+def _ensure_migrations_table():
+    db.session.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version varchar(255) PRIMARY KEY,"
+        " applied_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP"
+        ")"
+    ))
+    db.session.commit()
+
+
+def applied_versions():
+    _ensure_migrations_table()
+    return {row[0] for row in db.session.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def _is_ignorable(error):
+    code = error.orig.args[0] if getattr(error, "orig", None) is not None and error.orig.args else None
+    return code in IGNORABLE_MYSQL_ERRORS
+
+
+def apply_migration(version, path):
+    """執行單一 migration，回傳略過的 statement 數"""
+    with open(path, encoding="utf-8") as f:
+        statements = split_statements(f.read())
+
+    skipped = 0
+    for stmt in statements:
+        try:
+            db.session.execute(text(stmt))
+        except DBAPIError as e:
+            db.session.rollback()
+            if not _is_ignorable(e):
+                raise
+            skipped += 1
+            print(f"[migrate] {version}: 已存在，略過: {e.orig.args[1] if len(e.orig.args) > 1 else e}")
+
+    db.session.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": version})
+    db.session.commit()
+    return skipped
+
+
+def create_missing_tables():
+    """依 models 建立資料庫中還沒有的資料表，回傳建立的表名 (已存在的表不會修改，欄位異動請寫 migration)"""
+    inspector = inspect(db.engine)
+    missing = [
+        table for table in db.metadata.sorted_tables
+        if not inspector.has_table(table.name, schema=table.schema)
+    ]
+    if missing:
+        db.metadata.create_all(db.engine, tables=missing)
+    return [table.fullname for table in missing]
+
+
+def apply_migrations():
+    """套用所有尚未執行的 migration，回傳套用的版本 list"""
+    done = applied_versions()
+    applied = []
+    for version, path in list_migrations():
+        if version in done:
+            continue
+        apply_migration(version, path)
+        applied.append(version)
+    return applied
@@ -0,0 +1,73 @@
+"""
+Pricing: 購物車 / 結帳共用的價格計算
+
+單價 = 商品基本價 (Product.price) + 所選尺寸的加價 (Sizes_Option.price_step，找不到為 0)
+
+price_lines() 一次查詢就把整台購物車所有 (product_id, size) 的價格解析完，
+會員購物車、訪客購物車與結帳都用它，三邊算出來的價格一定相同。
+"""
+
+from dataclasses import dataclass
+
+from sqlalchemy import and_
+
+from config.database import db
+from models import Product, Sizes_Option
+
+
+@dataclass
+class PricedLine:
+    product: Product | None     # None 代表商品已不存在
+    unit_price: int
+    subtotal: int
+
+
+def price_lines(lines):
+    """
+    lines: list of (product_id, selected_size, quantity)
+    回傳 (priced, total)
+      priced: 與 lines 順序相同的 PricedLine list
+      total:  所有存在商品的小計總和
+    """
+    lines = list(lines)
+    if not lines:
+        return [], 0
+
+    product_ids = {pid for pid, _, _ in lines}
+    sizes = {size for _, size, _ in lines if size is not None}
+
+    # 一次取回商品與「有被選到的尺寸」的加價
+    rows = (
+        db.session.query(Product, Sizes_Option.options, Sizes_Option.price_step)
+        .outerjoin(
+            Sizes_Option,
+            and_(
+                Sizes_Option.product_id == Product.id,
+                Sizes_Option.options.in_(sizes),
+            ),
+        )
+        .filter(Product.id.in_(product_ids))
+        .all()
+    )
+
+    products = {}
+    steps = {}
+    for product, size, price_step in rows:
+        products[product.id] = product
+        if size is not None:
+            steps[(product.id, size)] = price_step or 0
+
+    priced = []
+    total = 0
+    for product_id, size, quantity in lines:
+        product = products.get(product_id)
+        if product is None:
+            priced.append(PricedLine(product=None, unit_price=0, subtotal=0))
+            continue
+
+        unit_price = product.price + steps.get((product_id, size), 0)
+        subtotal = unit_price * quantity
+        total += subtotal
+        priced.append(PricedLine(product=product, unit_price=unit_price, subtotal=subtotal))
+
+    return priced, total
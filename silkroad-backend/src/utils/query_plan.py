@@ -0,0 +1,105 @@
+"""
+Query plan check: 用 EXPLAIN 確認熱門查詢有用到對應的複合索引
+
+    flask --app app explain-hot-queries
+
+每個熱門查詢以 ORM 組出與 controller 相同的條件，再交給資料庫 EXPLAIN。
+MySQL 看 EXPLAIN 的 key 欄位，SQLite 看 EXPLAIN QUERY PLAN 的 detail。
+注意: 資料量很小時優化器可能選擇全表掃描，請在有實際資料量的資料庫上執行。
+"""
+
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, or_
+
+from config.database import db
+from models import Order, Review, Cart_Item, User
+
+# (名稱, 預期使用的索引, 產生查詢的函式)
+HOT_QUERIES = [
+    (
+        "discount_used",
+        "idx_orders_user_policy_refund",
+        lambda: select(Order.id).where(
+            Order.user_id == 1,
+            Order.policy_id == 1,
+            or_(Order.refund_status.is_(None), Order.refund_status != "refunded"),
+        ),
+    ),
+    (
+        "vendor_sales",
+        "idx_orders_vendor_completed_created",
+        lambda: select(Order.id, Order.total_price).where(
+            Order.vendor_id == 1,
+            Order.is_completed == True,
+            Order._created_at >= datetime(2024, 1, 1),
+            Order._created_at < datetime(2024, 2, 1),
+        ),
+    ),
+    (
+        "vendor_orders",
+        "idx_orders_vendor_completed_created",
+        lambda: select(Order.id).where(Order.vendor_id == 1, Order.is_completed == False),
+    ),
+    (
+        "vendor_reviews",
+        "idx_reviews_vendor_created",
+        lambda: select(Review.id).where(Review.vendor_id == 1).order_by(Review._created_at.desc()),
+    ),
+    (
+        "cart_line",
+        "uq_cart_items_line",
+        lambda: select(Cart_Item.id).where(
+            Cart_Item.cart_id == 1,
+            Cart_Item.product_id == 1,
+            Cart_Item.selected_sugar == "normal",
+            Cart_Item.selected_ice == "normal",
+            Cart_Item.selected_size == "M",
+        ),
+    ),
+    (
+        "cleanup_unverified",
+        "idx_users_verified_expires",
+        lambda: select(User.__table__.c.id).where(
+            User.__table__.c.is_verified == False,
+            User.__table__.c.verification_code_expires_at < datetime.now() - timedelta(minutes=10),
+        ),
+    ),
+]
+
+
+def explain(stmt):
+    """回傳 (used_indexes, plan_lines)"""
+    connection = db.session.connection()
+    dialect = connection.dialect
+    compiled = stmt.compile(dialect=dialect)
+    params = (
+        tuple(compiled.params[name] for name in compiled.positiontup)
+        if compiled.positional else compiled.params
+    )
+
+    if dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).mappings().all()
+        plan = [row["detail"] for row in rows]
+        used = {name for line in plan for name in re.findall(r"INDEX (\w+)", line)}
+        return used, plan
+
+    rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", params).mappings().all()
+    plan = [
+        f"table={row.get('table')} type={row.get('type')} key={row.get('key')} "
+        f"possible_keys={row.get('possible_keys')} rows={row.get('rows')}"
+        for row in rows
+    ]
+    used = {row.get("key") for row in rows if row.get("key")}
+    return used, plan
+
+
+def check_hot_queries():
+    """回傳 [{"name", "index", "used", "plan"}]"""
+    results = []
+    for name, index, build in HOT_QUERIES:
+        used, plan = explain(build())
+        results.append({"name": name, "index": index, "used": index in used, "plan": plan})
+    db.session.rollback()
+    return results
@@ -0,0 +1,57 @@
+"""
+@read_only 與 read-your-writes (搭配 config/routing.py 的 RoutingSession)
+
+    @read_only
+    def get_public_vendors(): ...
+
+有寫入資料庫的 request 會在回應設定 db_primary_until cookie，
+DB_READ_YOUR_WRITES_SECONDS (預設 5 秒，需大於 replica 延遲) 內該使用者的唯讀請求仍走 primary，
+讓使用者一定看得到自己剛寫入的資料。cookie 只影響自己的請求，所以不需要簽章。
+
+會把結果寫進 snapshot_cache 的 handler 不要標記 @read_only: 快照是所有使用者共用的，
+從落後的 replica 建出的快照會以 bump 後的新版本號存進快取，read-your-writes 也救不回來。
+"""
+
+import time
+from functools import wraps
+
+from flask import g, request
+
+RYW_COOKIE = "db_primary_until"
+
+
+def read_only(func):
+    """標記 handler 只讀資料，查詢可以送到 reader bind"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def _load_primary_stickiness():
+    try:
+        until = int(request.cookies.get(RYW_COOKIE, 0))
+    except ValueError:
+        return
+    if until > time.time():
+        g.db_force_primary = True
+
+
+def init_read_routing(app):
+    window = app.config.get("DB_READ_YOUR_WRITES_SECONDS", 5)
+
+    app.before_request(_load_primary_stickiness)
+
+    @app.after_request
+    def _mark_primary_stickiness(response):
+        if g.get("db_wrote") and window > 0:
+            response.set_cookie(
+                RYW_COOKIE,
+                str(int(time.time() + window)),
+                max_age=window,
+                httponly=True,
+                secure=app.config.get("SESSION_COOKIE_SECURE", False),
+                samesite=app.config.get("SESSION_COOKIE_SAMESITE"),
+            )
+        return response
@@ -0,0 +1,151 @@
+"""
+Sales rollup: 店家 / 商品每日銷售彙總的維護
+
+- 增量：訂單狀態改變導致「是否計入營收」改變時，呼叫 apply_order(order, +1 / -1)
+        (與訂單更新在同一個 transaction 中)
+- 重建：rebuild_sales_rollups() 由歷史訂單整批重算 (flask rebuild-sales-rollups)
+
+計入營收的訂單 = 已完成 (is_completed) 且未退款 (refund_status != 'refunded')
+日期以台灣時間計算。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import func, or_, select
+
+from config.database import db
+from models import Order, Order_Item, Vendor_Daily_Sales, Product_Daily_Sales
+from utils.time_range import tw_local_time
+from utils.upsert import upsert
+
+
+def is_counted(order) -> bool:
+    return bool(order.is_completed) and order.refund_status != 'refunded'
+
+
+def counted_order_filters():
+    """SQL 版本的 is_counted (refund_status 為 NULL 也要算進來)"""
+    return [
+        Order.is_completed == True,
+        or_(Order.refund_status.is_(None), Order.refund_status != 'refunded'),
+    ]
+
+
+def apply_order(order, sign: int):
+    """把一筆訂單加進 (sign=1) 或扣出 (sign=-1) rollup，不 commit"""
+    created_at = order.created_at or datetime.now()
+    sales_date = created_at.date()
+
+    gross = 0
+    per_product = {}
+    for it in order.items:
+        subtotal = it.price * it.quantity
+        gross += subtotal
+        qty, revenue = per_product.get(it.product_id, (0, 0))
+        per_product[it.product_id] = (qty + it.quantity, revenue + subtotal)
+
+    discount = order.discount_amount or 0
+
+    upsert(
+        Vendor_Daily_Sales,
+        {
+            "vendor_id": order.vendor_id,
+            "sales_date": sales_date,
+            "orders_count": sign,
+            "gross_revenue": sign * gross,
+            "discount": sign * discount,
+            "net_revenue": sign * (gross - discount),
+        },
+        increments=("orders_count", "gross_revenue", "discount", "net_revenue"),
+    )
+    upsert(
+        Product_Daily_Sales,
+        [
+            {
+                "product_id": product_id,
+                "sales_date": sales_date,
+                "vendor_id": order.vendor_id,
+                "quantity": sign * qty,
+                "revenue": sign * revenue,
+            }
+            for product_id, (qty, revenue) in per_product.items()
+        ],
+        increments=("quantity", "revenue"),
+    )
+
+
+def rebuild_sales_rollups(vendor_id=None):
+    """
+    由歷史訂單重建 rollup (vendor_id 為 None 時重建全部)
+    回傳 (店家日資料筆數, 商品日資料筆數)
+    """
+    order_filters = counted_order_filters()
+    vendor_rows = db.session.query(Vendor_Daily_Sales)
+    product_rows = db.session.query(Product_Daily_Sales)
+    if vendor_id is not None:
+        order_filters.append(Order.vendor_id == vendor_id)
+        vendor_rows = vendor_rows.filter(Vendor_Daily_Sales.vendor_id == vendor_id)
+        product_rows = product_rows.filter(Product_Daily_Sales.vendor_id == vendor_id)
+
+    try:
+        vendor_rows.delete(synchronize_session=False)
+        product_rows.delete(synchronize_session=False)
+
+        sales_date = func.date(tw_local_time(Order._created_at))
+
+        # 每筆訂單一列，再依 (店家, 日期) 加總
+        per_order = (
+            select(
+                Order.vendor_id.label("vendor_id"),
+                sales_date.label("sales_date"),
+                Order.discount_amount.label("discount"),
+                func.coalesce(func.sum(Order_Item.price * Order_Item.quantity), 0).label("gross"),
+            )
+            .outerjoin(Order_Item, Order_Item.order_id == Order.id)
+            .where(*order_filters)
+            .group_by(Order.id)
+            .subquery()
+        )
+        vendor_select = (
+            select(
+                per_order.c.vendor_id,
+                per_order.c.sales_date,
+                func.count(),
+                func.sum(per_order.c.gross),
+                func.sum(per_order.c.discount),
+                func.sum(per_order.c.gross - per_order.c.discount),
+            )
+            .group_by(per_order.c.vendor_id, per_order.c.sales_date)
+        )
+        vendor_count = db.session.execute(
+            Vendor_Daily_Sales.__table__.insert().from_select(
+                ["vendor_id", "sales_date", "orders_count", "gross_revenue", "discount", "net_revenue"],
+                vendor_select,
+            )
+        ).rowcount
+
+        product_select = (
+            select(
+                Order_Item.product_id,
+                sales_date,
+                Order.vendor_id,
+                func.sum(Order_Item.quantity),
+                func.sum(Order_Item.price * Order_Item.quantity),
+            )
+            .join(Order, Order.id == Order_Item.order_id)
+            .where(*order_filters)
+            .group_by(Order_Item.product_id, sales_date, Order.vendor_id)
+        )
+        product_count = db.session.execute(
+            Product_Daily_Sales.__table__.insert().from_select(
+                ["product_id", "sales_date", "vendor_id", "quantity", "revenue"],
+                product_select,
+            )
+        ).rowcount
+
+        db.session.commit()
+        return vendor_count, product_count
+
+    except Exception:
+        db.session.rollback()
+        raise
@@ -0,0 +1,343 @@
+"""
+Server-side session: session 資料存在伺服器端，cookie 只放 session id
+
+Flask 預設把整個 session (含 session['user'] 與訪客購物車 session['cart'])
+簽章後放進 cookie，每個 request 都要帶著並重新驗證，購物車越大 cookie 越大。
+改成 cookie 只存隨機 sid，資料放在後端 store:
+
+    SESSION_BACKEND = memory   單一 process 記憶體 (測試用)
+                      sqlite   本機 SQLite 檔 (預設，開發 / 單機多 worker)
+                      redis    Redis (多台機器共用，部署超過一台機器時必須使用)
+                      cookie   沿用 Flask 原本的 signed cookie
+
+    SESSION_SQLITE_PATH  sqlite 檔案位置 (預設 instance/sessions.sqlite3)
+    SESSION_REDIS_URL    redis 連線字串 (預設 redis://localhost:6379/0)
+
+- 延遲載入: 沒有用到 session 的 request 不會讀 store
+- 只有內容被修改 (或 session.modified = True) 時才寫回 store；
+  另外剩餘效期不到一半時會順便延長一次，避免使用中的 session 過期
+- 清空的 session 會從 store 刪除並移除 cookie
+- 防止 session fixation: cookie 帶來的 sid 在 store 中找不到時不沿用，改發新的 sid；
+  登入 / 驗證 / 權限改變時呼叫 regenerate_session() 換發 sid 並刪除舊的資料
+"""
+
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask import session as current_session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin, SecureCookieSessionInterface
+
+BACKENDS = ("memory", "sqlite", "redis", "cookie")
+
+
+def new_sid():
+    return secrets.token_urlsafe(32)
+
+
+class ServerSideSession(SessionMixin):
+    """第一次存取內容時才向 store 載入資料"""
+
+    def __init__(self, sid, loader=None, new=False):
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self.needs_refresh = False
+        self.previous_sid = None  # 換發前的 sid，寫回時從 store 刪除
+        self._loader = loader
+        self._data = None if loader else {}
+
+    @property
+    def data(self):
+        self.accessed = True
+        if self._data is None:
+            data = self._loader()
+            self._loader = None
+            if data is None:
+                # store 中沒有這個 sid (過期，或是別人指定的 sid): 不沿用，之後寫入時用新的 sid
+                self.sid = new_sid()
+                self.new = True
+                data = {}
+            self._data = data
+        return self._data
+
+    def _rotate(self):
+        if not self.new and self.previous_sid is None:
+            self.previous_sid = self.sid
+        self.sid = new_sid()
+        self.new = True
+        self.modified = True
+
+    def regenerate(self):
+        """保留內容、換發新的 sid (登入 / 權限改變時呼叫)"""
+        self.data
+        self._rotate()
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def clear(self):
+        # 不需要先載入舊資料；舊的 sid 可能不在 store 中，一律換發
+        self.accessed = True
+        self._data = {}
+        self._loader = None
+        self._rotate()
+
+    def __repr__(self):
+        return f"<ServerSideSession {self.sid} {self._data if self.loaded else '(not loaded)'}>"
+
+
+# ==================== Stores ====================
+
+class MemorySessionStore:
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            item = self._items.get(sid)
+            if item is None:
+                return None
+            if item[1] < time.time():
+                del self._items[sid]
+                return None
+            return item
+
+    def set(self, sid, payload, ttl):
+        with self._lock:
+            self._items[sid] = (payload, time.time() + ttl)
+
+    def delete(self, sid):
+        with self._lock:
+            self._items.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    """每個 thread 一條連線；寫入時順便清掉過期的 session"""
+
+    PURGE_EVERY = 100  # 每寫入幾次清一次過期資料
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " sid TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid):
+        row = self._connect().execute(
+            "SELECT payload, expires_at FROM sessions WHERE sid = ? AND expires_at >= ?", (sid, time.time())
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def set(self, sid, payload, ttl):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, payload, expires_at) VALUES (?, ?, ?)",
+                (sid, payload, now + ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now,))
+
+    def delete(self, sid):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class RedisSessionStore:
+    def __init__(self, url, prefix="session:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SESSION_BACKEND=redis 需要安裝 redis 套件 (pip install redis)") from e
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, sid):
+        pipe = self._redis.pipeline()
+        pipe.get(self.prefix + sid)
+        pipe.ttl(self.prefix + sid)
+        payload, ttl = pipe.execute()
+        if payload is None:
+            return None
+        return payload.decode("utf-8"), time.time() + max(ttl, 0)
+
+    def set(self, sid, payload, ttl):
+        self._redis.set(self.prefix + sid, payload, ex=max(int(ttl), 1))
+
+    def delete(self, sid):
+        self._redis.delete(self.prefix + sid)
+
+
+def create_store(app):
+    backend = app.config.get("SESSION_BACKEND", "sqlite")
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        path = app.config.get("SESSION_SQLITE_PATH") or os.path.join(app.instance_path, "sessions.sqlite3")
+        return SQLiteSessionStore(path)
+    if backend == "redis":
+        return RedisSessionStore(app.config.get("SESSION_REDIS_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend} (expected one of {', '.join(BACKENDS)})")
+
+
+# ==================== Session interface ====================
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    store 在第一個 request 時才依 SESSION_BACKEND 建立，
+    因此測試可以在建立 app 之後再改設定
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self):
+        self._store = None
+        self._backend = None
+        self._lock = threading.Lock()
+        self._cookie_interface = SecureCookieSessionInterface()
+
+    def _get_store(self, app):
+        backend = app.config.get("SESSION_BACKEND", "sqlite")
+        if self._store is None or self._backend != backend:
+            with self._lock:
+                if self._store is None or self._backend != backend:
+                    self._store = create_store(app)
+                    self._backend = backend
+        return self._store
+
+    def _ttl(self, app):
+        return app.permanent_session_lifetime.total_seconds()
+
+    def open_session(self, app, request):
+        if app.config.get("SESSION_BACKEND") == "cookie":
+            return self._cookie_interface.open_session(app, request)
+
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return ServerSideSession(new_sid(), new=True)
+
+        store = self._get_store(app)
+        ttl = self._ttl(app)
+
+        def load():
+            item = store.get(sid)
+            if item is None:
+                return None
+            payload, expires_at = item
+            if expires_at - time.time() < ttl / 2:
+                session.needs_refresh = True
+            try:
+                return self.serializer.loads(payload)
+            except ValueError:
+                return None
+
+        session = ServerSideSession(sid, loader=load)
+        return session
+
+    def save_session(self, app, session, response):
+        if app.config.get("SESSION_BACKEND") == "cookie":
+            return self._cookie_interface.save_session(app, session, response)
+
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        partitioned = self.get_cookie_partitioned(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        # 沒改過就不寫 store，也不重發 cookie
+        if not session.modified and not session.needs_refresh:
+            return
+
+        store = self._get_store(app)
+
+        if session.previous_sid:
+            store.delete(session.previous_sid)
+
+        if not session:
+            # 被清空: 刪掉 store 內的資料並移除 cookie
+            if not session.new:
+                store.delete(session.sid)
+            if not session.new or session.previous_sid:
+                response.delete_cookie(
+                    name, domain=domain, path=path, secure=secure,
+                    partitioned=partitioned, samesite=samesite, httponly=httponly,
+                )
+            return
+
+        store.set(session.sid, self.serializer.dumps(dict(session)), self._ttl(app))
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=httponly,
+            domain=domain,
+            path=path,
+            secure=secure,
+            partitioned=partitioned,
+            samesite=samesite,
+        )
+
+
+def regenerate_session():
+    """
+    換發目前 request 的 session id (登入、Email 驗證後自動登入、權限改變時呼叫)，
+    避免事先被植入的 sid 在登入後被沿用。cookie backend 沒有 sid，不需要處理
+    """
+    if isinstance(current_session._get_current_object(), ServerSideSession):
+        current_session.regenerate()
+
+
+def init_session(app):
+    """設定錯誤 (未知的 backend、redis 套件不存在) 在啟動時就失敗，而不是第一個 request 才發現"""
+    backend = app.config.get("SESSION_BACKEND", "sqlite")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend} (expected one of {', '.join(BACKENDS)})")
+    if backend == "redis":
+        try:
+            import redis  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("SESSION_BACKEND=redis 需要安裝 redis 套件 (pip install redis)") from e
+    app.session_interface = ServerSideSessionInterface()
@@ -0,0 +1,103 @@
+"""
+Snapshot cache: 以版本號管理、已序列化好的回應快取 (process 內)
+
+讀取端：
+    version = menu_snapshots.version(vendor_id)   # 先記下版本再查詢
+    snap = menu_snapshots.get(vendor_id)
+    if snap is None:
+        body = ...                                 # 查 DB + 序列化成 bytes
+        snap = menu_snapshots.put(vendor_id, version, body)
+
+寫入端 (commit 成功之後)：
+    menu_snapshots.bump(vendor_id)
+
+同一個 key 底下可以用 sub 存多份快照 (例如某店家的單一商品)，
+bump(key) 會讓該 key 底下所有快照一起失效。
+
+put() 只會在版本號沒被 bump 過時才寫入，避免「查詢中途被改動」的舊資料蓋掉新版本。
+快取只存在單一 process 中，多 worker 部署時其他 worker 只能靠 ttl 過期，
+因此 ttl 代表可接受的最長不一致時間。
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    body: bytes
+    etag: str                   # body 的內容雜湊 (strong ETag)
+    last_modified: datetime     # 內容最後一次變動的時間 (UTC, 秒)
+    built_at: float
+
+
+class SnapshotCache:
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versions: dict = {}
+        self._snapshots: dict = {}  # key -> {sub: Snapshot}
+
+    def version(self, key) -> int:
+        return self._versions.get(key, 0)
+
+    def get(self, key, sub=None) -> Snapshot | None:
+        snap = self._snapshots.get(key, {}).get(sub)
+        if snap is None:
+            return None
+        if snap.version != self._versions.get(key, 0):
+            return None
+        if self.ttl and time.monotonic() - snap.built_at > self.ttl:
+            return None
+        return snap
+
+    def put(self, key, version: int, body: bytes, sub=None) -> Snapshot:
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+        with self._lock:
+            # ttl 過期後重建出相同內容時，沿用原本的 Last-Modified
+            prev = self._snapshots.get(key, {}).get(sub)
+            if prev is not None and prev.etag == etag:
+                last_modified = prev.last_modified
+
+            snap = Snapshot(
+                version=version,
+                body=body,
+                etag=etag,
+                last_modified=last_modified,
+                built_at=time.monotonic(),
+            )
+            # 查詢期間版本已被 bump -> 這份資料可能是舊的，不寫入快取
+            if self._versions.get(key, 0) == version:
+                self._snapshots.setdefault(key, {})[sub] = snap
+        return snap
+
+    def bump(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._snapshots.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._snapshots):
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._snapshots.clear()
+
+
+# 各店家菜單與商品詳情 (key = vendor_id, sub = None 為整份菜單 / product_id 為單一商品)
+menu_snapshots = SnapshotCache(ttl=float(os.getenv("MENU_SNAPSHOT_TTL", "30")))
+
+# 公開店家列表 (key = PUBLIC_VENDORS_KEY)
+vendor_list_snapshots = SnapshotCache(ttl=float(os.getenv("VENDOR_LIST_SNAPSHOT_TTL", "60")))
+PUBLIC_VENDORS_KEY = "public"
+
+# 系統公告 (key = ANNOUNCEMENTS_KEY)
+announcement_snapshots = SnapshotCache(ttl=float(os.getenv("ANNOUNCEMENT_SNAPSHOT_TTL", "60")))
+ANNOUNCEMENTS_KEY = "all"
@@ -0,0 +1,326 @@
+"""
+Synthetic data: 產生壓測 / 容量測試用的大量資料
+
+    flask --app app generate-data --preset small            # 約 2 萬筆訂單
+    flask --app app generate-data --preset large --seed 7   # 約 300 萬筆訂單
+    flask --app app generate-data --preset medium --orders 100000
+
+依序產生 店家經理 -> 店家 -> 商品 (+ 甜度 / 冰塊 / 大小選項) -> 顧客 -> 訂單 (+ 訂單項目、評論)，
+每個階段切成 chunk，每個 chunk 以多列 INSERT 寫入並各自 commit。
+
+- 可重複執行: 每列資料帶有自然鍵 (email / image_url / note 以 synthetic-<seed> 開頭)，
+  重新執行時由最後一筆完成的 chunk 接著做，中斷後直接再跑一次即可 (chunk_size 需相同)
+- 可重現: 每個 chunk 的內容只由 (seed, 階段, chunk 編號) 決定
+- 熱門度偏斜: 店家、店內商品與顧客都依 Zipf 分佈抽樣，少數店家 / 商品佔大部分訂單
+
+主鍵直接指定為 MAX(id) + 1 起的連號 (店家 / 顧客的子表需要 user id)，
+請在沒有其他寫入的測試資料庫上執行。
+"""
+
+import bisect
+import random
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from config.database import db
+from models import (
+    Customer, Ice_Option, Order, Order_Item, Product, Review, Sizes_Option, Sugar_Option,
+    User, Vendor, Vendor_Manager,
+)
+
+SYNTHETIC_DOMAIN = "synthetic.local"
+SYNTHETIC_PASSWORD = "synthetic"
+INSERT_BATCH_SIZE = 1000  # 單一 INSERT 最多幾列
+
+SUGAR_OPTIONS = ("正常糖", "少糖", "半糖", "微糖", "無糖")
+ICE_OPTIONS = ("正常冰", "少冰", "微冰", "去冰", "熱")
+SIZE_OPTIONS = (("M", 0), ("L", 10), ("XL", 20))
+DRINK_NAMES = ("紅茶", "綠茶", "烏龍", "奶茶", "珍珠奶茶", "多多綠", "檸檬紅", "冬瓜茶", "鮮奶茶", "水果茶")
+RATING_WEIGHTS = ((5, 45), (4, 30), (3, 12), (2, 6), (1, 7))
+
+
+@dataclass(frozen=True)
+class Preset:
+    managers: int
+    vendors: int
+    products_per_vendor: int
+    customers: int
+    orders: int
+    max_items_per_order: int = 4
+    review_rate: float = 0.2
+    refund_rate: float = 0.02
+    days: int = 365
+    zipf_s: float = 1.1
+
+
+PRESETS = {
+    "small": Preset(managers=10, vendors=50, products_per_vendor=10, customers=1_000, orders=20_000),
+    "medium": Preset(managers=100, vendors=1_000, products_per_vendor=20, customers=20_000, orders=500_000),
+    "large": Preset(managers=500, vendors=5_000, products_per_vendor=12, customers=200_000, orders=3_000_000),
+}
+
+
+# ==================== 抽樣 ====================
+
+class ZipfSampler:
+    """依 Zipf 權重從 items 抽樣；熱門順序以 seed 打亂，避免熱門的都是 id 最小的"""
+
+    def __init__(self, items, s, seed):
+        self.items = list(items)
+        random.Random(seed).shuffle(self.items)
+        self.cum_weights = list(accumulate(1 / (rank + 1) ** s for rank in range(len(self.items))))
+
+    def sample(self, rng):
+        x = rng.random() * self.cum_weights[-1]
+        return self.items[bisect.bisect_right(self.cum_weights, x)]
+
+
+# ==================== 自然鍵 / 進度 ====================
+
+def _prefix(seed):
+    return f"synthetic-{seed}"
+
+
+def _email(seed, kind, index):
+    return f"{_prefix(seed)}-{kind}-{index}@{SYNTHETIC_DOMAIN}"
+
+
+def _image_url(seed, index):
+    return f"https://{SYNTHETIC_DOMAIN}/{_prefix(seed)}/product-{index}.jpg"
+
+
+def _order_note(seed, index):
+    return f"{_prefix(seed)}-order-{index}"
+
+
+def _last_index(key_column, id_column, prefix):
+    """該階段已完成的筆數 = 最後一筆自然鍵的編號 + 1 (依 id 由大到小找，通常第一列就是)"""
+    key = db.session.execute(
+        select(key_column).where(key_column.like(f"{prefix}%")).order_by(id_column.desc()).limit(1)
+    ).scalar()
+    if key is None:
+        return 0
+    return int(key[len(prefix):].split("@", 1)[0].split(".", 1)[0]) + 1
+
+
+def _next_id(column):
+    return (db.session.execute(select(func.max(column))).scalar() or 0) + 1
+
+
+def _insert(model, rows):
+    table = getattr(model, "__table__", model)
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.session.execute(insert(table).values(rows[start:start + INSERT_BATCH_SIZE]))
+
+
+def _chunks(done, total, chunk_size):
+    """(chunk 編號, 起點, 終點)，從第一個未完成的 chunk 開始"""
+    for start in range((done // chunk_size) * chunk_size, total, chunk_size):
+        yield start // chunk_size, max(start, done), min(start + chunk_size, total)
+
+
+def _rng(seed, stage, chunk):
+    return random.Random(f"{seed}:{stage}:{chunk}")
+
+
+# ==================== 各階段 ====================
+
+def _generate_managers(preset, seed, chunk_size, log):
+    done = _last_index(Vendor_Manager.email, Vendor_Manager.id, f"{_prefix(seed)}-manager-")
+    for _, start, end in _chunks(done, preset.managers, chunk_size):
+        _insert(Vendor_Manager, [
+            {"name": f"Manager {i}", "email": _email(seed, "manager", i), "phone_number": f"sm{seed}-{i}"}
+            for i in range(start, end)
+        ])
+        db.session.commit()
+        log("managers", end, preset.managers)
+
+
+def _generate_users(kind, total, seed, chunk_size, log, child_rows):
+    """users + 子表 (vendors / customers)，child_rows(index, user_id, rng) 回傳子表的一列"""
+    model = Vendor if kind == "vendor" else Customer
+    password = generate_password_hash(SYNTHETIC_PASSWORD)
+    done = _last_index(User.email, User.id, f"{_prefix(seed)}-{kind}-")
+    for chunk, start, end in _chunks(done, total, chunk_size):
+        rng = _rng(seed, kind, chunk)
+        first_id = _next_id(User.id)
+        users, children = [], []
+        for offset, i in enumerate(range(start, end)):
+            user_id = first_id + offset
+            users.append({
+                "id": user_id, "name": f"Synthetic {kind.title()} {i}", "email": _email(seed, kind, i),
+                "password": password, "phone_number": f"s{kind[0]}{seed}-{i}", "role": kind, "is_verified": True,
+            })
+            children.append(child_rows(i, user_id, rng))
+        _insert(User, users)
+        _insert(model.__table__, children)
+        db.session.commit()
+        log(f"{kind}s", end, total)
+
+
+def _synthetic_ids(id_column, key_column, prefix):
+    return db.session.execute(
+        select(id_column).where(key_column.like(f"{prefix}%")).order_by(id_column)
+    ).scalars().all()
+
+
+def _generate_products(preset, seed, chunk_size, log):
+    vendor_ids = _synthetic_ids(User.id, User.email, f"{_prefix(seed)}-vendor-")
+    total = len(vendor_ids) * preset.products_per_vendor
+    done = _last_index(Product.image_url, Product.id, f"https://{SYNTHETIC_DOMAIN}/{_prefix(seed)}/product-")
+    for chunk, start, end in _chunks(done, total, chunk_size):
+        rng = _rng(seed, "product", chunk)
+        first_id = _next_id(Product.id)
+        products, sugars, ices, sizes = [], [], [], []
+        for offset, i in enumerate(range(start, end)):
+            product_id = first_id + offset
+            products.append({
+                "id": product_id,
+                "vendor_id": vendor_ids[i // preset.products_per_vendor],
+                "name": f"{rng.choice(DRINK_NAMES)} {i % preset.products_per_vendor + 1}",
+                "price": rng.randrange(30, 90, 5),
+                "description": "synthetic product",
+                "image_url": _image_url(seed, i),
+                "is_listed": rng.random() > 0.05,
+            })
+            sugars += [{"product_id": product_id, "options": o} for o in rng.sample(SUGAR_OPTIONS, rng.randint(2, 5))]
+            ices += [{"product_id": product_id, "options": o} for o in rng.sample(ICE_OPTIONS, rng.randint(2, 5))]
+            sizes += [{"product_id": product_id, "options": o, "price_step": step}
+                      for o, step in SIZE_OPTIONS[:rng.randint(1, len(SIZE_OPTIONS))]]
+        _insert(Product, products)
+        _insert(Sugar_Option, sugars)
+        _insert(Ice_Option, ices)
+        _insert(Sizes_Option, sizes)
+        db.session.commit()
+        log("products", end, total)
+
+
+def _generate_orders(preset, seed, chunk_size, log, end_time):
+    customer_ids = _synthetic_ids(User.id, User.email, f"{_prefix(seed)}-customer-")
+    vendor_ids = _synthetic_ids(User.id, User.email, f"{_prefix(seed)}-vendor-")
+    products = {}
+    for product_id, vendor_id, price in db.session.execute(
+        select(Product.id, Product.vendor_id, Product.price)
+        .where(Product.image_url.like(f"https://{SYNTHETIC_DOMAIN}/{_prefix(seed)}/%"))
+        .order_by(Product.id)
+    ):
+        products.setdefault(vendor_id, []).append((product_id, price))
+    if not customer_ids or not products:
+        return
+
+    vendors = ZipfSampler([v for v in vendor_ids if v in products], preset.zipf_s, f"{seed}:vendors")
+    customers = ZipfSampler(customer_ids, 0.8, f"{seed}:customers")
+    menus = {v: ZipfSampler(items, preset.zipf_s, f"{seed}:menu:{v}") for v, items in products.items()}
+    ratings, rating_weights = zip(*RATING_WEIGHTS)
+    span_seconds = preset.days * 86400
+
+    done = _last_index(Order.note, Order.id, f"{_prefix(seed)}-order-")
+    for chunk, start, end in _chunks(done, preset.orders, chunk_size):
+        rng = _rng(seed, "order", chunk)
+        first_id = _next_id(Order.id)
+        orders, items, reviews = [], [], []
+        for offset, i in enumerate(range(start, end)):
+            order_id = first_id + offset
+            vendor_id = vendors.sample(rng)
+            customer_id = customers.sample(rng)
+            created_at = end_time - timedelta(seconds=rng.randrange(span_seconds))
+
+            lines = {}
+            for _ in range(rng.randint(1, preset.max_items_per_order)):
+                product_id, price = menus[vendor_id].sample(rng)
+                if product_id not in lines:  # order_items 主鍵含 product_id
+                    size, step = rng.choice(SIZE_OPTIONS)
+                    lines[product_id] = {
+                        "order_id": order_id, "product_id": product_id, "quantity": rng.randint(1, 3),
+                        "price": price + step, "selected_sugar": rng.choice(SUGAR_OPTIONS),
+                        "selected_ice": rng.choice(ICE_OPTIONS), "selected_size": size,
+                    }
+            items.extend(lines.values())
+
+            is_completed = rng.random() < 0.9
+            is_refunded = is_completed and rng.random() < preset.refund_rate
+            is_delivered = rng.random() < 0.4
+            orders.append({
+                "id": order_id, "user_id": customer_id, "vendor_id": vendor_id,
+                "total_price": sum(line["price"] * line["quantity"] for line in lines.values()),
+                "note": _order_note(seed, i), "payment_methods": rng.choice(("cash", "button")),
+                "refund_status": "refunded" if is_refunded else None,
+                "refund_at": created_at + timedelta(days=1) if is_refunded else None,
+                "is_completed": is_completed, "is_delivered": is_delivered,
+                "deliver_status": "delivered" if is_delivered and is_completed else None,
+                "address_info": f"Synthetic Customer Address {customer_id}" if is_delivered else None,
+                "discount_amount": 0, "created_at": created_at, "updated_at": created_at,
+            })
+            if is_completed and not is_refunded and rng.random() < preset.review_rate:
+                reviews.append({
+                    "order_id": order_id, "customer_id": customer_id, "vendor_id": vendor_id,
+                    "rating": rng.choices(ratings, rating_weights)[0], "review_content": "synthetic review",
+                    "created_at": created_at + timedelta(hours=rng.randint(1, 72)),
+                })
+        _insert(Order, orders)
+        _insert(Order_Item, items)
+        _insert(Review, reviews)
+        db.session.commit()
+        log("orders", end, preset.orders)
+
+
+def _rebuild_derived():
+    """訂單 / 評論是直接寫入的，彙總表與計數要重建"""
+    from utils.membership import reconcile_membership
+    from utils.sales_rollup import rebuild_sales_rollups
+    from utils.vendor_rating import rebuild_vendor_ratings
+    from utils.vendor_revenue import reconcile_revenue
+
+    rebuild_sales_rollups()
+    rebuild_vendor_ratings()
+    reconcile_membership()
+    reconcile_revenue()
+
+
+def generate(preset, seed=0, chunk_size=2000, log=None, rebuild_derived=True, end_time=None):
+    """
+    產生 preset 描述的資料量 (已存在的部分會略過)
+    preset: PRESETS 的 key 或 Preset
+    log(stage, done, total): 每個 chunk commit 後呼叫
+    """
+    if isinstance(preset, str):
+        preset = PRESETS[preset]
+    log = log or (lambda stage, done, total: None)
+    # 預設以今天 00:00 (UTC) 為終點，同一天內重跑會得到相同的時間
+    end_time = end_time or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+    manager_ids = []
+
+    def vendor_row(i, user_id, rng):
+        return {
+            "user_id": user_id, "vendor_manager_id": manager_ids[i % len(manager_ids)], "is_active": True,
+            "address": f"Synthetic Rd. {seed}-{i}", "description": "synthetic vendor",
+        }
+
+    def customer_row(i, user_id, rng):
+        return {
+            "user_id": user_id, "address": f"Synthetic Customer Address {user_id}",
+            "stored_balance": rng.randrange(0, 2000, 50),
+        }
+
+    _generate_managers(preset, seed, chunk_size, log)
+    manager_ids = _synthetic_ids(Vendor_Manager.id, Vendor_Manager.email, f"{_prefix(seed)}-manager-")
+    _generate_users("vendor", preset.vendors, seed, chunk_size, log, vendor_row)
+    _generate_products(preset, seed, chunk_size, log)
+    _generate_users("customer", preset.customers, seed, chunk_size, log, customer_row)
+    _generate_orders(preset, seed, chunk_size, log, end_time)
+
+    if rebuild_derived:
+        _rebuild_derived()
+    return preset
+
+
+def scaled(preset, **overrides):
+    """以 preset 為基礎覆寫部分數量，例如 scaled("medium", orders=100000)"""
+    if isinstance(preset, str):
+        preset = PRESETS[preset]
+    return replace(preset, **{k: v for k, v in overrides.items() if v is not None})
@@ -1,34 +1,65 @@
-from models import User
+"""
+排程維護工作 (由 utils.job_runner 包上分散式鎖與執行紀錄後執行)
+
+每個工作回傳處理的資料筆數，寫進 auth.job_runs。
+"""
+
+from sqlalchemy import select, delete, func
+
 from config.database import db
-from datetime import datetime, timedelta
+from models import User, Admin, Vendor, Customer, Cart, Cart_Item, Block_Record
+from datetime import datetime
+
+CLEANUP_CHUNK_SIZE = 500
+
+
+def _unverified_condition(threshold):
+    users = User.__table__
+    return (users.c.is_verified == False) & (users.c.verification_code_expires_at < threshold)
 
-def cleanup_unverified_users(app):
+
+def cleanup_unverified_users(chunk_size=None):
     """
-    清理未驗證且過期的使用者帳號
-    條件: is_verified=False 且 驗證碼過期時間已到
+    清理未驗證且過期的使用者帳號，回傳刪除的帳號數
+    條件: is_verified=False 且 驗證碼過期時間已到 (走 idx_users_verified_expires)
+
+    依 id 範圍分批處理，每批:
+      1. 以 SELECT ... FOR UPDATE 取出並鎖住範圍內符合條件的 id (最多 chunk_size 個)，
+         同時進行的 Email 驗證會等這批 commit；在鎖之前已驗證的帳號不會被選到
+      2. 由子表往父表以 set-based DELETE 刪除
+         cart_items -> carts -> block_records -> customers / vendors / admins -> users
+         (刪除 users 時再套用一次條件)
+      3. commit，鎖只持有一小段時間，不會長時間卡住註冊 / 登入
+    MySQL 不允許 DELETE users 的子查詢再讀 users (error 1093)，所以先把 id 取出來。
     """
-    with app.app_context():
-        try:
-            # 找出過期的帳號 (寬限期: 驗證碼過期後再加 10 分鐘，共 20 分鐘)
-            # 或者嚴格一點，只要 expires_at < now 就刪除
-            threshold = datetime.now()
-            
-            users_to_delete = User.query.filter(
-                User.is_verified == False,
-                User.verification_code_expires_at < threshold
-            ).all()
-
-            if users_to_delete:
-                count = len(users_to_delete)
-                for user in users_to_delete:
-                    db.session.delete(user)
-                
-                db.session.commit()
-                print(f"[Scheduler] Cleaned up {count} unverified users.")
-            else:
-                pass
-                # print("[Scheduler] No unverified users to clean.")
-
-        except Exception as e:
-            db.session.rollback()
-            print(f"[Scheduler Error] Cleanup failed: {str(e)}")
+    chunk_size = chunk_size or CLEANUP_CHUNK_SIZE
+    users = User.__table__
+    threshold = datetime.now()
+    condition = _unverified_condition(threshold)
+
+    low, high = db.session.execute(
+        select(func.min(users.c.id), func.max(users.c.id)).where(condition)
+    ).one()
+    if low is None:
+        return 0
+
+    deleted = 0
+    for start in range(low, high + 1, chunk_size):
+        ids = db.session.execute(
+            select(users.c.id)
+            .where(condition, users.c.id.between(start, start + chunk_size - 1))
+            .with_for_update()
+        ).scalars().all()
+        if not ids:
+            continue
+
+        db.session.execute(delete(Cart_Item.__table__).where(Cart_Item.__table__.c.cart_id.in_(ids)))
+        db.session.execute(delete(Cart.__table__).where(Cart.__table__.c.customer_id.in_(ids)))
+        db.session.execute(delete(Block_Record.__table__).where(Block_Record.__table__.c.user_id.in_(ids)))
+        for model in (Customer, Vendor, Admin):
+            db.session.execute(delete(model.__table__).where(model.__table__.c.user_id.in_(ids)))
+        result = db.session.execute(delete(users).where(condition, users.c.id.in_(ids)))
+        db.session.commit()
+        deleted += result.rowcount
+
+    return deleted
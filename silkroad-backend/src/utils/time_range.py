@@ -0,0 +1,45 @@
+"""
+時間區間工具
+
+DB 內的時間一律存 UTC，前端看到/輸入的日期則是台灣時間 (UTC+8)。
+- parse_local_date_range: 把 'YYYY-MM-DD' 的 from / to (台灣日期, 含頭含尾)
+  轉成 UTC 的 [start, end) 區間，可直接拿去比對 _created_at
+- tw_local_time: SQL 端把 UTC 欄位轉成台灣時間的表達式 (台灣沒有日光節約，固定 +8)
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+TW_OFFSET = timedelta(hours=8)
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def parse_local_date(date_string):
+    if not date_string:
+        return None
+
+    try:
+        return datetime.strptime(date_string, DATE_FORMAT)
+    except ValueError:
+        raise ValueError(f"日期格式錯誤，應為 YYYY-MM-DD: {date_string}")
+
+
+def parse_local_date_range(date_from, date_to):
+    """
+    回傳 (start_utc, end_utc)，沒有給的一端為 None
+    end_utc 為「to 的隔天 00:00 (台灣時間)」換算成 UTC，使用時以 < 比較
+    """
+    start = parse_local_date(date_from)
+    end = parse_local_date(date_to)
+
+    if start and end and start > end:
+        raise ValueError("起始日期不可晚於結束日期")
+
+    start_utc = start - TW_OFFSET if start else None
+    end_utc = end + timedelta(days=1) - TW_OFFSET if end else None
+    return start_utc, end_utc
+
+
+def tw_local_time(column):
+    return func.convert_tz(column, "+00:00", "+08:00")
@@ -0,0 +1,54 @@
+"""
+Upsert helper
+
+MySQL 走 INSERT ... ON DUPLICATE KEY UPDATE；其他 dialect (例如本機的 SQLite)
+走 INSERT ... ON CONFLICT DO UPDATE，兩邊語意相同。測試與正式環境都是 MySQL。
+在目前的 db.session transaction 中執行，呼叫端自行 commit。
+"""
+
+from config.database import db
+
+
+def upsert(model, rows, increments=(), overwrites=(), conflict_cols=None):
+    """
+    model:         ORM model 或 Table
+    rows:          dict 或 list[dict]
+    increments:    衝突時「累加」的欄位 (col = col + 新值)
+    overwrites:    衝突時「覆寫」的欄位 (col = 新值)
+    conflict_cols: 判斷衝突的欄位 (SQLite 需要)，預設為主鍵
+    """
+    table = getattr(model, "__table__", model)
+    if isinstance(rows, dict):
+        rows = [rows]
+    if not rows:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table).values(rows)
+        new = stmt.inserted
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+        stmt = insert(table).values(rows)
+        new = stmt.excluded
+
+    changes = {c: table.c[c] + new[c] for c in increments}
+    changes.update({c: new[c] for c in overwrites})
+
+    if dialect == "mysql":
+        if changes:
+            stmt = stmt.on_duplicate_key_update(changes)
+        else:
+            stmt = stmt.prefix_with("IGNORE")
+    elif changes:
+        if conflict_cols is None:
+            conflict_cols = [c.name for c in table.primary_key.columns]
+        stmt = stmt.on_conflict_do_update(index_elements=conflict_cols, set_=changes)
+    else:
+        stmt = stmt.on_conflict_do_nothing()
+
+    db.session.execute(stmt)
@@ -0,0 +1,82 @@
+"""
+Vendor rating: 店家評分彙總 (store.vendor_ratings) 的維護
+
+- 增量：post_vendor_review 新增評論時呼叫 add_review() (與評論同一個 transaction)
+- 重建：rebuild_vendor_ratings() 由 store.reviews 整批重算 (flask rebuild-vendor-ratings)
+- 檢查：find_rating_mismatches() 只比對不寫入 (flask rebuild-vendor-ratings --check)
+"""
+
+from sqlalchemy import case, func, select
+
+from config.database import db
+from models import Review, Vendor_Rating
+from utils.upsert import upsert
+
+RATING_COLUMNS = ["review_count", "rating_sum"] + [f"rating_{star}" for star in range(1, 6)]
+
+
+def add_review(vendor_id: int, rating: int):
+    """把一則評論加進彙總，不 commit"""
+    row = {"vendor_id": vendor_id, "review_count": 1, "rating_sum": rating}
+    for star in range(1, 6):
+        row[f"rating_{star}"] = 1 if rating == star else 0
+
+    upsert(Vendor_Rating, row, increments=RATING_COLUMNS)
+
+
+def _recomputed_ratings(vendor_id=None):
+    """由 store.reviews 即時算出的彙總 (欄位順序同 ["vendor_id"] + RATING_COLUMNS)"""
+    source = (
+        select(
+            Review.vendor_id,
+            func.count(Review.id),
+            func.sum(Review.rating),
+            *[func.sum(case((Review.rating == star, 1), else_=0)) for star in range(1, 6)],
+        )
+        .group_by(Review.vendor_id)
+    )
+    if vendor_id is not None:
+        source = source.where(Review.vendor_id == vendor_id)
+    return source
+
+
+def find_rating_mismatches(vendor_id=None):
+    """回傳彙總與評論不一致的 vendor_id 清單 (不修改資料)"""
+    expected = {
+        row[0]: tuple(int(v or 0) for v in row[1:])
+        for row in db.session.execute(_recomputed_ratings(vendor_id))
+    }
+
+    stored_query = db.session.query(Vendor_Rating)
+    if vendor_id is not None:
+        stored_query = stored_query.filter(Vendor_Rating.vendor_id == vendor_id)
+    stored = {
+        r.vendor_id: tuple(getattr(r, c) for c in RATING_COLUMNS)
+        for r in stored_query
+    }
+
+    empty = (0,) * len(RATING_COLUMNS)
+    return sorted(
+        vid for vid in expected.keys() | stored.keys()
+        if expected.get(vid, empty) != stored.get(vid, empty)
+    )
+
+
+def rebuild_vendor_ratings(vendor_id=None):
+    """由評論重建彙總 (vendor_id 為 None 時重建全部)，回傳寫入的店家數"""
+    ratings = db.session.query(Vendor_Rating)
+    source = _recomputed_ratings(vendor_id)
+    if vendor_id is not None:
+        ratings = ratings.filter(Vendor_Rating.vendor_id == vendor_id)
+
+    try:
+        ratings.delete(synchronize_session=False)
+        count = db.session.execute(
+            Vendor_Rating.__table__.insert().from_select(["vendor_id"] + RATING_COLUMNS, source)
+        ).rowcount
+        db.session.commit()
+        return count
+
+    except Exception:
+        db.session.rollback()
+        raise
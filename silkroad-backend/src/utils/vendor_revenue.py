@@ -0,0 +1,108 @@
+"""
+Vendor revenue: 店家營業額 (vendors.revenue) 的維護
+
+- 增量：訂單「是否計入」改變時 (完成 / 退款)，呼叫 apply_revenue(vendor_id, ±total_price)
+        以單一 UPDATE revenue = revenue + delta 原子地調整 (與訂單更新在同一個 transaction)
+- 分片：熱門店家每分鐘完成上百筆訂單時，所有 transaction 都會在同一列 vendors 上排隊。
+        VENDOR_REVENUE_SHARDS = N (> 0) 時改為隨機累加 order.vendor_revenue_shards 的 N 列之一，
+        讀取時加總 (revenue_of)。VENDOR_REVENUE_SHARDED_VENDORS 可限定只有哪些店家分片
+        (逗號分隔的 id，空白 = 全部店家)
+- 對帳：reconcile_revenue() 把分片併回 vendors.revenue，並由訂單重算營業額，只修正不一致的列
+        (排程工作 reconcile_vendor_revenue，或 flask --app app run-job reconcile_vendor_revenue)
+
+計入的訂單與銷售 rollup 相同 = 已完成 (is_completed) 且未退款 (refund_status != 'refunded')
+"""
+
+import random
+
+from flask import current_app
+from sqlalchemy import delete, func, or_, select, update
+
+from config.database import db
+from models import Order, Vendor, Vendor_Revenue_Shard
+from utils.upsert import upsert
+
+
+def shard_count(vendor_id):
+    """這個店家的分片數，0 代表直接更新 vendors.revenue"""
+    shards = current_app.config.get("VENDOR_REVENUE_SHARDS", 0)
+    sharded_vendors = current_app.config.get("VENDOR_REVENUE_SHARDED_VENDORS")
+    if shards <= 0 or (sharded_vendors and vendor_id not in sharded_vendors):
+        return 0
+    return shards
+
+
+def apply_revenue(vendor_id, delta):
+    """調整店家營業額，不 commit"""
+    if not delta:
+        return
+    shards = shard_count(vendor_id)
+    if shards:
+        upsert(
+            Vendor_Revenue_Shard,
+            {"vendor_id": vendor_id, "shard_no": random.randrange(shards), "amount": delta},
+            increments=("amount",),
+        )
+        return
+
+    vendors = Vendor.__table__
+    db.session.execute(
+        update(vendors)
+        .where(vendors.c.user_id == vendor_id)
+        .values(revenue=vendors.c.revenue + delta)
+    )
+
+
+def revenue_of(vendor_id):
+    """店家營業額 = vendors.revenue + 分片加總"""
+    vendors = Vendor.__table__
+    shards = Vendor_Revenue_Shard.__table__
+    shard_sum = (
+        select(func.coalesce(func.sum(shards.c.amount), 0))
+        .where(shards.c.vendor_id == vendors.c.user_id)
+        .scalar_subquery()
+    )
+    return db.session.execute(
+        select(vendors.c.revenue + shard_sum).where(vendors.c.user_id == vendor_id)
+    ).scalar() or 0
+
+
+def reconcile_revenue():
+    """
+    1. 把分片併回 vendors.revenue 並刪除分片 (同一個 transaction，讀取分片時鎖住這些列)
+    2. 由訂單重算營業額，回傳修正的店家數
+    """
+    vendors = Vendor.__table__
+    shards = Vendor_Revenue_Shard.__table__
+    orders = Order.__table__
+
+    shard_totals = db.session.execute(
+        select(shards.c.vendor_id, func.sum(shards.c.amount))
+        .group_by(shards.c.vendor_id)
+        .with_for_update()
+    ).all()
+    for vendor_id, amount in shard_totals:
+        db.session.execute(
+            update(vendors)
+            .where(vendors.c.user_id == vendor_id)
+            .values(revenue=vendors.c.revenue + amount)
+        )
+    if shard_totals:
+        db.session.execute(delete(shards).where(shards.c.vendor_id.in_([v for v, _ in shard_totals])))
+
+    actual = (
+        select(func.coalesce(func.sum(orders.c.total_price), 0))
+        .where(
+            orders.c.vendor_id == vendors.c.user_id,
+            orders.c.is_completed == True,
+            or_(orders.c.refund_status.is_(None), orders.c.refund_status != "refunded"),
+        )
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(vendors)
+        .where(vendors.c.revenue != actual)
+        .values(revenue=actual)
+    )
+    db.session.commit()
+    return result.rowcount
@@ -6,6 +6,7 @@ Tests cover:
 - Remove items from cart
 - View cart contents
 - Cross-vendor cart validation
+- Guest cart merge on login
 """
 
 import pytest
@@ -483,9 +484,40 @@ class TestViewCart:
         )
         
         assert response.status_code == 404
-        
 
-    
+    def test_view_cart_size_pricing(self, app, authenticated_client, test_customer, test_vendor, test_product):
+        """Unit price is base price plus the selected size's price_step."""
+        from src.config import db
+        from src.models import Sizes_Option
+
+        with app.app_context():
+            db.session.add(Sizes_Option(product_id=test_product, options="XL", price_step=15))
+            db.session.commit()
+
+        for size, quantity in (("XL", 2), ("unknown", 1)):
+            authenticated_client.post(
+                '/api/cart/add',
+                data=json.dumps({
+                    "customer_id": test_customer,
+                    "vendor_id": test_vendor,
+                    "product_id": test_product,
+                    "quantity": quantity,
+                    "selected_sugar": "normal",
+                    "selected_ice": "less",
+                    "selected_size": size
+                }),
+                content_type='application/json'
+            )
+
+        response = authenticated_client.get(f'/api/cart/view/{test_customer}')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        prices = {item['selected_size']: (item['price'], item['subtotal']) for item in data['data']}
+        assert prices == {"XL": (65, 130), "unknown": (50, 50)}
+        assert data['total_amount'] == 180
+
+
 class TestRemoveFromCart:
     """Test suite for remove from cart endpoint."""
 
@@ -623,3 +655,92 @@ class TestCartIntegration:
         assert final_data["success"] == True
         assert final_data['total_amount'] == 0
         assert final_data["data"] == []
+
+
+class TestGuestCartMerge:
+    """Guest cart lines are merged into the customer's cart on login."""
+
+    def _line(self, vendor_id, product_id, quantity, size="M"):
+        return {
+            "vendor_id": vendor_id,
+            "product_id": product_id,
+            "quantity": quantity,
+            "selected_sugar": "normal",
+            "selected_ice": "less",
+            "selected_size": size,
+        }
+
+    def test_login_merges_matching_lines(self, app, client, test_customer, test_vendor, test_product, test_product_2):
+        """Same-spec lines add up, new specs are inserted, nothing is duplicated."""
+        from src.config import db
+        from src.models import Cart, Cart_Item, Customer
+
+        with app.app_context():
+            customer = db.session.get(Customer, test_customer)
+            customer.is_verified = True
+            email = customer.email
+            db.session.add(Cart(customer_id=test_customer, vendor_id=test_vendor))
+            db.session.flush()
+            db.session.add(Cart_Item(cart_id=test_customer, product_id=test_product, quantity=2,
+                                     selected_sugar="normal", selected_ice="less", selected_size="M"))
+            db.session.commit()
+
+        for line in (self._line(test_vendor, test_product, 1),
+                     self._line(test_vendor, test_product_2, 3),
+                     self._line(test_vendor, test_product_2, 1, size="L")):
+            rsp = client.post('/api/cart/add', data=json.dumps(line), content_type='application/json')
+            assert rsp.status_code == 200
+
+        rsp = client.post('/api/user/login', data=json.dumps({
+            "email": email,
+            "password": "customer123"
+        }), content_type='application/json')
+        assert rsp.status_code == 200
+
+        with app.app_context():
+            lines = sorted(
+                (i.product_id, i.selected_size, i.quantity)
+                for i in Cart_Item.query.filter_by(cart_id=test_customer)
+            )
+        assert lines == sorted([(test_product, "M", 3), (test_product_2, "M", 3), (test_product_2, "L", 1)])
+
+        with client.session_transaction() as sess:
+            assert 'cart' not in sess
+
+    def test_add_same_line_accumulates(self, app, authenticated_client, test_customer, test_vendor, test_product):
+        """Adding the same spec twice while logged in adds to the existing line."""
+        from src.models import Cart_Item
+
+        for quantity in (2, 3):
+            rsp = authenticated_client.post('/api/cart/add', data=json.dumps(
+                dict(self._line(test_vendor, test_product, quantity), customer_id=test_customer)
+            ), content_type='application/json')
+            assert rsp.status_code == 200
+
+        with app.app_context():
+            lines = [(i.product_id, i.selected_size, i.quantity) for i in Cart_Item.query.filter_by(cart_id=test_customer)]
+        assert lines == [(test_product, "M", 5)]
+
+    def test_update_into_existing_line_merges(self, app, authenticated_client, test_customer, test_vendor, test_product):
+        """Changing a line's options to match another line folds them together."""
+        from src.models import Cart_Item
+
+        for size in ("M", "L"):
+            rsp = authenticated_client.post('/api/cart/add', data=json.dumps(
+                dict(self._line(test_vendor, test_product, 2), customer_id=test_customer, selected_size=size)
+            ), content_type='application/json')
+            assert rsp.status_code == 200
+
+        with app.app_context():
+            large = Cart_Item.query.filter_by(cart_id=test_customer, selected_size="L").one()
+            large_id = large.id
+
+        rsp = authenticated_client.post('/api/cart/update', data=json.dumps({
+            "cart_item_id": large_id,
+            "selected_size": "M",
+        }), content_type='application/json')
+        assert rsp.status_code == 200
+
+        with app.app_context():
+            lines = [(i.selected_size, i.quantity) for i in Cart_Item.query.filter_by(cart_id=test_customer)]
+        assert lines == [("M", 4)]
@@ -0,0 +1,25 @@
+"""
+API Tests for the health endpoints (/healthz, /readyz).
+"""
+
+
+def _session_cookie(response):
+    return next((h for h in response.headers.getlist('Set-Cookie') if h.startswith('flask_session=')), None)
+
+
+def test_healthz(client):
+    """Liveness does not touch the database or the session."""
+    rsp = client.get('/healthz')
+
+    assert rsp.status_code == 200
+    assert rsp.get_data(as_text=True) == 'ok'
+    assert rsp.headers['Cache-Control'] == 'no-store'
+    assert _session_cookie(rsp) is None
+
+
+def test_readyz(client, _db):
+    """Readiness checks the database connection."""
+    rsp = client.get('/readyz')
+
+    assert rsp.status_code == 200
+    assert rsp.get_json()['status'] == 'ok'
@@ -0,0 +1,50 @@
+"""
+API Tests for request metrics (/metrics, X-Debug-Queries).
+"""
+
+
+def test_metrics_records_request(client, _db):
+    """A request shows up in the duration / SQL histograms with its endpoint label."""
+    client.get('/readyz')
+    rsp = client.get('/metrics')
+
+    assert rsp.status_code == 200
+    body = rsp.get_data(as_text=True)
+    assert '# TYPE silkroad_request_duration_seconds histogram' in body
+    assert 'silkroad_request_duration_seconds_count{endpoint="readyz",method="GET",status="200"' in body
+    assert 'silkroad_request_sql_statements_count{endpoint="readyz"' in body
+    assert 'silkroad_response_size_bytes_bucket{endpoint="readyz"' in body
+
+
+def test_metrics_token(app, client):
+    """With METRICS_TOKEN set, scraping needs the bearer token."""
+    app.config['METRICS_TOKEN'] = 'secret'
+    try:
+        assert client.get('/metrics').status_code == 403
+        rsp = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+        assert rsp.status_code == 200
+    finally:
+        app.config['METRICS_TOKEN'] = None
+
+
+def test_debug_queries_disabled_by_default(client, _db):
+    """The header is ignored unless METRICS_DEBUG_QUERIES is on."""
+    rsp = client.get('/readyz', headers={'X-Debug-Queries': '1'})
+
+    assert 'X-Query-Count' not in rsp.headers
+    assert 'debug_queries' not in rsp.get_json()
+
+
+def test_debug_queries(app, client, _db):
+    """X-Debug-Queries: 1 lists the statements the request executed."""
+    app.config['METRICS_DEBUG_QUERIES'] = True
+    try:
+        rsp = client.get('/readyz', headers={'X-Debug-Queries': '1'})
+    finally:
+        app.config['METRICS_DEBUG_QUERIES'] = False
+
+    data = rsp.get_json()
+    assert int(rsp.headers['X-Query-Count']) >= 1
+    assert data['status'] == 'ok'
+    assert data['debug_queries']['count'] == int(rsp.headers['X-Query-Count'])
+    assert any('SELECT 1' in q['sql'] for q in data['debug_queries']['statements'])
@@ -0,0 +1,481 @@
+"""
+API Tests for Order endpoints (/api/order/*).
+
+Tests cover:
+- Order history pagination and filters
+- Checkout pricing
+- Checkout idempotency keys, stored-balance payment and concurrent checkouts
+- Membership counter maintenance on completion / refund
+- Vendor revenue counters (atomic, sharded) and reconciliation
+"""
+
+import pytest
+import json
+
+from src.config import db
+from src.models import Order, Order_Item, Customer
+
+
+@pytest.fixture(scope='function')
+def order_history(app, test_customer, test_vendor, test_product):
+    """Create 5 orders (the 2 newest completed). Returns order IDs, oldest first."""
+    with app.app_context():
+        order_ids = []
+        for i in range(5):
+            order = Order(
+                user_id=test_customer,
+                vendor_id=test_vendor,
+                total_price=50,
+                payment_methods='cash',
+                is_delivered=False,
+                is_completed=i >= 3,
+            )
+            db.session.add(order)
+            db.session.flush()
+            db.session.add(Order_Item(order_id=order.id, product_id=test_product, quantity=1, price=50))
+            order_ids.append(order.id)
+        db.session.commit()
+        return order_ids
+
+
+class TestOrderHistory:
+    """Test suite for order history listing."""
+
+    def _list(self, client, payload, path='/api/order/view_user_orders'):
+        return client.post(path, data=json.dumps(payload), content_type='application/json')
+
+    def test_unpaginated_returns_all(self, client, test_customer, order_history):
+        """Without cursor/limit the whole history is returned, as before."""
+        rsp = self._list(client, {"user_id": test_customer})
+
+        assert rsp.status_code == 200
+        data = rsp.get_json()
+        assert [o['order_id'] for o in data['data']] == order_history[::-1]
+        assert data['next_cursor'] is None
+        assert 'items' in data['data'][0]
+
+    def test_keyset_pagination(self, client, test_vendor, order_history):
+        """Pages follow next_cursor until it is exhausted."""
+        seen = []
+        payload = {"vendor_id": test_vendor, "limit": 2}
+        while True:
+            rsp = self._list(client, payload, '/api/order/view_vendor_orders')
+            assert rsp.status_code == 200
+            data = rsp.get_json()
+            assert len(data['data']) <= 2
+            seen += [o['order_id'] for o in data['data']]
+            if data['next_cursor'] is None:
+                break
+            payload['cursor'] = data['next_cursor']
+
+        assert seen == order_history[::-1]
+
+    def test_filters_and_summary_only(self, client, test_customer, order_history):
+        """Status filters apply and summary_only drops the items."""
+        rsp = self._list(client, {"user_id": test_customer, "is_completed": True, "summary_only": True})
+
+        assert rsp.status_code == 200
+        data = rsp.get_json()
+        assert [o['order_id'] for o in data['data']] == order_history[:2:-1]
+        assert all('items' not in o for o in data['data'])
+
+    def test_invalid_params(self, client, test_customer):
+        """Bad pagination / filter values are rejected with 400."""
+        for payload in ({"limit": 0}, {"cursor": "abc"}, {"refund_status": "oops"}, {"from": "2024/01/01"}):
+            rsp = self._list(client, {"user_id": test_customer, **payload})
+            assert rsp.status_code == 400
+            assert rsp.get_json()['success'] is False
+
+
+class TestCheckout:
+    """Test suite for turning a cart into an order."""
+
+    def test_checkout_uses_cart_prices(self, app, authenticated_client, test_customer, test_vendor, test_product):
+        """Order items are priced exactly like the cart view (base + size step)."""
+        from src.models import Vendor, Sizes_Option
+
+        with app.app_context():
+            db.session.get(Vendor, test_vendor).is_verified = True
+            db.session.add(Sizes_Option(product_id=test_product, options="XL", price_step=15))
+            db.session.commit()
+
+        authenticated_client.post('/api/cart/add', data=json.dumps({
+            "customer_id": test_customer,
+            "vendor_id": test_vendor,
+            "product_id": test_product,
+            "quantity": 2,
+            "selected_sugar": "normal",
+            "selected_ice": "less",
+            "selected_size": "XL"
+        }), content_type='application/json')
+        cart_total = authenticated_client.get(f'/api/cart/view/{test_customer}').get_json()['total_amount']
+
+        rsp = authenticated_client.post('/api/order/trans', data=json.dumps({
+            "customer_id": test_customer,
+            "vendor_id": test_vendor,
+            "payment_methods": "cash",
+        }), content_type='application/json')
+
+        assert rsp.status_code == 201
+        data = rsp.get_json()
+        assert data['total_amount'] == cart_total == 130
+
+        with app.app_context():
+            items = Order_Item.query.filter_by(order_id=data['order_id']).all()
+            assert [(i.quantity, i.price) for i in items] == [(2, 65)]
+
+    def test_checkout_applies_discount(self, app, authenticated_client, test_customer, test_vendor, test_vendor2, test_product):
+        """Policies are validated against the cart's vendor and cannot be reused."""
+        from src.models import Vendor, Discount_Policy
+
+        with app.app_context():
+            db.session.get(Vendor, test_vendor).is_verified = True
+            db.session.get(Vendor, test_vendor2).is_verified = True
+            own = Discount_Policy(vendor_id=test_vendor, is_available=True, type="fixed", value=30, membership_limit=0)
+            other = Discount_Policy(vendor_id=test_vendor2, is_available=True, type="fixed", value=30, membership_limit=0)
+            db.session.add_all([own, other])
+            db.session.commit()
+            own_id, other_id = own.id, other.id
+
+        def checkout(policy_id):
+            authenticated_client.post('/api/cart/add', data=json.dumps({
+                "customer_id": test_customer,
+                "vendor_id": test_vendor,
+                "product_id": test_product,
+                "quantity": 2,
+                "selected_sugar": "normal",
+                "selected_ice": "less",
+                "selected_size": "M"
+            }), content_type='application/json')
+            return authenticated_client.post('/api/order/trans', data=json.dumps({
+                "customer_id": test_customer,
+                "vendor_id": test_vendor,
+                "payment_methods": "cash",
+                "policy_id": policy_id,
+            }), content_type='application/json')
+
+        assert checkout(other_id).status_code == 400
+
+        rsp = checkout(own_id)
+        assert rsp.status_code == 201
+        with app.app_context():
+            order = db.session.get(Order, rsp.get_json()['order_id'])
+            assert order.discount_amount == 30
+
+        assert checkout(own_id).status_code == 400
+
+        # 退款後折價券釋放，可以再次使用
+        rsp = authenticated_client.post('/api/order/update', data=json.dumps({
+            "order_id": order.id,
+            "refund_status": "refunded",
+            "refund_at": "2025-01-01 12:00:00",
+        }), content_type='application/json')
+        assert rsp.status_code == 200
+        assert checkout(own_id).status_code == 201
+
+    def test_checkout_ignores_stale_policy_cache(self, app, authenticated_client, test_customer, test_vendor, test_product):
+        """A coupon disabled by another worker (no local invalidate) is rejected at checkout."""
+        from src.models import Vendor, Discount_Policy
+        from utils import discount_service
+
+        with app.app_context():
+            db.session.get(Vendor, test_vendor).is_verified = True
+            policy = Discount_Policy(vendor_id=test_vendor, is_available=True, type="fixed", value=30, membership_limit=0)
+            db.session.add(policy)
+            db.session.commit()
+            policy_id = policy.id
+
+            # 這個 process 的快取仍認為折價券有效
+            assert policy_id in {p.id for p in discount_service.active_policies(test_vendor)}
+            db.session.get(Discount_Policy, policy_id).is_available = False
+            db.session.commit()
+
+        authenticated_client.post('/api/cart/add', data=json.dumps({
+            "customer_id": test_customer,
+            "vendor_id": test_vendor,
+            "product_id": test_product,
+            "quantity": 2,
+            "selected_sugar": "normal",
+            "selected_ice": "less",
+            "selected_size": "M"
+        }), content_type='application/json')
+        rsp = authenticated_client.post('/api/order/trans', data=json.dumps({
+            "customer_id": test_customer,
+            "vendor_id": test_vendor,
+            "payment_methods": "cash",
+            "policy_id": policy_id,
+        }), content_type='application/json')
+
+        assert rsp.status_code == 400
+        assert rsp.get_json()['message'] == "折價券已停用"
+
+    def test_redemption_ledger_rejects_second_use(self, app, test_customer, test_order, order_history):
+        """Two orders racing for the same coupon: the second ledger insert fails."""
+        from src.models import Discount_Policy, Coupon_Redemption
+        from utils import discount_service
+
+        with app.app_context():
+            order = db.session.get(Order, test_order)
+            policy = Discount_Policy(vendor_id=order.vendor_id, is_available=True, type="fixed", value=10, membership_limit=0)
+            db.session.add(policy)
+            db.session.flush()
+
+            discount_service.redeem(test_customer, policy.id, test_order)
+            with pytest.raises(ValueError):
+                discount_service.redeem(test_customer, policy.id, order_history[0])
+
+            # savepoint 只撤銷失敗的那一列，第一筆仍在
+            assert db.session.get(Coupon_Redemption, (test_customer, policy.id)).order_id == test_order
+            db.session.rollback()
+
+
+class TestCheckoutConcurrency:
+    """Test suite for idempotent, row-locked checkout."""
+
+    @pytest.fixture
+    def cart(self, app, authenticated_client, test_customer, test_vendor, test_product):
+        """Verified vendor, customer balance 100, cart worth 130 (2 x 65)."""
+        from src.models import Vendor, Sizes_Option
+
+        with app.app_context():
+            db.session.get(Vendor, test_vendor).is_verified = True
+            db.session.get(Customer, test_customer).stored_balance = 100
+            db.session.add(Sizes_Option(product_id=test_product, options="XL", price_step=15))
+            db.session.commit()
+
+        def fill():
+            authenticated_client.post('/api/cart/add', data=json.dumps({
+                "customer_id": test_customer,
+                "vendor_id": test_vendor,
+                "product_id": test_product,
+                "quantity": 2,
+                "selected_sugar": "normal",
+                "selected_ice": "less",
+                "selected_size": "XL"
+            }), content_type='application/json')
+        fill()
+        return fill
+
+    def checkout(self, client, customer_id, vendor_id, payment_methods="cash", key=None):
+        headers = {"Idempotency-Key": key} if key else {}
+        return client.post('/api/order/trans', data=json.dumps({
+            "customer_id": customer_id,
+            "vendor_id": vendor_id,
+            "payment_methods": payment_methods,
+        }), content_type='application/json', headers=headers)
+
+    def test_same_key_replays_order(self, app, authenticated_client, test_customer, test_vendor, cart):
+        """Resending a checkout with the same key returns the first order instead of a 404 / new order."""
+        first = self.checkout(authenticated_client, test_customer, test_vendor, key="retry-1")
+        assert first.status_code == 201
+        assert "replayed" not in first.get_json()
+
+        again = self.checkout(authenticated_client, test_customer, test_vendor, key="retry-1")
+        assert again.status_code == 201
+        assert again.get_json()['order_id'] == first.get_json()['order_id']
+        assert again.get_json()['replayed'] is True
+        assert again.headers['Idempotent-Replayed'] == 'true'
+
+        # 沒有 key 時照舊: 購物車已經結帳
+        assert self.checkout(authenticated_client, test_customer, test_vendor).status_code == 404
+
+        # 新的 key 是新的結帳
+        cart()
+        other = self.checkout(authenticated_client, test_customer, test_vendor, key="retry-2")
+        assert other.status_code == 201
+        assert other.get_json()['order_id'] != first.get_json()['order_id']
+
+        with app.app_context():
+            assert Order.query.filter_by(user_id=test_customer).count() == 2
+
+    def test_invalid_key_rejected(self, authenticated_client, test_customer, test_vendor, cart):
+        rsp = self.checkout(authenticated_client, test_customer, test_vendor, key="x" * 65)
+        assert rsp.status_code == 400
+
+    def test_insufficient_balance_rolls_back(self, app, authenticated_client, test_customer, test_vendor, cart):
+        """A failed balance deduction leaves no order, no key and the cart intact; the key can be retried."""
+        from src.models import Checkout_Request
+
+        rsp = self.checkout(authenticated_client, test_customer, test_vendor, payment_methods="button", key="pay-1")
+        assert rsp.status_code == 400
+        assert "儲值餘額不足" in rsp.get_json()['message']
+
+        with app.app_context():
+            assert Order.query.filter_by(user_id=test_customer).count() == 0
+            assert Checkout_Request.query.filter_by(customer_id=test_customer).count() == 0
+            db.session.get(Customer, test_customer).stored_balance = 200
+            db.session.commit()
+
+        rsp = self.checkout(authenticated_client, test_customer, test_vendor, payment_methods="button", key="pay-1")
+        assert rsp.status_code == 201
+        with app.app_context():
+            assert db.session.get(Customer, test_customer).stored_balance == 70
+
+    def test_refund_credits_stored_balance(self, app, authenticated_client, test_customer, test_vendor, cart):
+        """Refunding a stored-balance order adds the amount back with an atomic UPDATE."""
+        with app.app_context():
+            db.session.get(Customer, test_customer).stored_balance = 200
+            db.session.commit()
+
+        rsp = self.checkout(authenticated_client, test_customer, test_vendor, payment_methods="button")
+        assert rsp.status_code == 201
+        rsp = authenticated_client.post('/api/order/update', data=json.dumps({
+            "order_id": rsp.get_json()['order_id'],
+            "refund_status": "refunded",
+            "refund_at": "2025-01-01 12:00:00",
+        }), content_type='application/json')
+
+        assert rsp.status_code == 200
+        with app.app_context():
+            assert db.session.get(Customer, test_customer).stored_balance == 200
+
+    def test_purge_expired_keys(self, app, authenticated_client, test_customer, test_vendor, cart):
+        from src.models import Checkout_Request
+        from utils import idempotency
+
+        self.checkout(authenticated_client, test_customer, test_vendor, key="old")
+        with app.app_context():
+            idempotency.purge_expired()
+            assert Checkout_Request.query.filter_by(customer_id=test_customer).count() == 1
+            idempotency.purge_expired(ttl_hours=-1)
+            assert Checkout_Request.query.filter_by(customer_id=test_customer).count() == 0
+
+    def test_concurrent_checkouts_charge_once(self, app, test_customer, test_vendor, cart):
+        """Double-clicks racing on the same cart: exactly one order, balance deducted once."""
+        import threading
+
+        with app.app_context():
+            if db.engine.dialect.name == "sqlite":
+                pytest.skip("SQLite 沒有 row lock")
+            db.session.get(Customer, test_customer).stored_balance = 1000
+            db.session.commit()
+
+        statuses = []
+        barrier = threading.Barrier(8)
+
+        def worker(key):
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = test_customer
+                sess['role'] = 'customer'
+            barrier.wait()
+            rsp = self.checkout(client, test_customer, test_vendor, payment_methods="button", key=key)
+            statuses.append((rsp.status_code, (rsp.get_json() or {}).get('order_id')))
+
+        # 一半帶相同 key (重送)，一半不帶 key (重複點擊)
+        threads = [threading.Thread(target=worker, args=("same" if i % 2 else None,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        created = {order_id for status, order_id in statuses if status == 201}
+        assert len(created) == 1
+        assert all(status in (201, 404) for status, _ in statuses)
+        with app.app_context():
+            assert Order.query.filter_by(user_id=test_customer).count() == 1
+            assert db.session.get(Customer, test_customer).stored_balance == 1000 - 130
+
+
+class TestMembership:
+    """Test suite for the maintained completed-order counter and membership level."""
+
+    def _update(self, client, payload):
+        return client.post('/api/order/update', data=json.dumps(payload), content_type='application/json')
+
+    def test_complete_and_refund_move_counter(self, app, client, test_customer, test_order):
+        """Completing crosses the tier threshold; refunding drops back below it."""
+        with app.app_context():
+            db.session.get(Customer, test_customer).completed_order_count = 9
+            db.session.commit()
+
+        assert self._update(client, {"order_id": test_order, "is_completed": True}).status_code == 200
+        with app.app_context():
+            customer = db.session.get(Customer, test_customer)
+            assert (customer.completed_order_count, customer.membership_level) == (10, 1)
+
+        # 重複送出完成不會再加一次
+        self._update(client, {"order_id": test_order, "is_completed": True})
+        rsp = self._update(client, {
+            "order_id": test_order,
+            "refund_status": "refunded",
+            "refund_at": "2025-01-01 12:00:00",
+        })
+        assert rsp.status_code == 200
+        with app.app_context():
+            customer = db.session.get(Customer, test_customer)
+            assert (customer.completed_order_count, customer.membership_level) == (9, 0)
+
+    def test_reconcile_repairs_drift(self, app, test_customer, order_history):
+        """The reconciliation job recomputes counters from orders."""
+        from src.utils.job_runner import run_job
+
+        with app.app_context():
+            customer = db.session.get(Customer, test_customer)
+            customer.completed_order_count = 42
+            customer.membership_level = 2
+            db.session.commit()
+
+        run = run_job(app, "reconcile_membership")
+
+        assert run.status == "success" and run.rows_processed >= 1
+        with app.app_context():
+            customer = db.session.get(Customer, test_customer)
+            assert (customer.completed_order_count, customer.membership_level) == (2, 0)
+
+
+class TestVendorRevenue:
+    """Test suite for the atomic / sharded vendor revenue counter."""
+
+    def _update(self, client, payload):
+        return client.post('/api/order/update', data=json.dumps(payload), content_type='application/json')
+
+    def _revenue(self, client, vendor_id):
+        return client.get(f'/api/vendor/{vendor_id}').get_json()['data']['revenue']
+
+    def test_complete_and_refund_move_revenue(self, app, client, test_vendor, test_order):
+        assert self._update(client, {"order_id": test_order, "is_completed": True}).status_code == 200
+        # 重複送出完成不會再加一次
+        self._update(client, {"order_id": test_order, "is_completed": True})
+        assert self._revenue(client, test_vendor) == 145
+
+        self._update(client, {
+            "order_id": test_order,
+            "refund_status": "refunded",
+            "refund_at": "2025-01-01 12:00:00",
+        })
+        assert self._revenue(client, test_vendor) == 0
+
+    def test_sharded_revenue_summed_on_read(self, app, client, test_vendor, test_order, monkeypatch):
+        """Hot vendors write to shard rows; reads and the reconciliation job fold them back."""
+        from src.models import Vendor, Vendor_Revenue_Shard
+        from src.utils.job_runner import run_job
+
+        monkeypatch.setitem(app.config, 'VENDOR_REVENUE_SHARDS', 4)
+        monkeypatch.setitem(app.config, 'VENDOR_REVENUE_SHARDED_VENDORS', {test_vendor})
+
+        assert self._update(client, {"order_id": test_order, "is_completed": True}).status_code == 200
+        with app.app_context():
+            assert db.session.get(Vendor, test_vendor).revenue == 0
+            assert Vendor_Revenue_Shard.query.filter_by(vendor_id=test_vendor).count() == 1
+        assert self._revenue(client, test_vendor) == 145
+
+        run = run_job(app, "reconcile_vendor_revenue")
+        assert run.status == "success"
+        with app.app_context():
+            assert db.session.get(Vendor, test_vendor).revenue == 145
+            assert Vendor_Revenue_Shard.query.filter_by(vendor_id=test_vendor).count() == 0
+
+    def test_reconcile_repairs_drift(self, app, client, test_vendor, test_order):
+        from src.models import Vendor
+        from src.utils.job_runner import run_job
+
+        self._update(client, {"order_id": test_order, "is_completed": True})
+        with app.app_context():
+            db.session.get(Vendor, test_vendor).revenue = 9999
+            db.session.commit()
+
+        run = run_job(app, "reconcile_vendor_revenue")
+
+        assert run.status == "success" and run.rows_processed >= 1
+        assert self._revenue(client, test_vendor) == 145
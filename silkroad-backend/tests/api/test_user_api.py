@@ -8,6 +8,8 @@ Tests cover:
 - User profile update
 - Password update
 - User deletion
+- Vendor reviews / rating summary
+- Verification mail outbox
 """
 import pytest
 import json
@@ -461,3 +463,116 @@ class TestUserDeletion:
         """Test user deletion fails without authentication."""
         response = client.delete(f'/api/user/delete/{test_customer}')
         assert response.status_code == 401
+
+
+class TestVendorReviews:
+    """Test suite for vendor reviews and the rating summary."""
+
+    def test_review_updates_rating_summary(self, app, authenticated_client, test_vendor, test_order):
+        """Posting a review updates the histogram and the public vendor list."""
+        from config import db
+        from models.auth.vendor import Vendor
+
+        with app.app_context():
+            db.session.get(Vendor, test_vendor).is_verified = True
+            db.session.commit()
+
+        rsp = authenticated_client.post(
+            '/api/customer/review',
+            data=json.dumps({"order_id": test_order, "rating": 4, "review_content": "good"}),
+            content_type='application/json'
+        )
+        assert rsp.status_code == 201
+
+        rsp = authenticated_client.get(f'/api/user/vendor/{test_vendor}/reviews')
+        assert rsp.status_code == 200
+        summary = rsp.get_json()['rating_summary']
+        assert summary['review_count'] == 1
+        assert summary['avg_rating'] == 4
+        assert summary['histogram'] == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 0}
+
+        vendors = authenticated_client.get('/api/vendor/vendors').get_json()['data']
+        vendor = next(v for v in vendors if v['id'] == test_vendor)
+        assert vendor['review_count'] == 1
+        assert vendor['avg_rating'] == 4
+
+
+class TestEmailOutbox:
+    """Test suite for the verification mail outbox."""
+
+    def _resend(self, app, client, customer_id):
+        from config import db
+        from models import Customer, Email_Outbox
+
+        with app.app_context():
+            email = db.session.get(Customer, customer_id).email
+
+        rsp = client.post(
+            '/api/user/resend-code',
+            data=json.dumps({"email": email}),
+            content_type='application/json'
+        )
+        assert rsp.status_code == 200
+        assert rsp.get_json()['mail_sent'] is True
+
+        with app.app_context():
+            return Email_Outbox.query.filter_by(recipient=email).order_by(Email_Outbox.id.desc()).first().id
+
+    def test_resend_code_is_queued_then_sent(self, app, client, test_customer):
+        """The request only queues the mail; the dispatcher sends it over one connection."""
+        from config import db
+        from config.mail import mail
+        from models import Customer, Email_Outbox
+        from utils.mail_outbox import dispatch_outbox
+
+        entry_id = self._resend(app, client, test_customer)
+
+        with app.app_context():
+            entry = db.session.get(Email_Outbox, entry_id)
+            code = db.session.get(Customer, test_customer).verification_code
+            assert entry.status == 'pending'
+            assert code in entry.body
+
+        with mail.record_messages() as outbox:
+            sent, _ = dispatch_outbox(app)
+
+        assert sent >= 1
+        assert any(code in msg.body for msg in outbox)
+        with app.app_context():
+            entry = db.session.get(Email_Outbox, entry_id)
+            assert entry.status == 'sent'
+            assert entry.attempts == 1
+            assert entry.sent_at is not None
+
+    def test_smtp_failure_backs_off_then_fails(self, app, client, test_customer, monkeypatch):
+        """SMTP errors are retried with backoff and marked failed after max attempts."""
+        from datetime import datetime
+        from config import db
+        from config.mail import mail
+        from models import Email_Outbox
+        from utils.mail_outbox import dispatch_outbox
+
+        entry_id = self._resend(app, client, test_customer)
+
+        def broken_connect():
+            raise ConnectionRefusedError("smtp down")
+        monkeypatch.setattr(mail, 'connect', broken_connect)
+        monkeypatch.setitem(app.config, 'MAIL_OUTBOX_MAX_ATTEMPTS', 2)
+
+        dispatch_outbox(app)
+        with app.app_context():
+            entry = db.session.get(Email_Outbox, entry_id)
+            assert entry.status == 'pending'
+            assert entry.attempts == 1
+            assert 'smtp down' in entry.last_error
+            assert entry.next_attempt_at > datetime.utcnow()
+
+            # 模擬退避時間已到
+            entry.next_attempt_at = datetime(2000, 1, 1)
+            db.session.commit()
+
+        dispatch_outbox(app)
+        with app.app_context():
+            entry = db.session.get(Email_Outbox, entry_id)
+            assert entry.status == 'failed'
+            assert entry.attempts == 2
@@ -7,10 +7,13 @@ Tests cover:
 - Get vendor products
 - Add discount policies
 - View discount policies
+- Bulk menu import / export
+- Customer discount listing
 """
 
 from copy import deepcopy, copy
 import json
+import pytest
 from datetime import datetime, timedelta
 
 
@@ -166,10 +169,160 @@ class TestViewVendorProducts:
 
 
         rsp = client.get(f'/api/vendor/{test_vendor}/view_product_detail/{test_product+1}')
-        
+
         assert rsp.status_code == 404
         assert rsp.get_json()["message"] == "Product not found"
 
+    def test_view_products_snapshot_invalidated(self, vendor_client, test_vendor, test_product):
+        """Menu snapshot is served from cache and refreshed after a write."""
+        first = vendor_client.get(f'/api/vendor/{test_vendor}/view_products')
+        second = vendor_client.get(f'/api/vendor/{test_vendor}/view_products')
+        assert first.status_code == 200
+        assert first.get_data() == second.get_data()
+        assert first.get_json()['products'][0]['is_listed'] is True
+
+        rsp = vendor_client.patch(
+            '/api/vendor/products/listed',
+            data=json.dumps([{"product_id": test_product, "is_listed": False}]),
+            content_type='application/json'
+        )
+        assert rsp.status_code == 200
+
+        rsp = vendor_client.get(f'/api/vendor/{test_vendor}/view_products')
+        assert rsp.status_code == 200
+        assert rsp.get_json()['products'][0]['is_listed'] is False
+
+    def test_view_products_not_modified(self, vendor_client, test_vendor, test_product):
+        """Polling with If-None-Match gets 304 until the menu changes."""
+        rsp = vendor_client.get(f'/api/vendor/{test_vendor}/view_products')
+        etag = rsp.headers.get('ETag')
+        assert rsp.status_code == 200
+        assert etag
+        assert 'no-cache' in rsp.headers.get('Cache-Control')
+        assert rsp.headers.get('Last-Modified')
+
+        rsp = vendor_client.get(
+            f'/api/vendor/{test_vendor}/view_products',
+            headers={'If-None-Match': etag}
+        )
+        assert rsp.status_code == 304
+        assert rsp.get_data() == b''
+
+        rsp = vendor_client.get(
+            f'/api/vendor/{test_vendor}/view_product_detail/{test_product}',
+            headers={'If-None-Match': etag}
+        )
+        assert rsp.status_code == 200
+
+        vendor_client.patch(
+            '/api/vendor/products/listed',
+            data=json.dumps([{"product_id": test_product, "is_listed": False}]),
+            content_type='application/json'
+        )
+        rsp = vendor_client.get(
+            f'/api/vendor/{test_vendor}/view_products',
+            headers={'If-None-Match': etag}
+        )
+        assert rsp.status_code == 200
+        assert rsp.headers.get('ETag') != etag
+
+
+class TestMenuImportExport:
+    """Test suite for bulk menu import / export."""
+
+    def _rows(self, tag):
+        return [
+            {
+                "name": f"紅茶 {tag}",
+                "price": 30,
+                "description": "古早味",
+                "image_url": f"https://example.com/{tag}/black-tea.jpg",
+                "options": {"size": "M,L", "step": "0,10", "sugar": "正常,半糖", "ice": "正常,去冰"},
+                "is_listed": True,
+            },
+            {
+                "name": f"綠茶 {tag}",
+                "price": 25,
+                "description": "",
+                "image_url": f"https://example.com/{tag}/green-tea.jpg",
+                "options": {"size": "M", "step": "0", "sugar": "無糖", "ice": "少冰"},
+            },
+        ]
+
+    def _import(self, vendor_client, body, fmt='jsonl', dry_run=False):
+        return vendor_client.post(
+            f'/api/vendor/product/import?format={fmt}' + ('&dry_run=true' if dry_run else ''),
+            data=body,
+            content_type='text/plain'
+        )
+
+    def test_import_then_export_roundtrip(self, vendor_client, test_vendor):
+        """Imported products show up on the menu and export back to the same rows."""
+        rows = self._rows(test_vendor)
+        rsp = self._import(vendor_client, "\n".join(json.dumps(r, ensure_ascii=False) for r in rows))
+
+        assert rsp.status_code == 201
+        data = rsp.get_json()
+        assert data['data']['count'] == 2
+
+        menu = vendor_client.get('/api/vendor/products').get_json()['products']
+        black_tea = next(p for p in menu if p['id'] == data['data']['product_ids'][0])
+        assert [s['name'] for s in black_tea['options']['size']] == ['M', 'L']
+
+        rsp = vendor_client.get('/api/vendor/product/export?format=jsonl')
+        assert rsp.status_code == 200
+        exported = [json.loads(line) for line in rsp.get_data(as_text=True).splitlines()]
+        assert [e['image_url'] for e in exported] == [r['image_url'] for r in rows]
+        assert exported[0]['options']['step'] == "0,10"
+        assert sorted(exported[0]['options']['sugar'].split(',')) == ['半糖', '正常']
+        assert exported[1]['is_listed'] is False
+
+        # 匯出的 CSV 改掉 image_url 後可直接再匯入
+        csv_text = vendor_client.get('/api/vendor/product/export?format=csv').get_data(as_text=True)
+        assert csv_text.splitlines()[0] == "name,price,description,image_url,size,step,sugar,ice,is_listed"
+        rsp = self._import(vendor_client, csv_text.replace('example.com', 'example.org'), fmt='csv')
+        assert rsp.status_code == 201
+        assert rsp.get_json()['data']['count'] == 2
+
+    def test_import_reports_row_errors(self, app, vendor_client, test_vendor):
+        """Invalid rows are reported by row number and nothing is written."""
+        from src.models import Product
+
+        rows = self._rows(f"bad-{test_vendor}")
+        broken_price = dict(rows[1], price="25")
+        broken_steps = dict(rows[0], image_url="https://example.com/other.jpg",
+                            options=dict(rows[0]['options'], step="0"))
+        body = "\n".join([
+            json.dumps(rows[0]),
+            json.dumps(broken_price),
+            "{not json",
+            json.dumps(broken_steps),
+            json.dumps(rows[0]),
+        ])
+
+        rsp = self._import(vendor_client, body)
+
+        assert rsp.status_code == 400
+        errors = rsp.get_json()['errors']
+        assert [e['row'] for e in errors] == [2, 3, 4, 5]
+        assert 'price' in errors[0]['message']
+        assert 'Duplicate image_url' in errors[3]['message']
+
+        with app.app_context():
+            assert Product.query.filter_by(vendor_id=test_vendor).count() == 0
+
+    def test_import_dry_run(self, app, vendor_client, test_vendor):
+        """dry_run validates without writing."""
+        from src.models import Product
+
+        rows = self._rows(f"dry-{test_vendor}")
+        rsp = self._import(vendor_client, "\n".join(json.dumps(r) for r in rows), dry_run=True)
+
+        assert rsp.status_code == 200
+        assert rsp.get_json()['data']['count'] == 2
+        with app.app_context():
+            assert Product.query.filter_by(vendor_id=test_vendor).count() == 0
+
 
 class TestUpdateProducts:
     """Test suite for updating products."""
@@ -489,6 +642,80 @@ class TestDiscountPolicy:
         assert 'expiry_date' in policy_data
 
 
+class TestCustomerDiscounts:
+    """Test suite for the cached customer discount listing."""
+
+    @pytest.fixture
+    def policies(self, app, test_vendor, test_customer):
+        """available / level 3 / expired / expired-but-used policies. Returns their IDs."""
+        from src.config import db
+        from models import Discount_Policy, Order, Vendor, Coupon_Redemption
+
+        today = datetime.now().date()
+        with app.app_context():
+            db.session.get(Vendor, test_vendor).is_verified = True
+            rows = {
+                "available": dict(membership_limit=0, expiry_date=today + timedelta(days=30)),
+                "level": dict(membership_limit=3, expiry_date=None),
+                "expired": dict(membership_limit=0, expiry_date=today - timedelta(days=3)),
+                "used": dict(membership_limit=0, expiry_date=today - timedelta(days=3)),
+            }
+            ids = {}
+            for name, kwargs in rows.items():
+                policy = Discount_Policy(
+                    vendor_id=test_vendor, is_available=True, type="fixed", value=10,
+                    start_date=today - timedelta(days=10), **kwargs,
+                )
+                db.session.add(policy)
+                db.session.flush()
+                ids[name] = policy.id
+            order = Order(
+                user_id=test_customer, vendor_id=test_vendor, policy_id=ids["used"],
+                total_price=90, payment_methods='cash', is_delivered=False, is_completed=True,
+            )
+            db.session.add(order)
+            db.session.flush()
+            db.session.add(Coupon_Redemption(customer_id=test_customer, policy_id=ids["used"], order_id=order.id))
+            db.session.commit()
+        return ids
+
+    def _list(self, client, vendor_id):
+        rsp = client.get(f'/api/vendor/view_customer_discounts?vendor_id={vendor_id}')
+        assert rsp.status_code == 200
+        return {row['policy_id']: row['status'] for row in rsp.get_json()['data']}
+
+    def test_statuses_and_vendor_filter(self, authenticated_client, test_vendor, policies):
+        """Expired unused policies are hidden; others carry their status."""
+        statuses = self._list(authenticated_client, test_vendor)
+
+        assert statuses == {
+            policies["available"]: "available",
+            policies["level"]: "disabled",
+            policies["used"]: "used",
+        }
+
+        rsp = authenticated_client.get('/api/vendor/view_customer_discounts?vendor_id=abc')
+        assert rsp.status_code == 400
+
+    def test_invalidate_on_disable(self, client, test_customer, test_vendor, policies):
+        """Disabling a policy drops it from the cached listing immediately."""
+        with client.session_transaction() as sess:
+            sess['user_id'], sess['role'] = test_customer, 'customer'
+        assert policies["available"] in self._list(client, test_vendor)
+
+        with client.session_transaction() as sess:
+            sess['user_id'], sess['role'] = test_vendor, 'vendor'
+        rsp = client.post('/api/vendor/invalid_discount', data=json.dumps({
+            "policy_id": policies["available"],
+            "vendor_id": test_vendor,
+        }), content_type='application/json')
+        assert rsp.status_code == 200
+
+        with client.session_transaction() as sess:
+            sess['user_id'], sess['role'] = test_customer, 'customer'
+        assert policies["available"] not in self._list(client, test_vendor)
+
+
 class TestVendorIntegration:
     """Integration tests for vendor workflows."""
 
@@ -543,3 +770,75 @@ class TestVendorIntegration:
         assert list_response.status_code == 200
         products = list_response.get_json()['products']
         assert any(p['id'] == product_id for p in products)
+
+
+class TestVendorSales:
+    """Test suite for the vendor sales summary."""
+
+    def _update_order(self, client, payload):
+        rsp = client.post(
+            '/api/order/update',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+        assert rsp.status_code == 200
+
+    def test_sales_summary(self, client, test_vendor, test_order):
+        """Completing an order adds it to the rollups; refunding removes it."""
+        rsp = client.get(f'/api/vendor/{test_vendor}/sales_summary?granularity=daily')
+        assert rsp.status_code == 200
+        assert rsp.get_json()['summary']['orders_count'] == 0
+
+        self._update_order(client, {"order_id": test_order, "is_completed": True})
+
+        rsp = client.get(f'/api/vendor/{test_vendor}/sales_summary?granularity=daily')
+        assert rsp.status_code == 200
+        data = rsp.get_json()
+        assert data['granularity'] == 'daily'
+        assert data['summary']['total_gross_revenue'] == 145
+        assert data['summary']['orders_count'] == 1
+        assert sum(s['orders'] for s in data['series']) == 1
+        assert data['top_drinks'][0]['quantity'] == 2
+        assert data['top_drinks'][0]['revenue'] == 100
+
+        self._update_order(client, {
+            "order_id": test_order,
+            "refund_status": "refunded",
+            "refund_at": "2025-01-01 12:00:00"
+        })
+
+        data = client.get(f'/api/vendor/{test_vendor}/sales_summary').get_json()
+        assert data['summary']['orders_count'] == 0
+        assert data['series'] == []
+        assert data['top_drinks'] == []
+
+    def test_sales_summary_from_orders(self, app, client, test_vendor, test_order):
+        """The raw-order path returns the same shape when rollups are disabled."""
+        self._update_order(client, {"order_id": test_order, "is_completed": True})
+
+        app.config['SALES_ROLLUP_ENABLED'] = False
+        try:
+            rsp = client.get(f'/api/vendor/{test_vendor}/sales_summary?granularity=monthly')
+        finally:
+            app.config['SALES_ROLLUP_ENABLED'] = True
+
+        assert rsp.status_code == 200
+        data = rsp.get_json()
+        assert data['summary']['total_gross_revenue'] == 145
+        assert data['summary']['orders_count'] == 1
+        assert data['top_drinks'][0]['revenue'] == 100
+
+    def test_sales_summary_date_range(self, client, test_vendor, test_order):
+        """Orders outside from/to are excluded; bad dates are rejected."""
+        self._update_order(client, {"order_id": test_order, "is_completed": True})
+
+        rsp = client.get(f'/api/vendor/{test_vendor}/sales_summary?from=2000-01-01&to=2000-01-31')
+        assert rsp.status_code == 200
+        data = rsp.get_json()
+        assert data['summary']['orders_count'] == 0
+        assert data['series'] == []
+        assert data['top_drinks'] == []
+
+        rsp = client.get(f'/api/vendor/{test_vendor}/sales_summary?from=2000-13-01')
+        assert rsp.status_code == 400
+        assert rsp.get_json()['success'] is False
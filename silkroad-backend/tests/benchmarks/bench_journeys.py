@@ -0,0 +1,344 @@
+"""
+端到端效能測試: 以真實的 Flask app 跑顧客 / 店家的主要流程，量測延遲、吞吐量與每個請求的 SQL 數量
+
+    cd silkroad-backend
+    python tests/benchmarks/bench_journeys.py                              # 每個情境 200 次
+    python tests/benchmarks/bench_journeys.py -n 500 -c 4 -o bench.json    # 4 條 thread，結果寫成 JSON
+    python tests/benchmarks/bench_journeys.py --compare baseline.json --max-regression 20
+
+情境 (依序執行，checkout 之後才有 sales_summary 可算):
+    browse_vendors   GET  /api/vendor/vendors
+    view_menu        GET  /api/vendor/<vendor_id>/view_products
+    add_to_cart      POST /api/cart/add
+    view_cart        GET  /api/cart/view/<customer_id>
+    checkout         POST /api/order/trans        (每次先加一項商品進購物車，不計時)
+    sales_summary    GET  /api/vendor/<vendor_id>/sales_summary?granularity=daily
+
+請求經由 Flask test client 送進 app (走完整的 before/after_request、session、read routing)，
+不含網路與 WSGI server 的成本；要量 gunicorn 本身請另外用 HTTP 壓測工具。
+
+資料庫為 BENCH_DATABASE_URL (沒有設定時用 DATABASE_URL)，會寫入一份小型資料集
+(email 以 bench- 開頭的店家、商品與顧客)，請使用本機或測試資料庫。
+檔名不是 test_*.py，pytest 不會收集這個檔案。
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "src"))
+
+SCENARIOS = ("browse_vendors", "view_menu", "add_to_cart", "view_cart", "checkout", "sales_summary")
+# 與 add_product / menu_io 相同，每個選項一列
+SUGARS = ("正常糖", "半糖", "無糖")
+ICES = ("正常冰", "少冰", "去冰")
+SIZES = (("M", 0), ("L", 10))
+
+
+def _configure_env():
+    if os.getenv("BENCH_DATABASE_URL"):
+        os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+    # 背景排程 / 寄信執行緒會搶 CPU 與連線，壓測時關閉
+    os.environ.setdefault("SCHEDULER_ENABLED", "False")
+    os.environ.setdefault("MAIL_OUTBOX_DISPATCHER_ENABLED", "False")
+    os.environ.setdefault("SESSION_KEY", "bench")
+
+
+# ==================== SQL 計數 ====================
+
+class SqlCounter:
+    """以 after_cursor_execute 計算每條 thread 執行的 SQL 數 (test client 在呼叫端 thread 執行請求)"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.count = getattr(self._local, "count", 0) + 1
+
+    def take(self):
+        count = getattr(self._local, "count", 0)
+        self._local.count = 0
+        return count
+
+
+# ==================== 資料集 ====================
+
+def seed(app, vendors, products_per_vendor, customers):
+    """建立店家 / 商品 / 顧客，回傳 {"vendors": {vendor_id: [product_id, ...]}, "customers": [...]}"""
+    from werkzeug.security import generate_password_hash
+
+    from config.database import db
+    from models import Customer, Ice_Option, Product, Sizes_Option, Sugar_Option, Vendor, Vendor_Manager
+
+    tag = uuid.uuid4().hex[:8]
+    password = generate_password_hash("bench")
+    dataset = {"vendors": {}, "customers": []}
+
+    with app.app_context():
+        manager = Vendor_Manager(name="Bench Manager", email=f"bench-manager-{tag}@bench.local",
+                                 phone_number=f"bm-{tag}")
+        db.session.add(manager)
+        db.session.flush()
+
+        for v in range(vendors):
+            vendor = Vendor(
+                name=f"Bench Vendor {v}", email=f"bench-vendor-{tag}-{v}@bench.local", password=password,
+                phone_number=f"bv-{tag}-{v}", address=f"Bench Address {tag}-{v}", role="vendor",
+                vendor_manager_id=manager.id, is_active=True, is_verified=True,
+            )
+            db.session.add(vendor)
+            db.session.flush()
+
+            product_ids = []
+            for p in range(products_per_vendor):
+                product = Product(
+                    vendor_id=vendor.id, name=f"Bench Tea {p}", price=40 + p % 5 * 10,
+                    description="benchmark product", image_url=f"https://example.com/bench-{tag}-{v}-{p}.jpg",
+                    is_listed=True,
+                )
+                db.session.add(product)
+                db.session.flush()
+                db.session.add_all(Sugar_Option(product_id=product.id, options=sugar) for sugar in SUGARS)
+                db.session.add_all(Ice_Option(product_id=product.id, options=ice) for ice in ICES)
+                for size, step in SIZES:
+                    db.session.add(Sizes_Option(product_id=product.id, options=size, price_step=step))
+                product_ids.append(product.id)
+            dataset["vendors"][vendor.id] = product_ids
+
+        for c in range(customers):
+            customer = Customer(
+                name=f"Bench Customer {c}", email=f"bench-customer-{tag}-{c}@bench.local", password=password,
+                phone_number=f"bc-{tag}-{c}", address=f"Bench Customer Address {tag}-{c}", role="customer",
+            )
+            db.session.add(customer)
+            db.session.flush()
+            dataset["customers"].append(customer.id)
+
+        db.session.commit()
+    return dataset
+
+
+# ==================== 情境 ====================
+
+class Journey:
+    """一個顧客 (一條 thread) 的請求序列"""
+
+    def __init__(self, app, dataset, customer_id, counter, rng):
+        self.client = app.test_client()
+        self.counter = counter
+        self.rng = rng
+        self.customer_id = customer_id
+        self.vendor_id = rng.choice(sorted(dataset["vendors"]))
+        self.product_ids = dataset["vendors"][self.vendor_id]
+        with self.client.session_transaction() as sess:
+            sess["user_id"] = customer_id
+            sess["role"] = "customer"
+
+    def _cart_item(self):
+        return {
+            "customer_id": self.customer_id,
+            "vendor_id": self.vendor_id,
+            "product_id": self.rng.choice(self.product_ids),
+            "quantity": self.rng.randint(1, 3),
+            "selected_sugar": self.rng.choice(SUGARS),
+            "selected_ice": self.rng.choice(ICES),
+            "selected_size": self.rng.choice(SIZES)[0],
+        }
+
+    def request(self, scenario):
+        """回傳 (method, path, json body)"""
+        if scenario == "browse_vendors":
+            return "GET", "/api/vendor/vendors", None
+        if scenario == "view_menu":
+            return "GET", f"/api/vendor/{self.vendor_id}/view_products", None
+        if scenario == "add_to_cart":
+            return "POST", "/api/cart/add", self._cart_item()
+        if scenario == "view_cart":
+            return "GET", f"/api/cart/view/{self.customer_id}", None
+        if scenario == "checkout":
+            return "POST", "/api/order/trans", {
+                "customer_id": self.customer_id,
+                "vendor_id": self.vendor_id,
+                "payment_methods": "cash",
+                "is_delivered": False,
+            }
+        if scenario == "sales_summary":
+            return "GET", f"/api/vendor/{self.vendor_id}/sales_summary?granularity=daily", None
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    def prepare(self, scenario):
+        """不計時的前置步驟"""
+        if scenario == "checkout":
+            self.client.post("/api/cart/add", json=self._cart_item())
+
+    def run(self, scenario, iterations, samples):
+        for _ in range(iterations):
+            self.prepare(scenario)
+            method, path, body = self.request(scenario)
+            self.counter.take()
+            started = time.perf_counter()
+            rsp = self.client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - started
+            samples.append((elapsed, self.counter.take(), rsp.status_code))
+
+
+def percentile(sorted_values, pct):
+    """nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples, wall_seconds):
+    latencies = sorted(s[0] * 1000 for s in samples)
+    sql_counts = [s[1] for s in samples]
+    errors = sum(1 for s in samples if s[2] >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "sql_per_request": {
+            "mean": round(sum(sql_counts) / len(sql_counts), 2) if sql_counts else 0.0,
+            "max": max(sql_counts, default=0),
+        },
+    }
+
+
+def run_scenario(journeys, scenario, iterations, warmup):
+    for journey in journeys:
+        journey.run(scenario, warmup, [])
+
+    per_thread = [[] for _ in journeys]
+    threads = [
+        threading.Thread(target=journey.run, args=(scenario, iterations, samples))
+        for journey, samples in zip(journeys, per_thread)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return summarize([s for samples in per_thread for s in samples], wall)
+
+
+# ==================== 結果 ====================
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline, max_regression):
+    """印出與 baseline 的差異，回傳 p95 變慢超過 max_regression % 的情境"""
+    regressions = []
+    print(f"\n{'scenario':<16}{'p95 ms':>12}{'base':>10}{'diff':>9}{'rps':>10}{'base':>10}{'sql':>8}{'base':>7}")
+    for name, current in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        p95, base_p95 = current["latency_ms"]["p95"], base["latency_ms"]["p95"]
+        diff = (p95 - base_p95) / base_p95 * 100 if base_p95 else 0.0
+        print(f"{name:<16}{p95:>12.2f}{base_p95:>10.2f}{diff:>+8.1f}%{current['rps']:>10.1f}{base['rps']:>10.1f}"
+              f"{current['sql_per_request']['mean']:>8.1f}{base['sql_per_request']['mean']:>7.1f}")
+        if max_regression is not None and diff > max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def print_table(results):
+    print(f"\n{'scenario':<16}{'req':>6}{'err':>5}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'sql/req':>9}")
+    for name, r in results["scenarios"].items():
+        lat = r["latency_ms"]
+        print(f"{name:<16}{r['requests']:>6}{r['errors']:>5}{r['rps']:>10.1f}"
+              f"{lat['p50']:>10.2f}{lat['p95']:>10.2f}{lat['p99']:>10.2f}{r['sql_per_request']['mean']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SilkRoad end-to-end benchmark")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="每個情境的請求數 (所有 thread 合計)")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="同時執行的顧客 (thread) 數")
+    parser.add_argument("--warmup", type=int, default=5, help="每條 thread 每個情境先跑幾次不計入")
+    parser.add_argument("--vendors", type=int, default=20)
+    parser.add_argument("--products", type=int, default=15, help="每家店的商品數")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="只跑指定情境 (可重複)")
+    parser.add_argument("--seed", type=int, default=0, help="亂數種子")
+    parser.add_argument("-o", "--output", help="結果 JSON 檔")
+    parser.add_argument("--compare", help="baseline 結果 JSON 檔")
+    parser.add_argument("--max-regression", type=float, help="p95 變慢超過此百分比時 exit 1 (需搭配 --compare)")
+    args = parser.parse_args(argv)
+
+    _configure_env()
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from app import app
+
+    concurrency = max(1, args.concurrency)
+    dataset = seed(app, args.vendors, args.products, concurrency)
+    counter = SqlCounter()
+    event.listen(Engine, "after_cursor_execute", counter)
+
+    rng = random.Random(args.seed)
+    journeys = [Journey(app, dataset, customer_id, counter, random.Random(rng.random()))
+                for customer_id in dataset["customers"]]
+    iterations = max(1, args.requests // concurrency)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0],
+            "requests_per_scenario": iterations * concurrency,
+            "concurrency": concurrency,
+            "warmup": args.warmup,
+            "dataset": {"vendors": args.vendors, "products_per_vendor": args.products},
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    try:
+        for scenario in args.scenario or SCENARIOS:
+            results["scenarios"][scenario] = run_scenario(journeys, scenario, iterations, args.warmup)
+    finally:
+        event.remove(Engine, "after_cursor_execute", counter)
+
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n結果已寫入 {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\np95 變慢超過 {args.max_regression}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+啟動時間測試: 量測冷啟動 (import + create_app) 與第一個請求的延遲
+
+    cd silkroad-backend
+    python tests/benchmarks/bench_startup.py                      # dev 與 prod 兩種模式各跑 10 次
+    python tests/benchmarks/bench_startup.py --mode prod -r 20 -o startup.json
+    python tests/benchmarks/bench_startup.py --compare startup-main.json --max-regression 20
+
+每次都開一個新的 Python process (沒有 import cache、沒有連線池)，依序記錄:
+    import_ms           import app 模組
+    create_app_ms       建立 app (app.app)
+    first_request_ms    第一個請求 GET /healthz (不碰資料庫)
+    first_db_request_ms 第一個需要資料庫的請求 GET /api/vendor/vendors
+    process_ms          從啟動 python 到完成上述步驟的總時間 (含直譯器啟動)
+
+模式:
+    dev   目前的預設值 (啟動時 create_all、排程器 API 開啟)
+    prod  gunicorn.conf.py 的設定 (DB_CREATE_ALL=False、SCHEDULER_API_ENABLED=False)
+
+資料庫為 BENCH_DATABASE_URL (沒有設定時用 DATABASE_URL)，prod 模式需要資料表已存在 (flask --app app migrate)。
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from bench_journeys import BACKEND_DIR, _git_commit, percentile
+
+MODES = {
+    "dev": {},
+    "prod": {"DB_CREATE_ALL": "False", "SCHEDULER_API_ENABLED": "False"},
+}
+PHASES = ("import_ms", "create_app_ms", "first_request_ms", "first_db_request_ms", "process_ms")
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import app as app_module
+imported = time.perf_counter()
+app = app_module.app
+created = time.perf_counter()
+client = app.test_client()
+client.get("/healthz")
+first = time.perf_counter()
+status = client.get("/api/vendor/vendors").status_code
+first_db = time.perf_counter()
+print("BENCH " + json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (first - created) * 1000,
+    "first_db_request_ms": (first_db - first) * 1000,
+    "status": status,
+}))
+"""
+
+
+def run_once(mode, extra_env):
+    env = {
+        **os.environ,
+        # 背景執行緒不影響量測
+        "SCHEDULER_ENABLED": "False",
+        "MAIL_OUTBOX_DISPATCHER_ENABLED": "False",
+        **MODES[mode],
+        **extra_env,
+    }
+    if os.getenv("BENCH_DATABASE_URL"):
+        env["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=os.path.join(BACKEND_DIR, "src"),
+                            env=env, capture_output=True, text=True, timeout=120)
+    process_ms = (time.perf_counter() - started) * 1000
+    line = next((l for l in result.stdout.splitlines() if l.startswith("BENCH ")), None)
+    if result.returncode != 0 or line is None:
+        raise RuntimeError(f"[{mode}] 啟動失敗:\n{result.stderr[-2000:]}")
+    sample = json.loads(line[len("BENCH "):])
+    sample["process_ms"] = process_ms
+    return sample
+
+
+def summarize(samples):
+    summary = {}
+    for phase in PHASES:
+        values = sorted(s[phase] for s in samples)
+        summary[phase] = {
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "min": round(values[0], 3),
+            "max": round(values[-1], 3),
+        }
+    summary["errors"] = sum(1 for s in samples if s["status"] >= 400)
+    return summary
+
+
+def compare(results, baseline, max_regression):
+    """印出 p50 與 baseline 的差異，回傳變慢超過 max_regression % 的 (mode, phase)"""
+    regressions = []
+    print(f"\n{'mode':<6}{'phase':<22}{'p50 ms':>10}{'base':>10}{'diff':>9}")
+    for mode, current in results["modes"].items():
+        base = baseline.get("modes", {}).get(mode)
+        if base is None:
+            continue
+        for phase in PHASES:
+            p50, base_p50 = current[phase]["p50"], base[phase]["p50"]
+            diff = (p50 - base_p50) / base_p50 * 100 if base_p50 else 0.0
+            print(f"{mode:<6}{phase:<22}{p50:>10.1f}{base_p50:>10.1f}{diff:>+8.1f}%")
+            if max_regression is not None and diff > max_regression:
+                regressions.append(f"{mode}.{phase}")
+    return regressions
+
+
+def print_table(results):
+    print(f"\n{'mode':<6}{'phase':<22}{'p50 ms':>10}{'p95 ms':>10}{'min':>10}{'max':>10}")
+    for mode, summary in results["modes"].items():
+        for phase in PHASES:
+            r = summary[phase]
+            print(f"{mode:<6}{phase:<22}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['min']:>10.1f}{r['max']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SilkRoad startup benchmark")
+    parser.add_argument("--mode", action="append", choices=sorted(MODES), help="只跑指定模式 (可重複)")
+    parser.add_argument("-r", "--runs", type=int, default=10, help="每個模式啟動幾次")
+    parser.add_argument("-o", "--output", help="結果 JSON 檔")
+    parser.add_argument("--compare", help="baseline 結果 JSON 檔")
+    parser.add_argument("--max-regression", type=float, help="p50 變慢超過此百分比時 exit 1 (需搭配 --compare)")
+    args = parser.parse_args(argv)
+
+    modes = args.mode or ["dev", "prod"]
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+        },
+        "modes": {},
+    }
+    for mode in modes:
+        samples = [run_once(mode, {}) for _ in range(args.runs)]
+        results["modes"][mode] = summarize(samples)
+
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n結果已寫入 {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n變慢超過 {args.max_regression}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
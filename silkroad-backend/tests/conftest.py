@@ -12,6 +12,7 @@ import pytest
 import os
 from src.app import app as flask_app
 from src.config import db
+from src.config.mail import init_mail
 from src.models import *
 from werkzeug.security import generate_password_hash
 
@@ -27,8 +28,13 @@ def app():
         'TESTING': True,
         'SQLALCHEMY_DATABASE_URI': os.getenv('TEST_DATABASE_URL', os.getenv('DATABASE_URL')),
         'WTF_CSRF_ENABLED': False,  # Disable CSRF for testing
-        'SECRET_KEY': 'test-secret-key'
+        'SECRET_KEY': 'test-secret-key',
+        'MAIL_SUPPRESS_SEND': True,  # 不真的連 SMTP，寄出的信可用 mail.record_messages() 檢查
+        'MAIL_DEFAULT_SENDER': 'noreply@test.com',
+        'SESSION_BACKEND': 'memory'
     })
+    # Flask-Mail 在 init 時讀取設定，覆寫後需重新初始化
+    init_mail(flask_app)
 
     yield flask_app
 
@@ -307,3 +313,26 @@ def test_product_2(app, test_vendor):
         db.session.commit()
         product_id = product.id
         return product_id
+
+
+@pytest.fixture(scope='function')
+def test_order(app, test_customer, test_vendor, test_product, test_product_2):
+    """Create a pending cash order (2 x test_product + 1 x test_product_2). Returns order ID."""
+    with app.app_context():
+        order = Order(
+            user_id=test_customer,
+            vendor_id=test_vendor,
+            total_price=145,
+            payment_methods='cash',
+            is_delivered=False,
+            is_completed=False,
+            discount_amount=0,
+        )
+        db.session.add(order)
+        db.session.flush()
+        db.session.add_all([
+            Order_Item(order_id=order.id, product_id=test_product, quantity=2, price=50),
+            Order_Item(order_id=order.id, product_id=test_product_2, quantity=1, price=45),
+        ])
+        db.session.commit()
+        return order.id
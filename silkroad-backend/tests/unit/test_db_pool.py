@@ -0,0 +1,54 @@
+"""
+Connection Pool Tests
+
+- SQLALCHEMY_ENGINE_OPTIONS are built from the environment (MySQL only).
+- TimedQueuePool records checkout wait time; warm-up opens the pool.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.config.pool import TimedQueuePool, engine_options_from_env, pool_stats, warm_up_pool
+
+
+def test_engine_options_from_env():
+    """Pool sizing, recycle, pre-ping and driver timeouts come from env vars."""
+    options = engine_options_from_env("mysql://u:p@db/silkroad", {
+        "DB_POOL_SIZE": "4",
+        "DB_MAX_OVERFLOW": "2",
+        "DB_POOL_RECYCLE": "120",
+        "DB_POOL_PRE_PING": "false",
+        "DB_READ_TIMEOUT": "7",
+    })
+
+    assert options["poolclass"] is TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_recycle"]) == (4, 2, 120)
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"connect_timeout": 5, "read_timeout": 7, "write_timeout": 30}
+
+    assert engine_options_from_env("sqlite:///test.db", {}) == {}
+
+
+def test_pool_metrics_and_warm_up(tmp_path):
+    """Warm-up fills the pool; stats report checkouts, overflow and wait time."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool, pool_size=2, max_overflow=0, pool_timeout=0.05,
+    )
+
+    assert warm_up_pool(engine, 2) == 2
+    stats = pool_stats(engine)
+    assert stats["checkedin"] == 2 and stats["checkedout"] == 0
+    assert stats["checkouts"] == 2
+
+    held = [engine.connect(), engine.connect()]
+    assert pool_stats(engine)["checkedout"] == 2
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    for conn in held:
+        conn.close()
+
+    stats = pool_stats(engine)
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
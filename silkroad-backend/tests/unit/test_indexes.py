@@ -0,0 +1,58 @@
+"""
+Index / Migration Tests
+
+- Every index created by sql/migrations is also declared on the models,
+  so fresh databases (db.create_all / main.sql) and migrated ones match.
+- The hot queries are planned with their composite indexes.
+"""
+
+import re
+
+import pytest
+from src.app import app
+from src.config import db
+from src.utils.migrations import list_migrations, split_statements
+from src.utils.query_plan import check_hot_queries
+from sqlalchemy.exc import OperationalError
+
+
+def check_database_connection():
+    try:
+        with app.app_context():
+            db.session.execute(db.text("SELECT 1"))
+        return True
+    except OperationalError:
+        return False
+
+
+def test_migration_indexes_declared_on_models():
+    """Indexes left after applying every migration exist in the model metadata."""
+    model_indexes = {
+        index.name
+        for table in db.metadata.tables.values()
+        for index in table.indexes
+    }
+
+    migrated = {}
+    for version, path in list_migrations():
+        with open(path, encoding="utf-8") as f:
+            for stmt in split_statements(f.read()):
+                created = re.match(r"CREATE (?:UNIQUE )?INDEX `(\w+)`", stmt)
+                dropped = re.match(r"DROP INDEX `(\w+)`", stmt)
+                if created:
+                    migrated[created.group(1)] = version
+                elif dropped:
+                    migrated.pop(dropped.group(1), None)
+
+    for name, version in migrated.items():
+        assert name in model_indexes, f"{version}: {name} not declared on models"
+
+
+@pytest.mark.skipif(not check_database_connection(), reason="Database not available")
+def test_hot_queries_use_indexes(_db):
+    """EXPLAIN of each hot query picks its composite index."""
+    with app.app_context():
+        results = check_hot_queries()
+
+    missing = [(r["name"], r["index"], r["plan"]) for r in results if not r["used"]]
+    assert not missing, missing
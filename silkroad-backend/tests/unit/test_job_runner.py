@@ -0,0 +1,96 @@
+"""
+Job Runner Tests
+
+- cleanup_users deletes expired unverified accounts in id-range chunks,
+  including their child rows (customers, carts, cart_items).
+- Every run is recorded in auth.job_runs; a held lock skips the run.
+- Scheduled runs are skipped when another worker succeeded within the interval.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+from src.app import app
+from src.config import db
+from src.models import User, Customer, Cart, Cart_Item, Job_Run
+from src.utils.job_runner import JOBS, advisory_lock, run_job
+
+
+def _unverified_customer(expires_at):
+    unique_id = str(uuid.uuid4())[:8]
+    customer = Customer(
+        name="Unverified",
+        email=f"unverified-{unique_id}@test.com",
+        password="x",
+        phone_number=f"08{uuid.uuid4().int % 10**8:08d}",
+        address=f"Unverified Address {unique_id}",
+        role="customer",
+        is_verified=False,
+        verification_code="123456",
+        verification_code_expires_at=expires_at,
+    )
+    db.session.add(customer)
+    db.session.flush()
+    return customer.id
+
+
+def test_cleanup_users_job(_db, test_vendor, test_product, test_customer, monkeypatch):
+    """Expired unverified users and their carts are removed in chunks."""
+    monkeypatch.setattr("utils.tasks.CLEANUP_CHUNK_SIZE", 2)
+    with app.app_context():
+        expired = [_unverified_customer(datetime.now() - timedelta(minutes=5)) for _ in range(5)]
+        pending = _unverified_customer(datetime.now() + timedelta(minutes=5))
+        db.session.add(Cart(customer_id=expired[0], vendor_id=test_vendor))
+        db.session.flush()
+        db.session.add(Cart_Item(cart_id=expired[0], product_id=test_product, quantity=1,
+                                 selected_sugar="normal", selected_ice="less", selected_size="M"))
+        db.session.commit()
+
+    run = run_job(app, "cleanup_users")
+
+    assert run.status == "success"
+    assert run.rows_processed >= 5
+    assert run.duration_ms is not None and run.finished_at is not None
+    with app.app_context():
+        assert User.query.filter(User.id.in_(expired)).count() == 0
+        assert Customer.query.filter(Customer.user_id.in_(expired)).count() == 0
+        assert db.session.get(Cart, expired[0]) is None
+        assert Cart_Item.query.filter_by(cart_id=expired[0]).count() == 0
+        # 還沒過期的與已驗證的帳號不受影響
+        assert db.session.get(User, pending) is not None
+        assert db.session.get(User, test_customer) is not None
+        assert db.session.get(Job_Run, run.id).job_name == "cleanup_users"
+
+
+def test_run_job_skips_when_locked(_db):
+    """Another worker holding the lock means this run is skipped and not recorded."""
+    with app.app_context():
+        before = Job_Run.query.count()
+        with advisory_lock("cleanup_users") as acquired:
+            assert acquired
+            assert run_job(app, "cleanup_users") is None
+        assert Job_Run.query.count() == before
+
+
+def test_scheduled_run_skips_after_recent_success(_db, monkeypatch):
+    """With N workers each firing once per interval, only the first run in the interval executes."""
+    assert run_job(app, "cleanup_users").status == "success"
+
+    assert run_job(app, "cleanup_users", skip_if_recent=True) is None
+    # 手動執行不受影響
+    assert run_job(app, "cleanup_users").status == "success"
+
+    monkeypatch.setitem(app.config, "CLEANUP_USERS_INTERVAL_MINUTES", 0)
+    assert run_job(app, "cleanup_users", skip_if_recent=True).status == "success"
+
+
+def test_failed_job_is_recorded(_db, monkeypatch):
+    """Exceptions are caught and stored on the run record."""
+    def broken():
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(JOBS, "cleanup_users", (broken, "CLEANUP_USERS_INTERVAL_MINUTES", 30))
+    run = run_job(app, "cleanup_users")
+
+    assert run.status == "failed"
+    assert "boom" in run.error
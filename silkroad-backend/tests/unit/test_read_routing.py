@@ -0,0 +1,92 @@
+"""
+Read Replica Routing Tests
+
+Uses two local SQLite databases as primary and reader, holding different
+rows, so each response shows which bind served it.
+"""
+
+import pytest
+from flask import Flask, jsonify
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+from src.config.routing import RoutingSession, READER_BIND
+from src.utils.read_routing import RYW_COOKIE, init_read_routing, read_only
+
+
+@pytest.fixture
+def routed(tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'primary.db'}",
+        SQLALCHEMY_BINDS={READER_BIND: f"sqlite:///{tmp_path / 'reader.db'}"},
+        DB_READ_YOUR_WRITES_SECONDS=5,
+    )
+    db = SQLAlchemy(app, session_options={"class_": RoutingSession})
+
+    class Item(db.Model):
+        __tablename__ = "items"
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(20))
+
+    with app.app_context():
+        db.create_all()
+        for bind, name in ((None, "primary"), (READER_BIND, "replica")):
+            with db.engines[bind].begin() as conn:
+                conn.execute(text("CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name VARCHAR(20))"))
+                conn.execute(text("INSERT INTO items (name) VALUES (:name)"), {"name": name})
+
+    def names():
+        return sorted(item.name for item in db.session.scalars(db.select(Item)))
+
+    @app.route("/read")
+    @read_only
+    def read():
+        return jsonify(names())
+
+    @app.route("/read_write", methods=["POST"])
+    @read_only
+    def read_write():
+        db.session.add(Item(name="new"))
+        db.session.commit()
+        return jsonify(names())
+
+    @app.route("/plain")
+    def plain():
+        return jsonify(names())
+
+    @app.route("/write", methods=["POST"])
+    def write():
+        db.session.add(Item(name="written"))
+        db.session.commit()
+        return jsonify(names())
+
+    init_read_routing(app)
+    return app
+
+
+def test_read_only_handlers_use_reader(routed):
+    client = routed.test_client()
+
+    assert client.get("/read").get_json() == ["replica"]
+    assert client.get("/plain").get_json() == ["primary"]
+    # 純讀取不會設定 read-your-writes cookie
+    assert client.get_cookie(RYW_COOKIE) is None
+
+
+def test_read_your_writes(routed):
+    """After a write, the same client reads from the primary until the window ends."""
+    client = routed.test_client()
+
+    client.post("/write")
+    assert client.get_cookie(RYW_COOKIE) is not None
+    assert client.get("/read").get_json() == ["primary", "written"]
+
+    # 其他使用者仍然讀 replica
+    assert routed.test_client().get("/read").get_json() == ["replica"]
+
+
+def test_write_inside_read_only_handler_sticks_to_primary(routed):
+    client = routed.test_client()
+
+    assert client.post("/read_write").get_json() == ["new", "primary"]
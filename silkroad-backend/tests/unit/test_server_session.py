@@ -0,0 +1,127 @@
+"""
+Server-side Session Tests
+
+The session cookie only carries a session id; data lives in the store
+configured by SESSION_BACKEND (memory in tests).
+"""
+
+import json
+
+from src.utils.server_session import SQLiteSessionStore, ServerSideSession
+
+
+def _session_cookie(response):
+    return next((h for h in response.headers.getlist('Set-Cookie') if h.startswith('flask_session=')), None)
+
+
+def _add_guest_item(client, product_id):
+    return client.post('/api/cart/add', data=json.dumps({
+        "vendor_id": 1,
+        "product_id": product_id,
+        "quantity": 1,
+        "selected_sugar": "normal",
+        "selected_ice": "less",
+        "selected_size": "M",
+    }), content_type='application/json')
+
+
+def test_cookie_does_not_grow_with_cart(client):
+    """The cookie stays the same size however big the guest cart gets."""
+    first = _session_cookie(_add_guest_item(client, 1))
+    assert first is not None
+
+    for product_id in range(2, 30):
+        rsp = _add_guest_item(client, product_id)
+        assert rsp.status_code == 200
+        # 同一個 sid，不需要重發不同的 cookie
+        cookie = _session_cookie(rsp)
+        assert cookie is None or cookie.split(';')[0] == first.split(';')[0]
+
+    assert len(first.split(';')[0]) < 64
+
+    with client.session_transaction() as sess:
+        assert len(sess['cart']['items']) == 29
+
+
+def test_untouched_session_is_not_written(client):
+    """Requests that never modify the session do not set a cookie."""
+    rsp = client.get('/')
+    assert _session_cookie(rsp) is None
+
+
+def test_logout_removes_session(app, authenticated_client):
+    """Clearing the session deletes it from the store and expires the cookie."""
+    sid = authenticated_client.get_cookie('flask_session').value
+    store = app.session_interface._get_store(app)
+    assert store.get(sid) is not None
+
+    rsp = authenticated_client.post('/api/user/logout')
+
+    assert rsp.status_code == 200
+    assert store.get(sid) is None
+    assert authenticated_client.get_cookie('flask_session') is None
+
+
+def test_unknown_sid_is_not_adopted(app, client):
+    """A planted sid that is not in the store is replaced instead of being written."""
+    client.set_cookie('flask_session', 'planted-sid')
+
+    rsp = _add_guest_item(client, 1)
+
+    store = app.session_interface._get_store(app)
+    assert store.get('planted-sid') is None
+    assert client.get_cookie('flask_session').value != 'planted-sid'
+    assert rsp.status_code == 200
+
+
+def test_login_regenerates_sid(app, client, test_customer):
+    """Logging in issues a new sid and drops the pre-login one from the store."""
+    from src.models import Customer
+    from src.config import db
+
+    _add_guest_item(client, 1)
+    before = client.get_cookie('flask_session').value
+    store = app.session_interface._get_store(app)
+    assert store.get(before) is not None
+
+    with app.app_context():
+        customer = db.session.get(Customer, test_customer)
+        customer.is_verified = True
+        email = customer.email
+        db.session.commit()
+    rsp = client.post('/api/user/login', data=json.dumps({
+        "email": email,
+        "password": "customer123",
+    }), content_type='application/json')
+
+    assert rsp.status_code == 200
+    after = client.get_cookie('flask_session').value
+    assert after != before
+    assert store.get(before) is None
+    with client.session_transaction() as sess:
+        assert sess['user_id'] == test_customer
+
+
+def test_lazy_load():
+    """The store is only read when the session content is used."""
+    calls = []
+    sess = ServerSideSession('sid', loader=lambda: calls.append(1) or {"user_id": 1})
+
+    assert not sess.loaded and calls == []
+    assert sess['user_id'] == 1
+    assert sess.get('role') is None
+    assert calls == [1]
+    assert sess.accessed and not sess.modified
+
+
+def test_sqlite_store_roundtrip(tmp_path):
+    """The SQLite backend stores payloads with an expiry."""
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.sqlite3'))
+
+    store.set('a', '{"x": 1}', ttl=60)
+    store.set('expired', '{}', ttl=-1)
+
+    assert store.get('a')[0] == '{"x": 1}'
+    assert store.get('expired') is None
+    store.delete('a')
+    assert store.get('a') is None
@@ -0,0 +1,50 @@
+"""
+Startup Tests
+
+- Importing app.py does not build the app; app.app creates it once.
+- In production mode (DB_CREATE_ALL / SCHEDULER_API_ENABLED off) creating the app
+  does not touch the database or load Cloudinary, APScheduler or Flask-Mail.
+- migrate creates only the tables that are missing.
+"""
+
+import os
+import subprocess
+import sys
+
+from src.app import app
+from src.utils.migrations import create_missing_tables
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "src")
+
+PROBE = """
+import sys
+import app
+print("probe", app._app is None)
+flask_app = app.app
+print("probe", app.app is flask_app)
+print("probe", sorted(m for m in ("cloudinary", "flask_apscheduler", "flask_mail") if m in sys.modules))
+"""
+
+
+def _probe(env):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=SRC_DIR, capture_output=True, text=True, timeout=60,
+        env={**os.environ, "SESSION_KEY": "x", "SESSION_BACKEND": "memory", **env},
+    )
+    assert result.returncode == 0, result.stderr
+    return [line[len("probe "):] for line in result.stdout.splitlines() if line.startswith("probe ")]
+
+
+def test_production_startup_is_lazy(tmp_path):
+    """No create_all (the database has no schemas) and no optional subsystems loaded."""
+    lines = _probe({
+        "DATABASE_URL": f"sqlite:///{tmp_path}/empty.db",
+        "DB_CREATE_ALL": "False",
+        "SCHEDULER_API_ENABLED": "False",
+    })
+    assert lines == ["True", "True", "[]"]
+
+
+def test_create_missing_tables_is_idempotent(_db):
+    with app.app_context():
+        assert create_missing_tables() == []
@@ -0,0 +1,88 @@
+"""
+Synthetic Data Tests
+
+- generate() loads every stage with the requested volumes.
+- Re-running with the same seed resumes instead of duplicating rows,
+  including after an interrupted orders stage.
+- Derived data (including vendor revenue) is rebuilt from the generated orders.
+"""
+
+import random
+
+from sqlalchemy import func, select
+
+from src.app import app
+from src.config import db
+from src.models import Order, Order_Item, Product, Review, Sizes_Option, User
+from src.utils.synthetic_data import generate, scaled
+
+TINY = scaled("small", managers=2, vendors=4, products_per_vendor=3, customers=10, orders=250)
+
+
+def _counts(seed):
+    prefix = f"synthetic-{seed}-"
+    orders = select(Order.id).where(Order.note.like(f"{prefix}order-%"))
+    return {
+        "users": db.session.scalar(select(func.count()).where(User.email.like(f"{prefix}%"))),
+        "products": db.session.scalar(select(func.count()).where(Product.image_url.like(f"%/synthetic-{seed}/%"))),
+        "orders": db.session.scalar(select(func.count()).select_from(orders.subquery())),
+        "items": db.session.scalar(select(func.count()).where(Order_Item.order_id.in_(orders))),
+        "reviews": db.session.scalar(select(func.count()).where(Review.order_id.in_(orders))),
+    }
+
+
+def test_generate_and_resume(_db):
+    """Volumes match the preset and a second run is a no-op."""
+    seed = random.randrange(10**6, 10**7)
+    with app.app_context():
+        generate(TINY, seed=seed, chunk_size=100, rebuild_derived=False)
+        counts = _counts(seed)
+        assert counts["users"] == TINY.vendors + TINY.customers
+        assert counts["products"] == TINY.vendors * TINY.products_per_vendor
+        assert counts["orders"] == TINY.orders
+        assert counts["items"] >= TINY.orders
+        assert db.session.scalar(select(func.count()).where(
+            Sizes_Option.product_id.in_(select(Product.id).where(Product.image_url.like(f"%/synthetic-{seed}/%")))
+        )) >= counts["products"]
+
+        generate(TINY, seed=seed, chunk_size=100, rebuild_derived=False)
+        assert _counts(seed) == counts
+
+
+def test_resume_after_interrupted_chunk(_db):
+    """Deleting the last chunk (as if it never committed) regenerates the same rows."""
+    seed = random.randrange(10**6, 10**7)
+    with app.app_context():
+        generate(TINY, seed=seed, chunk_size=100, rebuild_derived=False)
+        counts = _counts(seed)
+
+        last_chunk = select(Order.id).where(Order.note.like(f"synthetic-{seed}-order-2__"))
+        ids = db.session.scalars(last_chunk).all()
+        assert len(ids) == 50
+        db.session.execute(Review.__table__.delete().where(Review.order_id.in_(ids)))
+        db.session.execute(Order_Item.__table__.delete().where(Order_Item.order_id.in_(ids)))
+        db.session.execute(Order.__table__.delete().where(Order.id.in_(ids)))
+        db.session.commit()
+
+        generate(TINY, seed=seed, chunk_size=100, rebuild_derived=False)
+        assert _counts(seed) == counts
+
+
+def test_derived_revenue_matches_orders(_db):
+    """Rebuilding derived data brings vendors.revenue in line with the generated orders."""
+    from src.models import Vendor
+    from src.utils.vendor_revenue import revenue_of
+
+    seed = random.randrange(10**6, 10**7)
+    with app.app_context():
+        generate(TINY, seed=seed, chunk_size=100)
+        vendor_ids = db.session.scalars(
+            select(Vendor.user_id).where(Vendor.email.like(f"synthetic-{seed}-%"))
+        ).all()
+        expected = db.session.scalar(select(func.coalesce(func.sum(Order.total_price), 0)).where(
+            Order.vendor_id.in_(vendor_ids),
+            Order.is_completed == True,
+            (Order.refund_status.is_(None)) | (Order.refund_status != "refunded"),
+        ))
+        assert expected > 0
+        assert sum(revenue_of(v) for v in vendor_ids) == expected